@@ -0,0 +1,256 @@
+# -----------------------------------------------------------------------------
+# AWS responses for the offline benchmarks, rebuilt from the catalog snapshot in
+# outputs/
+#
+# outputs/<family>_20260101.csv hold the full spec + price table (~900 instance
+# types) as produced by ec2_specs_price.py.  These functions turn it back into
+# the response shapes the code under test consumes:
+#   - describe_instance_types pages (100 types per page, like the real API)
+#   - get_products responses with PriceList JSON strings (product attributes +
+#     OnDemand terms), including multi-page responses padded with the Capacity
+#     Block / $0.00 SKUs that ondemand2 has to skip
+#   - describe_instances reservations
+# -----------------------------------------------------------------------------
+
+import csv
+import json
+import zlib
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CATALOG_GLOB = "*_20260101.csv"
+PAGE_SIZE = 100  # describe_instance_types / get_products page size
+
+
+def _num(value: str) -> Any:
+    if value in ("", "nan"):
+        return None
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def load_catalog(
+    outputs_dir: Path = PROJECT_ROOT / "outputs",
+) -> list[dict[str, Any]]:
+    rows = []
+    for path in sorted(outputs_dir.glob(CATALOG_GLOB)):
+        with open(path, newline="") as f:
+            rows += [
+                {k: _num(v) for k, v in row.items()}
+                for row in csv.DictReader(f)
+            ]
+    if not rows:
+        raise FileNotFoundError(
+            f"no {CATALOG_GLOB} catalog snapshot in {outputs_dir}"
+        )
+    return rows
+
+
+def instance_type_item(row: dict[str, Any]) -> dict[str, Any]:
+    """DescribeInstanceTypes item for one catalog row (the inverse of
+    ec2_specs_price.flatten)."""
+    item: dict[str, Any] = {
+        "InstanceType": row["Type"],
+        "CurrentGeneration": row["CurrentGen"] == "True",
+        "ProcessorInfo": {
+            "SupportedArchitectures": str(row["Arch"]).split(","),
+            "SustainedClockSpeedInGhz": 3.5,
+        },
+        "VCpuInfo": {
+            "DefaultVCpus": row["VCpu"],
+            "DefaultCores": row["CpuCores"],
+            "DefaultThreadsPerCore": row["CpuThreadsPerCore"],
+            "ValidCores": list(range(1, (row["CpuCores"] or 1) + 1)),
+            "ValidThreadsPerCore": [1, 2],
+        },
+        "MemoryInfo": {"SizeInMiB": row["MemoryMiB"]},
+        "EbsInfo": {
+            "EbsOptimizedSupport": row["EbsOnly"],
+            "EncryptionSupport": "supported",
+            "NvmeSupport": "required",
+            "EbsOptimizedInfo": {
+                "BaselineBandwidthInMbps": row["EbsBwMbps"] or 0,
+                "MaximumBandwidthInMbps": (row["EbsBwMbps"] or 0) * 2,
+            },
+        },
+        "NetworkInfo": {
+            "NetworkPerformance": row["NetPerf"],
+            "MaximumNetworkInterfaces": 4,
+            "Ipv4AddressesPerInterface": 15,
+            "EnaSupport": "required",
+        },
+        "SupportedUsageClasses": ["on-demand", "spot"],
+        "SupportedRootDeviceTypes": ["ebs"],
+        "Hypervisor": "nitro",
+    }
+    if row["InstanceStorage"]:
+        item["InstanceStorageInfo"] = {
+            "TotalSizeInGB": row["InstanceStorage"],
+            "Disks": [
+                {"SizeInGB": row["InstanceStorage"], "Count": 1, "Type": "ssd"}
+            ],
+        }
+    if row["HasGPU"] == "True":
+        item["GpuInfo"] = {
+            "Gpus": [
+                {
+                    "Name": row["GpuName"],
+                    "Manufacturer": "NVIDIA",
+                    "Count": row["GpuCount"] or 1,
+                    "MemoryInfo": {"SizeInMiB": 24576},
+                }
+            ],
+            "TotalGpuMemoryInMiB": 24576,
+        }
+    return item
+
+
+def describe_instance_types_pages(
+    catalog: list[dict[str, Any]],
+) -> list[dict[str, Any]]:
+    items = [instance_type_item(row) for row in catalog]
+    pages = []
+    for start in range(0, len(items), PAGE_SIZE):
+        page: dict[str, Any] = {
+            "InstanceTypes": items[start : start + PAGE_SIZE]
+        }
+        if start + PAGE_SIZE < len(items):
+            page["NextToken"] = f"token-{start + PAGE_SIZE}"
+        pages.append(page)
+    return pages
+
+
+def price_list_item(
+    instance_type: str,
+    usd: float,
+    location: str = "US East (N. Virginia)",
+    operation: str = "RunInstances",
+    market: str = "OnDemand",
+    capacity: str = "Used",
+) -> str:
+    """One PriceList entry as the Pricing API returns it: a JSON string."""
+    key = f"{instance_type}|{operation}|{market}|{capacity}"
+    sku = f"SKU{zlib.crc32(key.encode()):012d}"
+    return json.dumps(
+        {
+            "product": {
+                "productFamily": "Compute Instance",
+                "attributes": {
+                    "instanceType": instance_type,
+                    "location": location,
+                    "locationType": "AWS Region",
+                    "operatingSystem": "Linux",
+                    "tenancy": "Shared",
+                    "preInstalledSw": "NA",
+                    "capacitystatus": capacity,
+                    "licenseModel": "No License required",
+                    "operation": operation,
+                    "marketoption": market,
+                    "usagetype": f"BoxUsage:{instance_type}",
+                    "servicecode": "AmazonEC2",
+                    "regionCode": "us-east-1",
+                },
+                "sku": sku,
+            },
+            "serviceCode": "AmazonEC2",
+            "terms": {
+                "OnDemand": {
+                    f"{sku}.JRTCKXETXF": {
+                        "priceDimensions": {
+                            f"{sku}.JRTCKXETXF.6YS6EN2CT7": {
+                                "unit": "Hrs",
+                                "endRange": "Inf",
+                                "beginRange": "0",
+                                "description": (
+                                    f"${usd} per On Demand Linux "
+                                    f"{instance_type} Instance Hour"
+                                ),
+                                "pricePerUnit": {"USD": f"{usd:.10f}"},
+                                "appliesTo": [],
+                                "rateCode": f"{sku}.JRTCKXETXF.6YS6EN2CT7",
+                            }
+                        },
+                        "sku": sku,
+                        "effectiveDate": "2026-01-01T00:00:00Z",
+                        "offerTermCode": "JRTCKXETXF",
+                        "termAttributes": {},
+                    }
+                }
+            },
+            "version": "20260101000000",
+            "publicationDate": "2026-01-01T00:00:00Z",
+        }
+    )
+
+
+def get_products_pages(
+    instance_type: str, usd: float, padding_pages: int = 0
+) -> list[dict[str, Any]]:
+    """Responses for one price lookup: padding pages of SKUs ondemand2 must
+    skip, then the match."""
+    pages = []
+    for page_no in range(padding_pages):
+        skipped = [
+            price_list_item(
+                instance_type,
+                0.0,
+                operation=f"RunInstances:{n:04d}",
+                market="CapacityBlock" if n % 2 else "OnDemand",
+                capacity="UnusedCapacityReservation",
+            )
+            for n in range(page_no * PAGE_SIZE, (page_no + 1) * PAGE_SIZE)
+        ]
+        pages.append(
+            {
+                "PriceList": skipped,
+                "FormatVersion": "aws_v1",
+                "NextToken": f"p{page_no + 1}",
+            }
+        )
+    pages.append(
+        {
+            "PriceList": [price_list_item(instance_type, usd)],
+            "FormatVersion": "aws_v1",
+        }
+    )
+    return pages
+
+
+def describe_instances_response(
+    count: int, name_prefix: str = "node"
+) -> dict[str, Any]:
+    launched = datetime(2026, 1, 1, tzinfo=UTC)
+    return {
+        "Reservations": [
+            {
+                "ReservationId": f"r-{n:017x}",
+                "OwnerId": "123456789012",
+                "Instances": [
+                    {
+                        "InstanceId": f"i-{n:017x}",
+                        "InstanceType": "t3a.large",
+                        "LaunchTime": launched,
+                        "State": {"Code": 16, "Name": "running"},
+                        "PublicIpAddress": f"3.80.{n // 256}.{n % 256}",
+                        "PrivateIpAddress": f"10.0.{n // 256}.{n % 256}",
+                        "Tags": [
+                            {"Key": "Name", "Value": f"{name_prefix}-{n:03d}"}
+                        ],
+                        "SecurityGroups": [
+                            {
+                                "GroupId": "sg-0c1f8430a8cf53bec",
+                                "GroupName": "default",
+                            }
+                        ],
+                    }
+                ],
+            }
+            for n in range(count)
+        ]
+    }
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Offline benchmarks for the spec/price, template and logging paths
+#
+# AWS calls are served by botocore's Stubber from responses rebuilt out of the
+# catalog snapshot in outputs/ (see fixtures.py), so nothing here needs
+# credentials or network.  HOME points at a scratch directory for the run, which
+# keeps the config/template caches and ~/logs/aws separate from the real ones.
+#
+# Each case reports the median (and min) of several timed runs.  baseline.json
+# holds the reference medians.  A case fails when its median is more than
+# --tolerance slower than the baseline (and over a 2ms noise floor); the exit
+# code is 1 if any case failed.
+#
+# Usage examples:
+#   # compare against baseline.json
+#   python benchmarks/run_benchmarks.py
+#   # only cases containing "price"
+#   python benchmarks/run_benchmarks.py -k price
+#   # record new reference numbers
+#   python benchmarks/run_benchmarks.py --update-baseline
+# -----------------------------------------------------------------------------
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+BASELINE = BENCH_DIR / "baseline.json"
+NOISE_FLOOR_S = 0.002
+
+# Isolated HOME before any project module computes its cache/log paths
+SCRATCH_HOME = Path(tempfile.mkdtemp(prefix="aws-utils-bench-"))
+os.environ["HOME"] = str(SCRATCH_HOME)
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+for sub in ("src", "configs", "scripts"):
+    sys.path.append(str(PROJECT_ROOT / sub))
+
+import boto3
+import fixtures
+import pandas as pd
+import requests
+from botocore.stub import Stubber
+
+# clients come from here; the code under test gets boto3.client patched
+SESSION = boto3.Session()
+
+
+def stubbed(service: str, responses: list[tuple[str, dict]]) -> Any:
+    """A real botocore client whose calls are answered, in order, from
+    responses."""
+    client = SESSION.client(service, region_name="us-east-1")
+    stubber = Stubber(client)
+    for operation, response in responses:
+        stubber.add_response(operation, response)
+    stubber.activate()
+    return client
+
+
+class Case:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Any],
+        setup: Callable[[], Any] | None = None,
+        repeat: int = 7,
+    ) -> None:
+        self.name, self.fn, self.setup, self.repeat = name, fn, setup, repeat
+
+    def run(self) -> dict[str, float]:
+        # warm-up (imports, first-call caches)
+        self.fn(self.setup() if self.setup else None)
+        times = []
+        for _ in range(self.repeat):
+            state = self.setup() if self.setup else None
+            t0 = time.perf_counter()
+            self.fn(state)
+            times.append(time.perf_counter() - t0)
+        return {
+            "median_s": round(statistics.median(times), 6),
+            "min_s": round(min(times), 6),
+            "runs": self.repeat,
+        }
+
+
+def build_cases() -> list[Case]:
+    import ec2_specs_price
+
+    from get_prices import ondemand1
+    from get_prices import ondemand2
+    from instance_actions import find_targets
+
+    catalog = fixtures.load_catalog()
+    type_pages = fixtures.describe_instance_types_pages(catalog)
+    items = [item for page in type_pages for item in page["InstanceTypes"]]
+    prices = {row["Type"]: row["USDPerHr"] for row in catalog}
+    price_responses = {
+        t: fixtures.get_products_pages(t, usd or 0.01)[-1]
+        for t, usd in prices.items()
+    }
+    multi_page = fixtures.get_products_pages(
+        "g5.2xlarge", 1.212, padding_pages=3
+    )
+    location = ec2_specs_price.REGION_TO_LOCATION["us-east-1"]
+
+    cases: list[Case] = []
+
+    # --- ec2_specs_price: full catalog, 9 describe_instance_types pages -------
+    def collect_setup() -> None:
+        client = stubbed(
+            "ec2", [("describe_instance_types", page) for page in type_pages]
+        )
+        ec2_specs_price.boto3.client = lambda *a, **k: client
+
+    cases.append(
+        Case(
+            f"collect_instance_types[{len(items)} types]",
+            lambda _: ec2_specs_price.collect_instance_types(
+                "*", None, "us-east-1", None
+            ),
+            collect_setup,
+        )
+    )
+    cases.append(
+        Case(
+            f"flatten[{len(items)} types]",
+            lambda _: [ec2_specs_price.flatten(item) for item in items],
+            repeat=15,
+        )
+    )
+
+    df = pd.DataFrame(
+        [ec2_specs_price.flatten(item) for item in items]
+    ).sort_values(["Type"])
+
+    def prices_setup() -> pd.DataFrame:
+        client = stubbed(
+            "pricing",
+            [("get_products", price_responses[t]) for t in df["Type"]],
+        )
+        ec2_specs_price.boto3.client = lambda *a, **k: client
+        return df.copy()
+
+    cases.append(
+        Case(
+            f"add_prices_column[{len(df)} types]",
+            lambda frame: ec2_specs_price.add_prices_column(frame, "us-east-1"),
+            prices_setup,
+            repeat=3,
+        )
+    )
+
+    # --- get_prices: one lookup each, ondemand2 over a multi-page PriceList ---
+    cases.append(
+        Case(
+            "ondemand1[1 page]",
+            lambda client: ondemand1(client, "g5.2xlarge", location),
+            lambda: stubbed("pricing", [("get_products", multi_page[-1])]),
+            repeat=25,
+        )
+    )
+    cases.append(
+        Case(
+            "ondemand2[1 page]",
+            lambda client: ondemand2(client, "g5.2xlarge", location),
+            lambda: stubbed("pricing", [("get_products", multi_page[-1])]),
+            repeat=25,
+        )
+    )
+    cases.append(
+        Case(
+            f"ondemand2[{len(multi_page)} pages, "
+            f"{100 * (len(multi_page) - 1)} skipped SKUs]",
+            lambda client: ondemand2(client, "g5.2xlarge", location),
+            lambda: stubbed(
+                "pricing", [("get_products", p) for p in multi_page]
+            ),
+            repeat=15,
+        )
+    )
+
+    # --- describe_instances: resolve a 500-node fleet -------------------------
+    fleet = fixtures.describe_instances_response(500)
+    cases.append(
+        Case(
+            "find_targets[500 instances]",
+            lambda client: find_targets({"us-east-1": client}, ["node-*"]),
+            lambda: stubbed("ec2", [("describe_instances", fleet)]),
+            repeat=9,
+        )
+    )
+
+    # --- launch template lookup, cold (empty caches) and warm -----------------
+    import ec2_launch_bootstrap
+
+    config = {
+        "family": "g",
+        "type": "g4dn.xlarge",
+        "ubuntu": 24.04,
+        "dlami": "Y",
+    }
+    cache_dir = SCRATCH_HOME / ".cache" / "aws-utils"
+
+    cases.append(
+        Case(
+            "find_launch_template[cold]",
+            lambda _: ec2_launch_bootstrap.find_launch_template(config),
+            lambda: shutil.rmtree(cache_dir, ignore_errors=True),
+        )
+    )
+    cases.append(
+        Case(
+            "find_launch_template[warm]",
+            lambda _: ec2_launch_bootstrap.find_launch_template(config),
+            repeat=25,
+        )
+    )
+
+    # --- aws_log: 200 entries; checkip fails fast as it would offline ---------
+    import aws_logger
+
+    def offline_get(*args: Any, **kwargs: Any) -> Any:
+        raise requests.ConnectionError("offline benchmark")
+
+    aws_logger.requests.get = offline_get
+
+    def log_entries(_: Any) -> None:
+        for n in range(200):
+            aws_logger.aws_log("EC2_bench", f"entry {n} g5.2xlarge")
+
+    cases.append(Case("aws_log[200 entries]", log_entries))
+    return cases
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Offline benchmarks over recorded AWS responses"
+    )
+    ap.add_argument(
+        "-k",
+        dest="select",
+        default="",
+        help="only cases whose name contains this",
+    )
+    ap.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.30,
+        help="allowed slowdown vs baseline as a fraction (default: 0.30)",
+    )
+    ap.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="write results to baseline.json",
+    )
+    args = ap.parse_args()
+
+    baseline = (
+        json.loads(BASELINE.read_text()) if BASELINE.exists() else {"cases": {}}
+    )
+    results: dict[str, dict[str, float]] = {}
+    failed = []
+    try:
+        cases = [c for c in build_cases() if args.select in c.name]
+        print(
+            f"{'case':<52} {'median':>10} {'min':>10} {'baseline':>10}  change"
+        )
+        for case in cases:
+            result = results[case.name] = case.run()
+            base = baseline["cases"].get(case.name, {}).get("median_s")
+            change = ""
+            if base:
+                ratio = result["median_s"] / base - 1
+                change = f"{ratio:+.0%}"
+                if (
+                    ratio > args.tolerance
+                    and result["median_s"] - base > NOISE_FLOOR_S
+                ):
+                    failed.append(case.name)
+                    change += "  ❌ regression"
+            print(
+                f"{case.name:<52} {result['median_s'] * 1e3:>8.2f}ms "
+                f"{result['min_s'] * 1e3:>8.2f}ms "
+                f"{f'{base * 1e3:.2f}ms' if base else '-':>10}  {change}"
+            )
+    finally:
+        shutil.rmtree(SCRATCH_HOME, ignore_errors=True)
+
+    if args.update_baseline:
+        baseline["cases"].update(results)
+        baseline["machine"] = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.machine(),
+            "cpus": os.cpu_count(),
+        }
+        BASELINE.write_text(
+            json.dumps(baseline, indent=1, sort_keys=True) + "\n"
+        )
+        print(f"\n📝 baseline updated: {BASELINE}")
+    elif failed:
+        print(
+            f"\n❌ {len(failed)} regression(s) beyond {args.tolerance:.0%}: "
+            f"{', '.join(failed)}"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,7 @@
 #  --dry-run           Show what would run; do not execute or write stamps (default)
 #  --run               Actually execute steps (disables dry-run)
 #  --force             Run steps even if already stamped as done
+#  --jobs N            Run up to N independent steps at once (default: 4; 1 = one after another)
 #  --help              Show help
 #
 #Notes:
@@ -21,12 +22,14 @@
 #2. Step files must be named like NN_name.sh (e.g., 00_preflight.sh).
 #3. steps can be specified of xx_'d out in the config file
 #4. --only takes precedence by skipping everything not listed.
+#5. Steps declare '# @deps:' / '# @locks:' in their headers; see "scheduling" below.
 #
 # eg:
 # cd ~/bootstrap
 # bash run.sh --config <config_ filename.yaml> --run
 # bash run.sh --config <config_ filename.yaml> --skip 06,07 --run
 # bash run.sh --config <config_ filename.yaml> --only 08 --run --force
+# bash run.sh --config <config_ filename.yaml> --run --jobs 1
 
 # Good to knows: 
 # After completion if something is not working try source ~/.bashrc  
@@ -44,6 +47,13 @@ STEPS_DIR="$BOOTSTRAP_DIR/steps"
 # ----- configs -----
 STATE_DIR="${STATE_DIR:-$HOME/.bootstrap_state}"
 LOG_FILE="${LOG_FILE:-$HOME/bootstrap/bootstrap.log}"
+# Machine-readable step events (one JSON object per line), streamed back by the launcher --watch
+EVENTS_FILE="${EVENTS_FILE:-$HOME/bootstrap/bootstrap.events}"
+# One full log per step (the main log gets the same lines prefixed with [NN])
+STEP_LOG_DIR="${STEP_LOG_DIR:-$HOME/bootstrap/logs}"
+RUN_DIR="$STATE_DIR/running"  # exit codes handed back from background steps
+# Shared by every step's apt/dpkg calls so parallel steps queue instead of failing on the dpkg lock
+export BOOTSTRAP_APT_LOCK="$STATE_DIR/apt.lock"
 # Config file path (default; usually a good idea to override via --config argument)
 CONFIG_FILE="$HOME/bootstrap/config.yaml"
 
@@ -51,6 +61,7 @@ DRY_RUN=1 #default
 FORCE=0
 SKIP_STEPS="${SKIP_STEPS:-}"   # numbers: "01 05"
 ONLY_STEPS="${ONLY_STEPS:-}"   # numbers: "00 02"
+JOBS="${BOOTSTRAP_JOBS:-4}"    # max steps running at once
 
 mkdir -p "$STATE_DIR" # used for checks when re-running
 
@@ -65,12 +76,15 @@ Options:
   --dry-run           Show what would run; do not execute or write stamps (default)
   --run               Actually execute steps (disables dry-run)
   --force             Run steps even if already stamped as done
+  --jobs N            Run up to N independent steps at once (default: 4; 1 = one after another)
   --help              Show help
 
 Notes:
   - By default, the script runs in dry-run mode for safety. Use --run to execute steps.
   - Step files must be named like NN_name.sh (e.g., 00_preflight.sh).
   - --only takes precedence by skipping everything not listed.
+  - Steps declare '# @deps: NN ..' and '# @locks: name ..' in their headers; steps without
+    '@deps' wait for every earlier step.
 EOF
 }
 
@@ -107,6 +121,9 @@ while [[ $# -gt 0 ]]; do
     --dry-run) DRY_RUN=1; shift ;;
     --run) DRY_RUN=0; shift ;;
     --force)   FORCE=1; shift ;;
+    --jobs)
+      [[ $# -ge 2 && "$2" =~ ^[1-9][0-9]*$ ]] || { echo "❌ ERROR: --jobs requires a positive number"; usage; exit 2; }
+      JOBS="$2"; shift 2 ;;
     --help)    usage; exit 0 ;;
     *) echo "❌ ERROR: Unknown arg: $1"; usage; exit 2 ;;
   esac
@@ -124,76 +141,290 @@ exec > >(tee -a "$LOG_FILE") 2>&1
 
 log() { echo "[$(date -Is)]" "$@"; }
 
-# ----- state helpers -----
-# Function to mark a step as completed
-# step_ok: creates a file indicating the step is done
-# step_done: checks if the step has been completed
-step_done() { [[ -f "$STATE_DIR/$1.ok" ]]; }
-mark_done() { touch "$STATE_DIR/$1.ok"; }
-
-# Run a step if not already done
-run_step() {
-  local step_file="$1"
-  
-  local step_name step_num  # added step_num
-  step_name="$(basename "$step_file" .sh)" 
+# ----- events -----
+# emit_event <event> [step] [secs] [status] [detail]
+#   event: begin | start | done | skip | dry | fail | end  (begin/end describe the whole run)
+# Each run gets a RUN_ID; the previous run's events are kept in $EVENTS_FILE.prev
+RUN_ID="$(date +%s)-$$"
+BOOTSTRAP_ENDED=0
+[[ -f "$EVENTS_FILE" ]] && mv -f "$EVENTS_FILE" "$EVENTS_FILE.prev"
+
+json_escape() { local s="${1//\\/\\\\}"; s="${s//\"/\\\"}"; printf '%s' "$s"; }
+
+emit_event() {
+  local event="$1" step="${2:-}" secs="${3:-0}" status="${4:-}" detail="${5:-}"
+  printf '{"t":%s,"ts":"%s","run":"%s","host":"%s","event":"%s","step":"%s","secs":%s,"status":"%s","detail":"%s"}\n' \
+    "$(date +%s)" "$(date -Is)" "$RUN_ID" "$(hostname)" "$event" "$step" "$secs" "$status" \
+    "$(json_escape "$detail")" >> "$EVENTS_FILE"
+}
 
-  step_num="${step_name%%_*}" # remove everything after the first underscore.
+# Make sure watchers always see an 'end' event, even if something outside a step fails
+on_exit() {
+  local rc=$?
+  if [[ $BOOTSTRAP_ENDED -eq 0 ]]; then
+    emit_event end "" "$(( $(date +%s) - ${START_TIME:-$(date +%s)} ))" "fail" "run.sh exited with status $rc"
+  fi
+}
+trap on_exit EXIT
 
+# ----- state helpers -----
+# A step's stamp ($STATE_DIR/<step>.ok) holds a fingerprint of what the step depends on:
+#   script=  the step file itself
+#   config=  the config keys it reads, declared as '# @config: .python .pipx' in its header
+#            (an empty list = reads no config; no @config line at all = the whole config file)
+#   inputs=  extra files declared as '# @inputs: path ..' (relative to the bootstrap dir, or ~/..)
+# A stamped step is skipped only while its fingerprint still matches, so re-applying an edited
+# config re-runs just the steps whose keys changed.  Empty stamps from older versions count as done.
+
+# Config keys are normalised with yq (ignores comments/formatting) once it is installed, with an
+# awk fallback that takes the raw top-level block; the stamp records which was used so a later
+# run compares like with like
+CONFIG_TOOL=awk
+have_yq_v4() { command -v yq >/dev/null 2>&1 && yq -o=json '.' "$CONFIG_FILE" >/dev/null 2>&1; }
+
+short_sha() { sha256sum | cut -c1-16; }
+
+config_keys_text() {  # $1=yq|awk, $2..=keys; prints each key and its value
+  local tool="$1" key top
+  shift
+  for key in "$@"; do
+    echo "$key"
+    if [[ "$tool" == yq ]]; then
+      yq -o=json "$key" "$CONFIG_FILE" 2>/dev/null || echo null
+    else
+      top="${key#.}"; top="${top%%.*}"
+      awk -v k="$top" '$0 ~ "^"k":" {f=1; print; next} f && /^[^ \t#]/ {f=0} f' "$CONFIG_FILE"
+    fi
+  done
+}
 
-  # Validate prefix looks like NN using regex
-  if [[ ! "$step_num" =~ ^[0-9][0-9]$ ]]; then
-    log "SKIP $step_name (invalid step prefix; expected NN_)"
-    return 0
+step_fingerprint() {  # $1=step file, $2=config tool
+  local step_file="$1" tool="$2" script_h config_h inputs_h="-" p
+  script_h="$(short_sha < "$step_file")"
+  if has_meta "$step_file" config; then
+    # shellcheck disable=SC2046
+    config_h="$(config_keys_text "$tool" $(step_meta "$step_file" config) | short_sha)"
+  else
+    config_h="$(short_sha < "$CONFIG_FILE")"
   fi
-
-  # Skip/only controls by number
-  if num_in_list "$step_num" "$SKIP_STEPS"; then
-    log "SKIP $step_name (step $step_num in --skip)"
-    return 0
+  if has_meta "$step_file" inputs; then
+    inputs_h="$(for p in $(step_meta "$step_file" inputs); do
+      p="${p/#\~/$HOME}"; [[ "$p" == /* ]] || p="$BOOTSTRAP_DIR/$p"
+      echo "$p"; cat "$p" 2>/dev/null || echo "<missing>"
+    done | short_sha)"
   fi
+  echo "script=$script_h config=$config_h inputs=$inputs_h tool=$tool"
+}
 
-  if [[ -n "$(normalize_nums "$ONLY_STEPS")" ]] && ! num_in_list "$step_num" "$ONLY_STEPS"; then
-    log "SKIP $step_name (step $step_num not in --only)"
-    return 0
+# step_status <step name> <step file>: prints "done", "legacy" or why the step has to run
+step_status() {
+  local stamp="$STATE_DIR/$1.ok" old new tool part changed=""
+  [[ -f "$stamp" ]] || { echo "not done"; return 0; }
+  old="$(<"$stamp")"
+  [[ -n "$old" ]] || { echo "legacy"; return 0; }
+  tool="${old##*tool=}"
+  new="$(step_fingerprint "$2" "${tool:-$CONFIG_TOOL}")"
+  [[ "$new" == "$old" ]] && { echo "done"; return 0; }
+  for part in script config inputs; do
+    [[ " $new " == *" $(grep -o "$part=[^ ]*" <<< "$old") "* ]] || changed+="$part,"
+  done
+  echo "${changed%,} changed"
+}
+
+mark_done() { echo "${STEP_FP[$1]}" > "$STATE_DIR/$1.ok"; }
+
+# ----- scheduling -----
+# Steps declare their ordering in header comments (see steps/*.sh):
+#   # @deps: 01 03     step numbers that must finish first (an empty list means no deps)
+#   # @locks: pyenv    named resources that only one running step may hold at a time
+#                      (pyenv: the shared pyenv/venv tree, bashrc: steps that edit ~/.bashrc or
+#                      ~/.profile, pipx ensurepath included)
+# A step without an @deps line depends on every step listed before it in the config, so new or
+# custom steps keep the old one-after-another behaviour until they opt in.
+# Deps that are not part of this run (xx_'d out, --skip, --only, not in the config) count as met.
+# Ready steps run concurrently, at most $JOBS at a time.  Each step's output goes to its own log
+# in $STEP_LOG_DIR and to the main log prefixed with [NN].  apt/dpkg calls inside the steps are
+# serialised separately with flock on $BOOTSTRAP_APT_LOCK (apt_locked in steps/_lib.sh).
+
+declare -A STEP_FILE STEP_NUM STEP_DEPS STEP_LOCKS STEP_STATE STEP_START STEP_WAVE STEP_FP NUM_TO_STEP LOCK_HOLDER
+order=()          # step names in config order
+RUNNING=0
+FAILED_RC=0
+STEP_SECS_TOTAL=0
+
+step_meta() { sed -n "s/^# @$2:[[:space:]]*//p" "$1" | head -n 1; }  # $1=file $2=deps|locks|..
+has_meta() { grep -q "^# @$2:" "$1"; }
+
+# Register a step (already filtered by xx_/--skip/--only) and apply the stamp check
+add_step() {
+  local step_file="$1" step_name step_num status
+  step_name="$(basename "$step_file" .sh)"
+  step_num="${step_name%%_*}"
+
+  if [[ ! -f "$step_file" ]]; then
+    log "❌ ERROR: step file not found: $step_file"
+    exit 1
   fi
 
+  order+=("$step_name")
+  STEP_FILE[$step_name]="$step_file"
+  STEP_NUM[$step_name]="$step_num"
+  STEP_LOCKS[$step_name]="$(step_meta "$step_file" locks)"
+  NUM_TO_STEP[$step_num]="$step_name"
+  STEP_STATE[$step_name]=pending
+  STEP_WAVE[$step_name]=0
 
   # Stamp check
-  # If FORCE is not set and step is done, skip it
-  if [[ $FORCE -eq 0 ]] && step_done "$step_name"; then
-    log "SKIP $step_name (already done)"
-    return 0
-  fi
+  # If FORCE is not set and the step's fingerprint is unchanged, skip it (counts as a met dependency)
+  STEP_FP[$step_name]="$(step_fingerprint "$step_file" "$CONFIG_TOOL")"
+  [[ $FORCE -eq 1 ]] && return 0
+  status="$(step_status "$step_name" "$step_file")"
+  case "$status" in
+    done)
+      log "SKIP $step_name (already done)"
+      emit_event skip "$step_name" 0 "" "already done"
+      STEP_STATE[$step_name]=done ;;
+    legacy)
+      log "SKIP $step_name (already done; recording fingerprint for old-style stamp)"
+      emit_event skip "$step_name" 0 "" "already done"
+      [[ $DRY_RUN -eq 1 ]] || mark_done "$step_name"
+      STEP_STATE[$step_name]=done ;;
+    "not done") ;;
+    *)
+      log "STALE $step_name ($status since last run)" ;;
+  esac
+}
+
+# Turn the declared dep numbers into step names once every step is registered
+resolve_deps() {
+  local name n prev=()
+  for name in "${order[@]}"; do
+    if has_meta "${STEP_FILE[$name]}" deps; then
+      STEP_DEPS[$name]=""
+      for n in $(normalize_nums "$(step_meta "${STEP_FILE[$name]}" deps)"); do
+        [[ -n "${NUM_TO_STEP[$n]:-}" ]] && STEP_DEPS[$name]+="${NUM_TO_STEP[$n]} "
+      done
+      STEP_DEPS[$name]="${STEP_DEPS[$name]% }"
+    else
+      STEP_DEPS[$name]="${prev[*]:-}"
+    fi
+    prev+=("$name")
+  done
+}
+
+deps_met() {
+  local dep
+  for dep in ${STEP_DEPS[$1]}; do
+    [[ "${STEP_STATE[$dep]}" == done ]] || return 1
+  done
+}
+
+locks_free() {
+  local lock
+  for lock in ${STEP_LOCKS[$1]}; do
+    [[ -z "${LOCK_HOLDER[$lock]:-}" ]] || return 1
+  done
+}
+
+start_step() {
+  local name="$1" step_file="${STEP_FILE[$1]}" num="${STEP_NUM[$1]}" dep lock wave=1
 
-  # Dry-run
+  # Dry-run: no execution, just show which wave the step would start in
   if [[ $DRY_RUN -eq 1 ]]; then
-    log "DRY  $step_name -> would run: bash \"$step_file\""
+    for dep in ${STEP_DEPS[$name]}; do
+      (( STEP_WAVE[$dep] + 1 > wave )) && wave=$(( STEP_WAVE[$dep] + 1 ))
+    done
+    STEP_WAVE[$name]=$wave
+    STEP_STATE[$name]=done
+    log "DRY  $name -> would run: bash \"$step_file\" (wave $wave, after: ${STEP_DEPS[$name]:-nothing})"
+    emit_event dry "$name"
     return 0
   fi
 
-  # From prior version
-  #if step_done "$step_name"; then
-  #  log "SKIP $step_name (already done)"
-  #  return 0 # return success 0 to indicate step is done
-  #fi
+  for lock in ${STEP_LOCKS[$name]}; do LOCK_HOLDER[$lock]="$name"; done
+  STEP_STATE[$name]=running
+  STEP_START[$name]=$(date +%s)
+  RUNNING=$((RUNNING + 1))
+  rm -f "$RUN_DIR/$name.rc"
+
+  log "RUN  $name (log: $STEP_LOG_DIR/$name.log)"
+  emit_event start "$name"
+  (
+    set +eu
+    # Pick up PATH/profile changes made by earlier steps; avoid failing the bootstrap if bashrc
+    # has interactive-only bits
+    # shellcheck disable=SC1090
+    [[ -f "$HOME/.bashrc" ]] && source "$HOME/.bashrc" >/dev/null 2>&1
+    bash "$step_file" 2>&1 | tee "$STEP_LOG_DIR/$name.log" | sed -u "s/^/[$num] /"
+    echo "${PIPESTATUS[0]}" > "$RUN_DIR/$name.rc.tmp" && mv "$RUN_DIR/$name.rc.tmp" "$RUN_DIR/$name.rc"
+  ) &
+}
 
-  log "RUN  $step_name" # run the step command
-  bash "$step_file" # execute the step script file
+# Collect finished steps: stamp + event on success, remember the exit code on failure
+reap_steps() {
+  local name rc secs lock
+  for name in "${order[@]}"; do
+    [[ "${STEP_STATE[$name]}" == running && -f "$RUN_DIR/$name.rc" ]] || continue
+    rc="$(<"$RUN_DIR/$name.rc")"
+    rm -f "$RUN_DIR/$name.rc"
+    secs=$(( $(date +%s) - STEP_START[$name] ))
+    STEP_SECS_TOTAL=$(( STEP_SECS_TOTAL + secs ))
+    RUNNING=$((RUNNING - 1))
+    for lock in ${STEP_LOCKS[$name]}; do LOCK_HOLDER[$lock]=""; done
+
+    if [[ "$rc" -ne 0 ]]; then
+      STEP_STATE[$name]=failed
+      FAILED_RC="$rc"
+      log "❌ FAIL $name (exit $rc, see $STEP_LOG_DIR/$name.log)"
+      emit_event fail "$name" "$secs" "fail" "exit $rc"
+      continue
+    fi
+
+    STEP_STATE[$name]=done
+    mark_done "$name" # mark the step as completed
+    log "DONE $name (${secs}s)"
+    emit_event done "$name" "$secs" "ok"
+  done
+}
 
-  # added here:
-  # After each step, re-source bashrc so any PATH/profile changes take effect
-  if [[ -f "$HOME/.bashrc" ]]; then
-    set +u
-    # shellcheck disable=SC1090
-    # Avoid failing the bootstrap if bashrc has interactive-only bits
-    source "$HOME/.bashrc" || true
-    set -u
-    log "SOURCED ~/.bashrc to refresh environment for subsequent steps"
-  fi
-  
-  mark_done "$step_name" # mark the step as completed
-  log "DONE $step_name"
+# Start every ready step (deps done, locks free, below $JOBS) until nothing is left.
+# After a failure no new steps are started; running ones finish, then run.sh exits with the code.
+run_schedule() {
+  local name started waiting
+  while :; do
+    reap_steps
+
+    started=0
+    if [[ $FAILED_RC -eq 0 ]]; then
+      for name in "${order[@]}"; do
+        [[ $RUNNING -lt $JOBS ]] || break
+        if [[ "${STEP_STATE[$name]}" == pending ]] && deps_met "$name" && locks_free "$name"; then
+          start_step "$name"
+          started=$((started + 1))
+        fi
+      done
+    fi
+
+    if [[ $RUNNING -gt 0 ]]; then
+      sleep 0.2
+      continue
+    fi
+    [[ $started -gt 0 ]] && continue  # dry-run marks steps done immediately
+
+    waiting=""
+    for name in "${order[@]}"; do
+      [[ "${STEP_STATE[$name]}" == pending ]] && waiting+="$name "
+    done
+    if [[ $FAILED_RC -ne 0 ]]; then
+      [[ -n "$waiting" ]] && log "Not started after failure: ${waiting% }"
+      exit "$FAILED_RC"
+    fi
+    if [[ -n "$waiting" ]]; then
+      log "❌ ERROR: cannot schedule ${waiting% } (check @deps for a cycle)"
+      exit 1
+    fi
+    return 0
+  done
 }
 
 mode="EXECUTE"
@@ -214,6 +445,10 @@ log "Config    : $CONFIG_FILE"
 log "Mode      : $mode"
 log "Skip nums : ${SKIP_STEPS:-<none>}"
 log "Only nums : ${ONLY_STEPS:-<none>}"
+log "Jobs      : $JOBS"
+log "Step logs : $STEP_LOG_DIR"
+log "Events    : $EVENTS_FILE"
+emit_event begin "" 0 "" "$mode"
 
 
 #log "=== BOOTSTRAP START ==="
@@ -242,6 +477,7 @@ for step_file in "${steps[@]}"; do
   # Skip commented out entries (lines starting with xx_)
   if [[ "$step_file" =~ ^xx_ ]]; then
     log "SKIP ${step_file#\#} (commented out with xx_ pattern in config)"
+    emit_event skip "${step_file%.sh}" 0 "" "xx_ in config"
     continue
   fi
   
@@ -257,11 +493,13 @@ for step_file in "${steps[@]}"; do
   # Apply skip/only filters
   if num_in_list "$step_num" "$SKIP_STEPS"; then
     log "SKIP $step_name (step $step_num in --skip)"
+    emit_event skip "$step_name" 0 "" "in --skip"
     continue
   fi
   
   if [[ -n "$(normalize_nums "$ONLY_STEPS")" ]] && ! num_in_list "$step_num" "$ONLY_STEPS"; then
     log "SKIP $step_name (step $step_num not in --only)"
+    emit_event skip "$step_name" 0 "" "not in --only"
     continue
   fi
   
@@ -276,11 +514,15 @@ if [[ ${#filtered_steps[@]} -eq 0 ]]; then
 fi
 
 steps=("${filtered_steps[@]}")
+mkdir -p "$STEP_LOG_DIR" "$RUN_DIR"
 shopt -u nullglob # reset to default behavior.  see above note
 
+have_yq_v4 && CONFIG_TOOL=yq
 for step in "${steps[@]}"; do
-  run_step "$step"
+  add_step "$step"
 done
+resolve_deps
+run_schedule
 
 # Calculate duration
 END_TIME=$(date +%s)
@@ -293,7 +535,10 @@ log "=== ✅ BOOTSTRAP COMPLETE ==="
 log "Start time : $START_TIME_HUMAN"
 log "End time   : $END_TIME_HUMAN"
 log "Duration   : ${MINUTES}m ${SECONDS}s"
+log "Step time  : ${STEP_SECS_TOTAL}s summed over steps (--jobs $JOBS)"
 log "============================="
+emit_event end "" "$DURATION" "ok"
+BOOTSTRAP_ENDED=1
 log ""
 log "👉 run source ~/.bashrc"
 log ""
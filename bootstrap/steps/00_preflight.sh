@@ -7,6 +7,10 @@
 # To do: implement some of the checks from subsequent steps into pre-flight checks
 # and allow some of those dependencies to be resolved here.
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps:
+# @config:
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; } 
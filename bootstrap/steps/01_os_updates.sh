@@ -11,6 +11,10 @@
 #  - Try to suppress the endless stream of log events from OS updates 
 #  - Support non apt-get package managers for non Ubuntu flavors
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 00
+# @config: .dpkg .snap
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
@@ -11,12 +11,21 @@
 # - a lot of help from claude and codex for some of this.  need to review and build some intuition 
 # around some of the patterns/techniques used!
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @locks: bashrc
+# @config: .git
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -194,8 +203,8 @@ require_sudo
 # Ensure git exists
 if ! have git; then
   log "Installing git..."
-  sudo -n apt-get update -y
-  sudo -n apt-get install -y git
+  apt_locked sudo -n apt-get update -y
+  apt_locked sudo -n apt-get install -y git
 else
   log "git already installed"
 fi
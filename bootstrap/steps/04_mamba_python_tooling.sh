@@ -7,12 +7,21 @@
 
 
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @locks: bashrc
+# @config: .python .bundle
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked, bundle_init, bundle_lock)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -30,7 +39,7 @@ ensure_yq() {
 
 ensure_apt_pkg() {
   local pkg="$1"
-  dpkg -s "$pkg" >/dev/null 2>&1 || sudo -n apt-get install -y "$pkg"
+  dpkg -s "$pkg" >/dev/null 2>&1 || apt_locked sudo -n apt-get install -y "$pkg"
 }
 
 # suggested by claude
@@ -66,10 +75,15 @@ install_miniforge3() {
   local miniforge_url="https://github.com/conda-forge/miniforge/releases/latest/download/Miniforge3-Linux-x86_64.sh"
   local installer_path="/tmp/Miniforge3-Linux-x86_64.sh"
   
-  log "Downloading miniforge3 installer from $miniforge_url"
-  if ! curl -fsSL "$miniforge_url" -o "$installer_path"; then
-    log "❌ ERROR: Failed to download miniforge3 installer"
-    return 1
+  if [[ -n "$BUNDLE_DIR" && -f "$BUNDLE_DIR/miniforge/Miniforge3-Linux-$(uname -m).sh" ]]; then
+    log "Using miniforge3 installer from bundle"
+    cp "$BUNDLE_DIR/miniforge/Miniforge3-Linux-$(uname -m).sh" "$installer_path"
+  else
+    log "Downloading miniforge3 installer from $miniforge_url"
+    if ! curl -fsSL "$miniforge_url" -o "$installer_path"; then
+      log "❌ ERROR: Failed to download miniforge3 installer"
+      return 1
+    fi
   fi
   
   log "Running miniforge3 installer..."
@@ -105,7 +119,17 @@ ensure_apt
 ensure_yq
 require_sudo
 
-sudo -n apt-get update -y
+apt_locked sudo -n apt-get update -y
+
+# Extract mamba configuration from config file
+config_file="${CONFIG_FILE:?ERROR: CONFIG_FILE environment variable not available}"
+bundle_init
+
+# Local conda channel from the bundle replaces conda-forge when present
+CONDA_CHANNEL_ARGS=()
+if [[ -n "$BUNDLE_DIR" && -d "$BUNDLE_DIR/conda" ]]; then
+  CONDA_CHANNEL_ARGS=(--offline --override-channels -c "file://$BUNDLE_DIR/conda")
+fi
 
 if ! command -v mamba >/dev/null 2>&1 && ! command -v micromamba >/dev/null 2>&1; then
   install_miniforge3
@@ -113,9 +137,6 @@ else
   log "⚠️  mamba or micromamba already installed, skipping installation"
 fi
 
-# Extract mamba configuration from config file
-config_file="${CONFIG_FILE:?ERROR: CONFIG_FILE environment variable not available}"
-
 mamba_env=$(yq -r '.python.mamba_env // "default"' "$config_file" 2>/dev/null || echo "default")
 mamba_python_version=$(yq -r '.python.mamba_python_version // "3.11"' "$config_file" 2>/dev/null || echo "3.11")
 
@@ -134,7 +155,7 @@ if conda env list | grep -q "^$mamba_env "; then
   log "Mamba environment '$mamba_env' already exists"
 else
   log "Creating mamba environment '$mamba_env' with Python $mamba_python_version..."
-  mamba create -y -n "$mamba_env" "python=$mamba_python_version"
+  mamba create -y "${CONDA_CHANNEL_ARGS[@]}" -n "$mamba_env" "python=$mamba_python_version"
 fi
 
 # Activate the mamba environment
@@ -143,6 +164,7 @@ conda activate "$mamba_env"
 
 # Install pip packages from config
 log "Installing pip packages..."
+lock="$(bundle_lock python)"
 pip_packages=$(yq -r '.python.pip_install[]?' "$config_file" 2>/dev/null)
 
 if [[ -z "$pip_packages" ]]; then
@@ -151,7 +173,7 @@ else
   while IFS= read -r package; do
     if [[ -n "$package" && "$package" != "null" ]]; then
       log "Installing package: $package"
-      pip install "$package"
+      pip install ${lock:+-c "$lock"} "$package"
     fi
   done <<< "$pip_packages"
   log "✅ Pip packages installed"
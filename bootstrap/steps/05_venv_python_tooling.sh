@@ -5,12 +5,21 @@
 # To do:
 #  - 
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 03 04
+# @locks: bashrc
+# @config: .python .pipx .bundle
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked, bundle_init, bundle_lock)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -28,7 +37,7 @@ ensure_yq() {
 
 ensure_apt_pkg() {
   local pkg="$1"
-  dpkg -s "$pkg" >/dev/null 2>&1 || sudo -n apt-get install -y "$pkg"
+  dpkg -s "$pkg" >/dev/null 2>&1 || apt_locked sudo -n apt-get install -y "$pkg"
 }
 
 # suggeted by claude
@@ -67,11 +76,12 @@ ensure_apt
 ensure_yq
 require_sudo
 
-sudo -n apt-get update -y
+apt_locked sudo -n apt-get update -y
 
 # Parse python version/ppa from config.yaml with safe fallbacks
 # Tested for and support use of python 3.7 even in ubuntu 24.04 which i need for legacy stuff
 config_file="${CONFIG_FILE:?ERROR: CONFIG_FILE environment variable not available}"
+bundle_init
 
 python_version="default"
 python_ppa=""
@@ -109,19 +119,19 @@ else
 
     log "Adding PPA $python_ppa for python$python_version"
     ensure_apt_pkg software-properties-common # suggested by claude
-    if sudo -n add-apt-repository -y "ppa:$python_ppa"; then
-      sudo -n apt-get update -y
+    if apt_locked sudo -n add-apt-repository -y "ppa:$python_ppa"; then
+      apt_locked sudo -n apt-get update -y
     else
       log "Failed to add PPA $python_ppa; proceeding without it"
     fi
   fi
 
-  if sudo -n apt-get install -y "python$python_version" "python$python_version-venv" "python$python_version-distutils" "python$python_version-pip"; then
+  if apt_locked sudo -n apt-get install -y "python$python_version" "python$python_version-venv" "python$python_version-distutils" "python$python_version-pip"; then
     PYTHON_BIN="python$python_version"
     log "Successfully installed python$python_version"
   else
     log "Install with python$python_version-pip failed; retrying without distro pip package"
-    if sudo -n apt-get install -y "python$python_version" "python$python_version-venv" "python$python_version-distutils"; then
+    if apt_locked sudo -n apt-get install -y "python$python_version" "python$python_version-venv" "python$python_version-distutils"; then
       PYTHON_BIN="python$python_version"
       log "Installed python$python_version without distro pip; bootstrapping pip via ensurepip"
       "$PYTHON_BIN" -m ensurepip --upgrade >/dev/null 2>&1 || true
@@ -181,7 +191,7 @@ if [[ -d "$VENV_DIR" && -f "$VENV_DIR/bin/activate" ]]; then
     exit 1
   }
   log "Virtual environment activated successfully"
-  uv pip install --upgrade pip setuptools wheel
+  uv pip install "${UV_BUNDLE_ARGS[@]}" --upgrade pip setuptools wheel
   log "pip, setuptools, wheel upgraded in venv."
 
   # Install pip packages from config_file
@@ -195,7 +205,8 @@ if [[ -d "$VENV_DIR" && -f "$VENV_DIR/bin/activate" ]]; then
     log "Found ${#pip_lines[@]} pip packages"
     if [[ ${#pip_lines[@]} -gt 0 && -n "${pip_lines[0]}" ]]; then
       log "Installing pip packages in one batch: ${pip_lines[*]}"
-      uv pip install "${pip_lines[@]}"
+      lock="$(bundle_lock "$VENV_DIR/bin/python")"
+      uv pip install "${UV_BUNDLE_ARGS[@]}" ${lock:+-c "$lock"} "${pip_lines[@]}"
     else
       log "No pip_install packages listed in $config_file."
     fi
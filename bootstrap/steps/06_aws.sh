@@ -6,12 +6,20 @@
 # To do:
 # - For simplicity is there a "safe" way to transport the .aws/credentials file? (and not need IAM role)
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @config: .aws
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -28,7 +36,7 @@ ensure_apt() {
 
 ensure_apt_pkg() {
   local pkg="$1"
-  dpkg -s "$pkg" >/dev/null 2>&1 || sudo -n apt-get install -y "$pkg"
+  dpkg -s "$pkg" >/dev/null 2>&1 || apt_locked sudo -n apt-get install -y "$pkg"
 }
 
 awscli_is_v2() {
@@ -41,7 +49,7 @@ install_or_update_awscli_v2() {
   ensure_apt
 
   log "Checking for prerequisites..."
-  sudo -n apt-get update -y
+  apt_locked sudo -n apt-get update -y
   ensure_apt_pkg curl
   ensure_apt_pkg unzip
 
@@ -2,6 +2,10 @@
 
 # Misc environment set-ups on the remote instance
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @config: .dirs
+
 set -euo pipefail
 
 
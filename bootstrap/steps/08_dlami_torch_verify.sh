@@ -7,6 +7,10 @@
 # To do:
 #  - will this work with mamba ??
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @config:
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
@@ -14,11 +14,20 @@
 #  - Transfer-in credentials (via aws secrets?) to avoid the need for interactive authentication
 #  - How to avoid the need to 'source ~/.bashrc' upon completion
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 01
+# @locks: bashrc
+# @config:
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   # non-interactive sudo check (prevents the script from hanging on a password prompt)
   if ! sudo -n true 2>/dev/null; then
@@ -50,8 +59,8 @@ require_sudo
 
 if ! have node; then
   log "Node.js not found, installing..."
-  sudo apt-get update -qq
-  sudo apt-get install -y nodejs npm
+  apt_locked sudo apt-get update -qq
+  apt_locked sudo apt-get install -y nodejs npm
 else
   log "Node.js already installed"
 fi
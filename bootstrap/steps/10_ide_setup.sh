@@ -23,12 +23,21 @@
 #  - need to understand how stable the hardcoded url is for the vs-code curl
 #  - currently defaults to use of venv.  Update to set-up in mamba too (or optionally)
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 04 05
+# @locks: pyenv bashrc
+# @config: .python
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -84,8 +93,8 @@ else
   if ! have python3; then
     log "python3 not found, installing..."
     require_sudo
-    sudo apt-get update -qq
-    sudo apt-get install -y python3 python3-pip python3-venv
+    apt_locked sudo apt-get update -qq
+    apt_locked sudo apt-get install -y python3 python3-pip python3-venv
   else
     log "python3 already installed"
   fi
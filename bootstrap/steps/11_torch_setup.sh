@@ -19,12 +19,21 @@
 # To do:
 #  Currently uses venv only.  Update to use mamba too (or optionally)
 
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 03 04 05
+# @locks: pyenv
+# @config: .python .bundle
+# @inputs: steps/_lib.sh
+
 set -euo pipefail
 
 log() { echo "[$(date -Is)]" "$@"; }
 
 have() { command -v "$1" >/dev/null 2>&1; }
 
+# shared step helpers (apt_locked, bundle_init, bundle_lock)
+source "$(dirname "${BASH_SOURCE[0]}")/_lib.sh"
+
 require_sudo() {
   if ! sudo -n true 2>/dev/null; then
     log "❌ ERROR: sudo would prompt for password (non-interactive required)."
@@ -38,12 +47,13 @@ ensure_apt() {
 
 ensure_apt_pkg() {
   local pkg="$1"
-  dpkg -s "$pkg" >/dev/null 2>&1 || sudo -n apt-get install -y "$pkg"
+  dpkg -s "$pkg" >/dev/null 2>&1 || apt_locked sudo -n apt-get install -y "$pkg"
 }
 
 log "=== STARTING TORCH SETUPS ==="
 
 config_file="${CONFIG_FILE:?ERROR: CONFIG_FILE environment variable not available}"
+bundle_init
 
 # Check if mamba is installed (command or directory)
 USE_MAMBA=false
@@ -79,13 +89,27 @@ if [[ "$USE_MAMBA" == "true" ]]; then
   # Activate mamba environment
   conda activate "$MAMBA_ENV"
   
+  # Local conda channel from the bundle replaces the pytorch/nvidia channels when present
+  bundle_channel=()
+  if [[ -n "$BUNDLE_DIR" && -d "$BUNDLE_DIR/conda" ]]; then
+    bundle_channel=(--offline --override-channels -c "file://$BUNDLE_DIR/conda")
+  fi
+
   # Detect GPU for appropriate pytorch channel
   if have nvidia-smi; then
     log "NVIDIA GPU detected, installing PyTorch with CUDA support from conda-forge"
-    mamba install -y pytorch torchvision torchaudio pytorch-cuda -c pytorch -c nvidia
+    if [[ ${#bundle_channel[@]} -gt 0 ]]; then
+      mamba install -y pytorch torchvision torchaudio pytorch-cuda "${bundle_channel[@]}"
+    else
+      mamba install -y pytorch torchvision torchaudio pytorch-cuda -c pytorch -c nvidia
+    fi
   else
     log "No NVIDIA GPU detected, installing CPU-only PyTorch from conda-forge"
-    mamba install -y pytorch torchvision torchaudio cpuonly -c pytorch
+    if [[ ${#bundle_channel[@]} -gt 0 ]]; then
+      mamba install -y pytorch torchvision torchaudio cpuonly "${bundle_channel[@]}"
+    else
+      mamba install -y pytorch torchvision torchaudio cpuonly -c pytorch
+    fi
   fi
   
   log "Verifying torch install..."
@@ -187,6 +211,24 @@ detect_cuda_variant_auto() {
   fi
 }
 
+# The offline bundle records the torch variants it carries (bundle.json spec.torch_variants). A
+# CUDA wheel runs on any driver at least as new as its CUDA version, so take the newest bundled
+# variant the detected driver can run (e.g. cu124 on a CUDA 13 driver) rather than go online.
+bundled_variant_for() {
+  local want="$1" v best=""
+  [[ -n "$BUNDLE_DIR" ]] || { echo "$want"; return 0; }
+  for v in $(yq -r '.spec.torch_variants[]' "$BUNDLE_DIR/bundle.json" 2>/dev/null || true); do
+    if [[ "$v" == "$want" ]]; then
+      echo "$v"
+      return 0
+    fi
+    [[ "$want" == cu* && "$v" == cu* ]] || continue
+    (( ${v#cu} <= ${want#cu} )) || continue
+    if [[ -z "$best" ]] || (( ${v#cu} > ${best#cu} )); then best="$v"; fi
+  done
+  echo "${best:-$want}"
+}
+
 torch_index_url_for_variant() {
   local v="$1"
   case "$v" in
@@ -203,7 +245,7 @@ torch_index_url_for_variant() {
 ensure_apt
 require_sudo
 
-sudo -n apt-get update -y
+apt_locked sudo -n apt-get update -y
 ensure_apt_pkg "$TORCH_PYTHON" || true
 ensure_apt_pkg python3-venv
 ensure_apt_pkg python3-pip
@@ -235,6 +277,11 @@ pip install --upgrade pip setuptools wheel >/dev/null
 variant="$TORCH_VARIANT"
 if [[ "$variant" == "auto" ]]; then
   variant="$(detect_cuda_variant_auto)"
+  bundled="$(bundled_variant_for "$variant")"
+  if [[ "$bundled" != "$variant" ]]; then
+    log "Driver supports $variant; using $bundled from the offline bundle"
+    variant="$bundled"
+  fi
 fi
 
 log "Selected torch variant: $variant"
@@ -252,7 +299,13 @@ else
 fi
 
 log "Installing: $torch_spec $tv_spec $ta_spec"
-if [[ -n "$idx_url" ]]; then
+torch_bundle="${BUNDLE_DIR:+$BUNDLE_DIR/torch/$variant}"
+if [[ -n "$torch_bundle" && -d "$torch_bundle" ]]; then
+  log "Installing torch $variant wheels from bundle: $torch_bundle"
+  lock="$(bundle_lock python "$torch_bundle")"
+  uv pip install --no-index --find-links "$torch_bundle" --find-links "$BUNDLE_DIR/wheels" ${lock:+-c "$lock"} \
+    "$torch_spec" "$tv_spec" "$ta_spec"
+elif [[ -n "$idx_url" ]]; then
   uv pip install --index-url "$idx_url" "$torch_spec" "$tv_spec" "$ta_spec"
 else
   # Fallback (but shouldn’t happen...)
@@ -261,7 +314,7 @@ fi
 
 if [[ -n "$EXTRA_PIP_PACKAGES" ]]; then
   log "Installing extra packages: $EXTRA_PIP_PACKAGES"
-  uv pip install $EXTRA_PIP_PACKAGES
+  uv pip install "${UV_BUNDLE_ARGS[@]}" $EXTRA_PIP_PACKAGES
 fi
 
 # Original verification script
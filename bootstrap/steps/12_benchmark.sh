@@ -0,0 +1,216 @@
+#!/usr/bin/env bash
+
+# Short, fixed benchmark of the machine, written as JSON for price-performance ranking:
+#  - cpu single core: sha256 throughput (MB/s) in one process
+#  - cpu multi core:  the same in one process per vCPU, summed
+#  - memory:          large buffer copy (GB/s copied)
+#  - disk:            sequential write (fsync'd) and uncached read of a file on the root volume
+#  - gpu:             torch fp16 matmul (TFLOPS), only when torch sees a CUDA device
+#
+# Results go to $BENCH_OUT (default ~/.bootstrap_state/benchmark.json).  ec2_launch_bootstrap.py -w
+# (and fleet mode) copies the file back to outputs/benchmarks/, and ec2_specs_price.py --bench merges
+# it into the spec/price table as throughput per dollar (see src/benchmark_results.py).
+#
+# Needs only bash + python3, so it also runs on a local Linux box without any config:
+#   bash bootstrap/steps/12_benchmark.sh
+#   BENCH_OUT=/tmp/bench.json BENCH_DISK_MB=256 bash bootstrap/steps/12_benchmark.sh
+#
+# Runs after every other step (so installs are not competing for the machine) and re-runs only
+# when forced or when its config changes.
+
+# Step metadata for run.sh (scheduling + re-run hashing):
+# @deps: 00 01 02 03 04 05 06 07 08 09 10 11
+# @config: .benchmark
+
+set -euo pipefail
+
+log() { echo "[$(date -Is)]" "$@"; }
+have() { command -v "$1" >/dev/null 2>&1; }
+
+config_value() {  # $1=yq path, $2=default; config is optional for local runs
+  local value=""
+  if [[ -n "${CONFIG_FILE:-}" && -f "${CONFIG_FILE}" ]] && have yq; then
+    value="$(yq "$1 // \"\"" "$CONFIG_FILE" 2>/dev/null || true)"
+  fi
+  [[ -n "$value" && "$value" != "null" ]] && echo "$value" || echo "$2"
+}
+
+BENCH_OUT="${BENCH_OUT:-${STATE_DIR:-$HOME/.bootstrap_state}/benchmark.json}"
+BENCH_DISK_MB="${BENCH_DISK_MB:-$(config_value '.benchmark.disk_mb' 1024)}"
+BENCH_SECONDS="${BENCH_SECONDS:-$(config_value '.benchmark.seconds' 3)}"
+BENCH_DIR="${BENCH_DIR:-$HOME}"  # root EBS volume on a fresh instance
+
+log "=== STARTING BENCHMARK ==="
+
+have python3 || { log "❌ ERROR: python3 not found."; exit 2; }
+
+# Instance type from IMDSv2 when on EC2 (1s timeouts, so a local box falls through quickly)
+instance_type="local"
+if have curl; then
+  token="$(curl -s -m 1 -X PUT http://169.254.169.254/latest/api/token \
+    -H 'X-aws-ec2-metadata-token-ttl-seconds: 60' 2>/dev/null || true)"
+  if [[ -n "$token" ]]; then
+    instance_type="$(curl -s -m 1 -H "X-aws-ec2-metadata-token: $token" \
+      http://169.254.169.254/latest/meta-data/instance-type 2>/dev/null || echo local)"
+  fi
+fi
+log "Instance type: $instance_type"
+
+# torch for the gpu part: DLAMI environment when present (as 08_dlami_torch_verify.sh)
+DLAMI_PYTORCH_ENV="/opt/pytorch/bin/activate"
+if [[ -f "$DLAMI_PYTORCH_ENV" ]]; then
+  # shellcheck disable=SC1090
+  source "$DLAMI_PYTORCH_ENV"
+fi
+
+mkdir -p "$(dirname "$BENCH_OUT")"
+log "disk test: ${BENCH_DISK_MB} MB in $BENCH_DIR, ${BENCH_SECONDS}s per cpu/memory/gpu test"
+
+BENCH_INSTANCE_TYPE="$instance_type" BENCH_OUT="$BENCH_OUT" BENCH_DISK_MB="$BENCH_DISK_MB" \
+BENCH_SECONDS="$BENCH_SECONDS" BENCH_DIR="$BENCH_DIR" python3 - <<'PY'
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import socket
+import sys
+import time
+from datetime import datetime, timezone
+
+SECONDS = float(os.environ["BENCH_SECONDS"])
+DISK_MB = int(os.environ["BENCH_DISK_MB"])
+MiB = 1 << 20
+BLOCK = os.urandom(MiB)
+
+
+def log(msg):
+    print(f"[{datetime.now().astimezone().isoformat(timespec='seconds')}] {msg}", flush=True)
+
+
+def sha256_mbps(seconds):
+    done, t0 = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - t0) < seconds:
+        for _ in range(16):
+            hashlib.sha256(BLOCK).digest()
+        done += 16
+    return done / elapsed
+
+
+def cpu():
+    single = sha256_mbps(SECONDS)
+    workers = os.cpu_count() or 1
+    with mp.get_context("fork").Pool(workers) as pool:
+        multi = sum(pool.map(sha256_mbps, [SECONDS] * workers))
+    return {"cpu_single_mbps": round(single, 1), "cpu_multi_mbps": round(multi, 1)}
+
+
+def memory():
+    size = 256 * MiB
+    src, dst = bytearray(size), bytearray(size)
+    dst[:] = src  # touch the pages before timing
+    copies, t0 = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - t0) < SECONDS:
+        dst[:] = src
+        copies += 1
+    return {"mem_copy_gbps": round(copies * size / elapsed / 1e9, 2)}
+
+
+def disk():
+    path = os.path.join(os.environ["BENCH_DIR"], f".bench_{os.getpid()}.tmp")
+    chunk = BLOCK * 4
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        t0 = time.perf_counter()
+        for _ in range(DISK_MB // 4):
+            os.write(fd, chunk)
+        os.fsync(fd)
+        write = time.perf_counter() - t0
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)  # read back from the volume, not cache
+        os.close(fd)
+
+        fd = os.open(path, os.O_RDONLY)
+        t0 = time.perf_counter()
+        while os.read(fd, 4 * MiB):
+            pass
+        read = time.perf_counter() - t0
+        os.close(fd)
+    finally:
+        if os.path.exists(path):
+            os.unlink(path)
+    mb = DISK_MB // 4 * 4
+    return {"disk_write_mbps": round(mb / write, 1), "disk_read_mbps": round(mb / read, 1)}
+
+
+def gpu():
+    try:
+        import torch
+    except ImportError:
+        return {}, "torch not installed"
+    if not torch.cuda.is_available():
+        return {}, "no CUDA device"
+    n = 4096
+    a = torch.randn(n, n, device="cuda", dtype=torch.float16)
+    b = torch.randn(n, n, device="cuda", dtype=torch.float16)
+    for _ in range(3):
+        a @ b
+    torch.cuda.synchronize()
+    loops, t0 = 0, time.perf_counter()
+    while (elapsed := time.perf_counter() - t0) < SECONDS:
+        for _ in range(10):
+            a @ b
+        torch.cuda.synchronize()
+        loops += 10
+    return ({"gpu_fp16_tflops": round(2 * n ** 3 * loops / elapsed / 1e12, 2),
+             "gpu_count": torch.cuda.device_count()}, torch.cuda.get_device_name(0))
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith(("model name", "Model")):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+started = time.perf_counter()
+results = {}
+for name, test in (("cpu", cpu), ("memory", memory), ("disk", disk)):
+    t0 = time.perf_counter()
+    part = test()
+    results.update(part)
+    log(f"{name:<7} {time.perf_counter() - t0:5.1f}s  {part}")
+gpu_results, gpu_note = gpu()
+results.update(gpu_results)
+log(f"gpu     {gpu_note}  {gpu_results}")
+
+report = {
+    "schema": 1,
+    "instance_type": os.environ["BENCH_INSTANCE_TYPE"],
+    "host": socket.gethostname(),
+    "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    "arch": platform.machine(),
+    "cpu_model": cpu_model(),
+    "vcpus": os.cpu_count(),
+    "gpu": gpu_note if gpu_results else None,
+    "python": sys.version.split()[0],
+    "seconds": round(time.perf_counter() - started, 1),
+    "results": results,
+}
+tmp = os.environ["BENCH_OUT"] + ".tmp"
+with open(tmp, "w") as f:
+    json.dump(report, f, indent=1)
+os.replace(tmp, os.environ["BENCH_OUT"])
+PY
+
+log "Results: $BENCH_OUT"
+log "============================"
+log "✅ benchmark completed"
+log "============================"
+
+log ""
+log "=== ▶️ === "
+log ""
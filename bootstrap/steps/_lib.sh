@@ -0,0 +1,38 @@
+# Helpers shared by the step scripts; sourced, not run (run.sh only runs the steps named
+# in the config).  Steps that source it list it under '# @inputs:' so edits here re-run them.
+
+# apt/dpkg allow only one user at a time; when run.sh runs steps in parallel (--jobs) it exports
+# BOOTSTRAP_APT_LOCK and every apt call in every step queues on it instead of failing
+apt_locked() {
+  if [[ -n "${BOOTSTRAP_APT_LOCK:-}" ]] && command -v flock >/dev/null 2>&1; then
+    flock "$BOOTSTRAP_APT_LOCK" "$@"
+  else
+    "$@"
+  fi
+}
+
+# Offline package bundle (scripts/ec2_bootstrap_bundle.py).  When the config's bundle.dir (default
+# ~/bootstrap/bundle) holds one, pip/pipx/uv install from its wheels with no index access.
+# Needs $config_file and log() from the step.
+bundle_init() {
+  local dir
+  dir=$(yq -r '.bundle.dir // ""' "$config_file" 2>/dev/null || echo "")
+  [[ -z "$dir" || "$dir" == "null" ]] && dir="$HOME/bootstrap/bundle"
+  BUNDLE_DIR="${dir/#\~/$HOME}"
+  UV_BUNDLE_ARGS=()
+  if [[ -f "$BUNDLE_DIR/bundle.json" ]]; then
+    log "Installing from offline bundle: $BUNDLE_DIR"
+    export PIP_NO_INDEX=1 PIP_FIND_LINKS="$BUNDLE_DIR/wheels"
+    UV_BUNDLE_ARGS=(--no-index --find-links "$BUNDLE_DIR/wheels")
+  else
+    BUNDLE_DIR=""
+  fi
+}
+
+# Bundle lock (exact pins, used as constraints) matching a python binary; empty if none
+bundle_lock() {
+  local dir="${2:-$BUNDLE_DIR}" pyver
+  [[ -n "$BUNDLE_DIR" ]] || return 0
+  pyver="$("$1" -c 'import sys; print("%d.%d" % sys.version_info[:2])' 2>/dev/null)" || return 0
+  if [[ -f "$dir/requirements-py$pyver.lock" ]]; then echo "$dir/requirements-py$pyver.lock"; fi
+}
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Query the aws_log() history (~/logs/aws/aws_cli.log + compressed archives) by
+# time window, event and text.  Archives are only partly decompressed, using
+# their .idx sidecars (see src/aws_log_archive.py).
+#
+# --event and --grep are case-insensitive substring matches on the event name /
+# whole entry.
+#
+# Usage examples:
+#   python aws_log_query.py --event launch --grep g5 --month 2026-09
+#   python aws_log_query.py --event specs_price --grep t3a.large --last 7d
+#   python aws_log_query.py --since 2026-10-01 --until 2026-10-15 --count
+#   python aws_log_query.py --rotate      # archive the live log now
+# -----------------------------------------------------------------------------
+
+import argparse
+import re
+import sys
+from collections import Counter
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+from aws_log_archive import LOG_TZ
+from aws_log_archive import log_lock
+from aws_log_archive import query
+from aws_log_archive import rotate
+from aws_logger import AWSLOGS
+
+
+def parse_when(value: str) -> int:
+    """YYYY-MM-DD[THH:MM[:SS]] in the log's timezone -> epoch seconds."""
+    return int(datetime.fromisoformat(value).replace(tzinfo=LOG_TZ).timestamp())
+
+
+def parse_last(value: str) -> int:
+    m = re.fullmatch(r"(\d+)([mhdw])", value)
+    if not m:
+        raise argparse.ArgumentTypeError(
+            f"expected eg 90m, 12h, 7d or 2w, got {value!r}"
+        )
+    unit = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}[m.group(2)]
+    return int(
+        (
+            datetime.now(LOG_TZ) - timedelta(**{unit: int(m.group(1))})
+        ).timestamp()
+    )
+
+
+def month_window(value: str) -> tuple[int, int]:
+    start = datetime.strptime(value, "%Y-%m").replace(tzinfo=LOG_TZ)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return int(start.timestamp()), int(end.timestamp())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Search the aws_log history, including archives"
+    )
+    ap.add_argument(
+        "--event", help="event name contains (eg launch, specs_price)"
+    )
+    ap.add_argument(
+        "--grep", help="entry text contains (eg g5, t3a.large, an instance id)"
+    )
+    window = ap.add_mutually_exclusive_group()
+    window.add_argument(
+        "--last",
+        type=parse_last,
+        metavar="N[mhdw]",
+        help="only the last 90m/12h/7d/2w",
+    )
+    window.add_argument("--month", help="only this calendar month, YYYY-MM")
+    window.add_argument(
+        "--since", type=parse_when, help="from YYYY-MM-DD[THH:MM]"
+    )
+    ap.add_argument(
+        "--until", type=parse_when, help="before YYYY-MM-DD[THH:MM]"
+    )
+    ap.add_argument(
+        "--count",
+        action="store_true",
+        help="print counts per event instead of entries",
+    )
+    ap.add_argument(
+        "--rotate",
+        action="store_true",
+        help="archive + index the live log now and exit",
+    )
+    ap.add_argument(
+        "--dir",
+        type=Path,
+        default=AWSLOGS,
+        help=f"log directory (default: {AWSLOGS})",
+    )
+    args = ap.parse_args()
+
+    if args.rotate:
+        with log_lock(args.dir):
+            archive = rotate(args.dir)
+        print(f"📦 archived to {archive}" if archive else "nothing to rotate")
+        return
+
+    since, until = args.since or args.last, args.until
+    if args.month:
+        since, until = month_window(args.month)
+
+    counts: Counter[str] = Counter()
+    for entry in query(
+        args.dir, since=since, until=until, event=args.event, text=args.grep
+    ):
+        if args.count:
+            counts[entry.event] += 1
+        else:
+            print(entry.text)
+
+    if args.count:
+        for event, n in counts.most_common():
+            print(f"{n:>7}  {event}")
+        print(f"{sum(counts.values()):>7}  total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Build the offline package bundle for a bootstrap config
+# (see src/bootstrap_bundle.py).
+#
+# High-level overview:
+#   - Reads python/pipx/torch/mamba requirements from the bootstrap config
+#   - Locks them for the instance's platform (Ubuntu release + arch of the
+#     instance type)
+#   - Downloads wheels (+ torch variants, + local conda channel if 04_mamba is
+#     enabled)
+#   - Re-running after a config change only downloads what is new; --prune
+#     drops the rest
+#
+# Steps 03/04/05/11 pick the bundle up from `bundle.dir` in the config (default
+# ~/bootstrap/bundle, which is where `ec2_launch_bootstrap.py --bundle <dir>`
+# puts it).
+#
+# Usage examples:
+#   python ec2_bootstrap_bundle.py ../bootstrap/config_t3a_large_32gb_2404.yaml
+#   python ec2_bootstrap_bundle.py config.yaml --torch cpu,cu124 \
+#       --out /mnt/bundle
+#   python ec2_bootstrap_bundle.py config.yaml --dry-run
+# -----------------------------------------------------------------------------
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+import user_configs
+
+from aws_logger import aws_log
+from bootstrap_bundle import build_bundle
+from bootstrap_bundle import prune_bundle
+from bootstrap_bundle import spec_from_config
+
+EVENT = "EC2_bootstrap_bundle"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Build an offline package bundle for a bootstrap config"
+    )
+    ap.add_argument("config", type=Path, help="Path to bootstrap config yaml")
+    ap.add_argument(
+        "--out",
+        type=Path,
+        help="bundle directory (default: outputs/bundles/<config name>)",
+    )
+    ap.add_argument(
+        "--arch",
+        choices=["x86_64", "aarch64"],
+        help="target arch (default: from ec2_instance.type)",
+    )
+    ap.add_argument(
+        "--python",
+        action="append",
+        help="target python version(s) (default: from config / Ubuntu release)",
+    )
+    ap.add_argument(
+        "--torch",
+        help="comma-separated torch variants, eg cpu,cu124 ('' for none)",
+    )
+    ap.add_argument(
+        "--conda",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="include a local conda channel + miniforge "
+        "(default: if 04_mamba is enabled)",
+    )
+    ap.add_argument(
+        "--jobs", type=int, default=8, help="parallel downloads (default: 8)"
+    )
+    ap.add_argument(
+        "--prune",
+        action="store_true",
+        help="remove wheels no longer in any lock",
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="print the resolved spec and exit",
+    )
+    args = ap.parse_args()
+
+    torch_variants = (
+        None if args.torch is None else [v for v in args.torch.split(",") if v]
+    )
+    try:
+        spec = spec_from_config(
+            args.config,
+            arch=args.arch,
+            python_versions=args.python,
+            torch_variants=torch_variants,
+        )
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    out_dir = (
+        args.out or user_configs.OUTPUTS_DIR / "bundles" / args.config.stem
+    )
+    print(f"📦 bundle for {args.config.name} -> {out_dir}")
+    print(
+        json.dumps(
+            {
+                **asdict(spec),
+                "config": str(spec.config),
+                "platform": spec.platform,
+            },
+            indent=1,
+        )
+    )
+    if args.dry_run:
+        return
+
+    try:
+        manifest = build_bundle(spec, out_dir, jobs=args.jobs, conda=args.conda)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        aws_log(
+            event=EVENT,
+            attribute=f"bundle for {args.config.name} failed: {e}",
+            verbose=True,
+        )
+        sys.exit(1)
+
+    if args.prune:
+        print(f"🧹 pruned {prune_bundle(out_dir, manifest)} stale wheels")
+
+    size = sum(p.stat().st_size for p in out_dir.rglob("*") if p.is_file())
+    aws_log(
+        event=EVENT,
+        attribute=f"✅ bundle for {args.config.name}: "
+        f"{len(manifest['files'])} files, {size / 1e9:.2f} GB in {out_dir}",
+        verbose=True,
+    )
+    print(
+        "👉 ship it with: ec2_launch_bootstrap.py <config> --bundle "
+        + str(out_dir)
+    )
+    print("   or copy it to a volume and set bundle.dir in the config")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Stream live bootstrap progress (step events written by bootstrap/run.sh) from
+# one or more hosts.
+#
+# High-level overview:
+#   - Opens one ssh channel per host and follows ~/bootstrap/bootstrap.events
+#   - Prints per-step start/done/skip/fail lines with durations as they happen
+#   - Exits 0 once every host reports a successful end, 1 otherwise
+#
+# Usage examples:
+#   python ec2_bootstrap_watch.py 3.95.170.187 --key ~/.ssh/default_ed25519
+#   python ec2_bootstrap_watch.py node0 node1 node2   # ~/.ssh/config Hosts
+#   python ec2_bootstrap_watch.py ubuntu@10.0.0.5 ubuntu@10.0.0.6 \
+#       -k ~/.ssh/default_ed25519
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+
+from aws_logger import aws_log
+from bootstrap_events import print_final
+from bootstrap_events import watch_hosts
+
+EVENT = "ec2-bootstrap-watch"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Follow bootstrap progress on one or more hosts"
+    )
+    ap.add_argument(
+        "hosts", nargs="+", help="host, user@host or ~/.ssh/config Host alias"
+    )
+    ap.add_argument("-k", "--key", help="ssh identity file")
+    ap.add_argument(
+        "--user",
+        default="ubuntu",
+        help="user for bare IPs/hostnames (default: ubuntu)",
+    )
+    args = ap.parse_args()
+
+    opts = ["-o", "StrictHostKeyChecking=no"] + (
+        ["-i", args.key] if args.key else []
+    )
+    hosts = {}
+    for host in args.hosts:
+        # Bare IPs get the default user; aliases/user@host are passed through
+        # to ssh as-is
+        target = (
+            f"{args.user}@{host}"
+            if "@" not in host and host[:1].isdigit()
+            else host
+        )
+        hosts[host] = (target, opts)
+
+    aws_log(event=EVENT, attribute=",".join(args.hosts))
+    started = time.time()
+    final = watch_hosts(hosts)
+    sys.exit(print_final(final, started))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Start / stop / terminate many instances in one round (see
+# src/instance_actions.py).
+#
+# Batched replacement for ec2_start / ec2_stop / ec2_terminate: names are globs,
+# tag filters narrow the match, all ids are resolved with one paginated describe
+# per region, acted on with one call per region and then waited on together by a
+# single poller.
+#
+# Usage examples:
+#   # end of day for the cluster
+#   python ec2_instance_actions.py stop 'node-*'
+#   python ec2_instance_actions.py start node0 node1
+#   python ec2_instance_actions.py stop --tag project=llm \
+#       --region us-east-1 --region us-west-2
+#   python ec2_instance_actions.py terminate 'scratch-*' --yes
+#   # only list the matches
+#   python ec2_instance_actions.py stop 'node-*' --dry-run
+#
+# Managed ~/.ssh/config entries (src/ssh_config.py) follow the instances: new
+# IPs are written on start, master connections are closed on stop and entries
+# removed on terminate.
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+from aws_logger import aws_log
+from aws_replay import make_session
+from instance_actions import ACTIONS
+from instance_actions import Target
+from instance_actions import act
+from instance_actions import find_targets
+from instance_actions import wait_all
+from ssh_config import close_master
+from ssh_config import read_hosts
+from ssh_config import sync_hosts
+from ssh_config import update_hosts
+
+EVENT = "EC2_instance_actions"
+
+
+def parse_tags(values: list[str]) -> dict[str, list[str]]:
+    tags: dict[str, list[str]] = {}
+    for value in values:
+        key, sep, tag_value = value.partition("=")
+        if not sep or not key:
+            raise argparse.ArgumentTypeError(
+                f"expected Key=Value, got {value!r}"
+            )
+        tags.setdefault(key, []).append(tag_value)
+    return tags
+
+
+def update_ssh_config(clients: dict, action: str, done: list[Target]) -> None:
+    """Keep the managed ~/.ssh/config entries in step with the instances
+    acted on."""
+    if action == "start":
+        names = [t.name for t in done if t.name]
+        if names:
+            upserted, _ = sync_hosts(clients, names)
+            for alias in upserted:
+                print(f"🔗 ~/.ssh/config: Host {alias} updated")
+        return
+    ids = {t.instance_id for t in done}
+    aliases = [
+        alias
+        for alias, entry in read_hosts().items()
+        if entry.instance_id in ids
+    ]
+    if action == "terminate":
+        for alias in update_hosts(remove=aliases):
+            print(f"🔗 ~/.ssh/config: Host {alias} removed")
+    else:
+        for alias in aliases:
+            close_master(alias)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Batched start/stop/terminate by name glob or tags"
+    )
+    ap.add_argument("action", choices=list(ACTIONS))
+    ap.add_argument("names", nargs="*", help="Name tag globs (eg 'node-*')")
+    ap.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        help="tag filter Key=Value (repeatable)",
+    )
+    ap.add_argument(
+        "--region",
+        action="append",
+        help="region (repeatable, default: profile's region)",
+    )
+    ap.add_argument("--profile", help="AWS profile name")
+    ap.add_argument(
+        "--no-wait", action="store_true", help="return once the calls are made"
+    )
+    ap.add_argument(
+        "--interval",
+        type=float,
+        default=5,
+        help="poll interval in seconds (default: 5)",
+    )
+    ap.add_argument(
+        "--yes", action="store_true", help="terminate without asking"
+    )
+    ap.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="only list the matching instances",
+    )
+    ap.add_argument(
+        "--no-ssh-config", action="store_true", help="leave ~/.ssh/config alone"
+    )
+    args = ap.parse_args()
+
+    try:
+        tags = parse_tags(args.tag)
+    except argparse.ArgumentTypeError as e:
+        ap.error(str(e))
+    if not args.names and not tags:
+        ap.error("give Name globs and/or --tag filters")
+
+    session = make_session(args.profile)
+    regions = args.region or [session.region_name]
+    clients = {
+        region: session.client("ec2", region_name=region) for region in regions
+    }
+
+    from_states, goal = ACTIONS[args.action]
+    targets = find_targets(clients, args.names, tags, from_states)
+    if not targets:
+        aws_log(
+            event=EVENT,
+            attribute=f"❌ no instances to {args.action} for "
+            f"{' '.join(args.names)} {args.tag or ''}",
+            verbose=True,
+        )
+        sys.exit(1)
+
+    for t in sorted(targets, key=lambda t: (t.region, t.name or "")):
+        print(f"   {t.region:<12} {t.label:<40} {t.state}")
+    regions = {t.region for t in targets}
+    print(
+        f"👉 {args.action} {len(targets)} instance(s) "
+        f"in {len(regions)} region(s)"
+    )
+    if args.dry_run:
+        return
+    if args.action == "terminate" and not args.yes:
+        if input("Type 'terminate' to confirm: ").strip() != "terminate":
+            print("Aborted")
+            return
+
+    started = time.perf_counter()
+    calls, errors = act(clients, args.action, targets)
+    aws_log(
+        event=EVENT,
+        attribute=f"{args.action} {calls} call(s): "
+        + " ".join(f"{t.name}_{t.instance_id}" for t in targets),
+    )
+    for t in targets:
+        if t.instance_id in errors:
+            aws_log(
+                event=EVENT,
+                attribute=f"❌ Error: {args.action} {t.label}: "
+                f"{errors[t.instance_id]}",
+                verbose=True,
+            )
+    if args.no_wait:
+        if errors:
+            sys.exit(1)
+        return
+
+    def on_change(target: Target, previous: str) -> None:
+        print(f"   {target.label}: {previous} -> {target.state}")
+
+    final = wait_all(
+        clients,
+        args.action,
+        [t for t in targets if t.instance_id not in errors],
+        interval=args.interval,
+        on_change=on_change,
+    )
+    final.update(
+        {instance_id: f"error:{code}" for instance_id, code in errors.items()}
+    )
+    failed = [t for t in targets if final[t.instance_id] != goal]
+
+    if args.action == "terminate":
+        # as ec2_terminate does: free the Name for re-use, one delete_tags call
+        # per region
+        for region, ec2 in clients.items():
+            ids = [
+                t.instance_id
+                for t in targets
+                if t.region == region and t not in failed
+            ]
+            if ids:
+                ec2.delete_tags(Resources=ids, Tags=[{"Key": "Name"}])
+    if not args.no_ssh_config:
+        update_ssh_config(
+            clients, args.action, [t for t in targets if t not in failed]
+        )
+
+    elapsed = time.perf_counter() - started
+    print(f"\n=== {args.action} finished in {elapsed:.0f}s ===")
+    for t in sorted(targets, key=lambda t: t.name or ""):
+        icon = "❌" if t in failed else "✅"
+        ip = (
+            f"  📡 {t.public_ip}"
+            if args.action == "start" and t.public_ip
+            else ""
+        )
+        print(f"{icon} {t.label}: {final[t.instance_id]}{ip}")
+    aws_log(
+        event=EVENT,
+        attribute=(
+            f"{args.action} done: {len(targets) - len(failed)} ok, "
+            f"{len(failed)} failed"
+        ),
+    )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,33 +6,93 @@
 # Wrapper script to quickly launch and bootstrap an EC2 instance based on a config file:
 #  - Loads instance details from bootstrap/config*.yaml
 #  - Confirms current price is < max using ec2_price.zsh
-#  - Launches instance from matching template YAML using ec2_launch_from_yaml.py
-#  - scp's the required bootstrap script files and config to remote machine
+#  - Launches instance from matching template YAML via
+#    ec2_launch_from_yaml.launch_from_yaml() (in-process, returns a structured
+#    LaunchResult)
+#  - syncs the content-addressed bootstrap payload (bootstrap/ + config) to
+#    remote machine; only changed files are sent if the host already has a
+#    payload
 #  - sends command to execute inside a tmux sesssion on remote machine
 #
 #  usage:
-#    ec2_launch_bootsrap <path/to/bootstrap-config-yaml> [-i optionally for interactive]
+#    ec2_launch_bootsrap <path/to/bootstrap-config-yaml>
+#        [-i optionally for interactive] [-w]
 # -i option will prompt prior to copying and executing on remote machine
+# -w option streams live per-step progress back and exits with the final
+#    bootstrap status
+# --bundle <dir> ships an offline package bundle (ec2_bootstrap_bundle.py) with
+#    the payload
+# --metrics [FILE] / --cprofile FILE time every AWS call (and profile the run),
+#    see src/aws_metrics.py
+# When the config runs 12_benchmark.sh, watched runs (-w, fleet) copy each
+# host's benchmark report into outputs/benchmarks/ for ec2_specs_price.py
+# --bench
+#
+# Fleet mode (bootstraps many hosts concurrently, then watches them and prints
+# a per-step table):
+#    ec2_launch_bootsrap <config> --count 20 [--max-parallel 8] [--retries 2]
+#    ec2_launch_bootsrap <config> --hosts 10.0.0.5,10.0.0.6
+# --count launches and bootstraps new instances, --hosts uses existing ones
 
 import argparse
-import os
 import socket
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
-import yaml
-
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
 SRC_DIR = Path(__file__).resolve().parents[1] / "src"
 sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
 SH_SCRIPTS_DIR = Path(__file__).resolve().parents[1] / "zsh_general_info"
 
+import user_configs
+from botocore.exceptions import ClientError
+from botocore.exceptions import WaiterError
+from ec2_launch_from_yaml import LaunchResult
+from ec2_launch_from_yaml import NameConflictError
+from ec2_launch_from_yaml import launch_from_yaml
+from ec2_launch_from_yaml import print_launch_summary
+from ec2_launch_from_yaml import resolve_keys
+
 from aws_logger import aws_log
+from aws_metrics import add_metrics_args
+from aws_metrics import setup as setup_metrics
+from benchmark_results import fetch_report
+from benchmark_results import step_enabled
+from bootstrap_events import print_final
+from bootstrap_events import step_summary
+from bootstrap_events import watch_hosts
+from bootstrap_payload import Payload
+from bootstrap_payload import SSHRemote
+from bootstrap_payload import build_payload
+from bootstrap_payload import sync_payload
+from capacity_fallback import NoOfferingError
+from capacity_fallback import validate_fallback
+from config_cache import ConfigError
+from config_cache import load_yaml
+from config_cache import validate_bootstrap_config
+from config_cache import validate_launch_template
+from ebs_provision import validate_profile
+from ssh_config import multiplex_opts
+from template_registry import TemplateRegistry
+from template_registry import normalise_ubuntu
 
 EVENT = "EC2_launch_bootstrap"
 
+def validate_config(data: Any) -> list[str]:
+    """Bootstrap config schema plus the ec2_instance keys launch uses."""
+    problems = validate_bootstrap_config(data)
+    instance = data.get("ec2_instance") if isinstance(data, dict) else None
+    if isinstance(instance, dict):
+        problems += validate_profile(instance.get("ebs_profile"))
+        problems += validate_fallback(instance.get("fallback"))
+    return problems
+
+
 def load_config(config_path: str) -> dict:
     """Load config from yaml file"""
     
@@ -43,51 +103,61 @@ def load_config(config_path: str) -> dict:
                 attribute=f"❌ Error: Config file not found: {config_file}", verbose=True)
         sys.exit(1)
 
-    with open(config_file, "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
-
-    return config
+    # parsed + schema-checked once per edit of the file, see config_cache.py
+    try:
+        return load_yaml(config_file, validate_config)
+    except ConfigError as e:
+        aws_log(event=EVENT, attribute=f"❌ Error: {e}", verbose=True)
+        sys.exit(1)
 
 
 def find_launch_template(instance_config: dict) -> str:
-    """Find matching launch template based on instance config"""
-    
-    instance_type = instance_config["type"].replace(".", "_")
-    ubuntu_version = str(instance_config["ubuntu"]).replace(".", "")
-    dlami_required = instance_config.get("dlami", "N").upper() == "Y"
-
-    launch_dir = Path(__file__).parent.parent / "launch" / instance_config["family"]
-    if not launch_dir.exists():
-        aws_log(event=EVENT, 
-                attribute=f"❌ Error: Launch directory not found: {launch_dir}", verbose=True)
-
+    """Launch template for the config's instance type / ubuntu / dlami."""
+
+    instance_type = instance_config["type"]
+    ubuntu_version = normalise_ubuntu(instance_config["ubuntu"])
+    dlami_required = str(instance_config.get("dlami", "N")).upper() == "Y"
+
+    launch_dir = Path(__file__).parent.parent / "launch"
+    registry = TemplateRegistry.load(launch_dir)
+    template = registry.find(instance_type, ubuntu_version, dlami_required)
+
+    if template is None:
+        dlami_str = " DLAMI" if dlami_required else ""
+        aws_log(
+            event=EVENT,
+            attribute=f"❌ Error: No launch template for "
+            f"{instance_type}{dlami_str} ubuntu {ubuntu_version}",
+            verbose=True,
+        )
+        for other in registry.for_instance_type(instance_type):
+            print(
+                f"   available: {other.path.relative_to(launch_dir)} "
+                f"(ubuntu {other.ubuntu}, dlami={other.dlami})",
+                file=sys.stderr,
+            )
+        print(
+            f"Searched in: {launch_dir} "
+            "(ec2_launch_templates.py lists every template)",
+            file=sys.stderr,
+        )
         sys.exit(1)
 
-    for template_file in launch_dir.glob("*.yaml"):
-        filename = template_file.name
-
-        if not filename.startswith(instance_type):
-            continue
-
-        ubuntu_suffix = f"ubuntu_{ubuntu_version}.yaml"
-        if not filename.endswith(ubuntu_suffix):
-            continue
-
-        has_dlami = "dlami" in filename
-        if dlami_required and not has_dlami:
-            continue  # Need DLAMI but file doesn't have it
-        if not dlami_required and has_dlami:
-            continue  # Don't need DLAMI but file has it
-
-        # Found a match
-        return str(template_file)
-
-    dlami_str = "DLAMI_" if dlami_required else ""
-    template_pattern = f"{instance_type}*{dlami_str}*ubuntu_{ubuntu_version}.yaml"
-    aws_log(event=EVENT, 
-            attribute=f"❌ Error: No launch template found matching: {template_pattern}", verbose=True)
-    print(f"Searched in: {launch_dir}", file=sys.stderr)
-    sys.exit(1)
+    family_dir = template.path.parent.name
+    if family_dir != instance_config.get("family", family_dir):
+        aws_log(
+            event=EVENT,
+            attribute=f"⚠️ config family {instance_config['family']} but "
+            f"template is in launch/{family_dir}/",
+            verbose=True,
+        )
+    for mismatch in template.mismatches:
+        aws_log(
+            event=EVENT,
+            attribute=f"⚠️ {template.path.name}: {mismatch}",
+            verbose=True,
+        )
+    return str(template.path)
 
 
 def check_instance_price(instance_type: str, max_price: float) -> bool:
@@ -177,18 +247,205 @@ def wait_for_ssh(host: str, port: int = 22, timeout: int = 300, interval: int =
     return False
 
 
-def launch_instance(template_path: str, instance_name: str, storage_size: int, config_path: str, interactive: bool = False) -> None:
-    """Execute ec2_launch_from_yaml.py with the appropriate inputs"""
-    
-    script_dir = Path(__file__).parent
-    launch_script = script_dir / "ec2_launch_from_yaml.py"
+def ssh_opts(result: LaunchResult, interactive: bool = False) -> list[str]:
+    """Common ssh/scp options for talking to a freshly launched instance.
+
+    The upload, key copy, tmux start, watch and report fetch share one
+    multiplexed connection.
+    """
+    opts = [] if interactive else ["-o", "StrictHostKeyChecking=no"]
+    return opts + ["-i", result.aws_key] + multiplex_opts()
+
+
+def upload_bootstrap(
+    result: LaunchResult,
+    config_path: str,
+    interactive: bool = False,
+    bundle_dir: Path | None = None,
+    payload: Payload | None = None,
+) -> bool:
+    """Sync the bootstrap payload (bootstrap/ + config) to the instance.
+
+    Returns True on success.
+    """
+    if interactive:
+        response = (
+            input("\n👉 Copy bootstrap files to instance? [Y/n]: ")
+            .strip()
+            .lower()
+        )
+        if response not in ["", "y", "yes"]:
+            print("Skipped copying bootstrap files")
+            return False
 
-    if not launch_script.exists():
-        aws_log(event=EVENT, 
-                attribute=f"❌ Error: ec2_launch_from_yaml.py not found: {launch_script}", 
-                verbose=True)
+    if payload is None:
+        payload = build_payload(
+            user_configs.BOOTSTRAP_DIR, Path(config_path), bundle_dir=bundle_dir
+        )
 
-        sys.exit(1)
+    print("\n")
+    aws_log(
+        event=EVENT,
+        attribute=f"🔄 Copying bootstrap payload {payload.archive.name} "
+        "to instance...",
+        verbose=True,
+    )
+
+    try:
+        stats = sync_payload(
+            payload, SSHRemote(result.ssh_target, ssh_opts(result, interactive))
+        )
+    except RuntimeError as e:
+        print(f"⚠️ Warning: payload upload failed: {e}", file=sys.stderr)
+        aws_log(
+            event=EVENT,
+            attribute="⚠️ Warning: payload upload failed",
+            verbose=True,
+        )
+        return False
+
+    aws_log(
+        event=EVENT,
+        attribute="✅ Bootstrap files copied successfully "
+        f"({stats.mode}, {stats.bytes_sent:,} bytes)",
+        verbose=True,
+    )
+    return True
+
+
+def copy_github_key(result: LaunchResult, github_key: str) -> None:
+    """Copy the GitHub SSH key to the instance and use it for github.com."""
+    github_key_path = Path.home() / ".ssh" / github_key
+    if not github_key_path.exists():
+        aws_log(
+            event=EVENT,
+            attribute=f"⚠️ Warning: GitHub key not found at {github_key_path}",
+            verbose=True,
+        )
+        return
+
+    aws_log(
+        event=EVENT,
+        attribute="🔑 Copying GitHub SSH key to instance...",
+        verbose=True,
+    )
+    scp_key_cmd = [
+        "scp",
+        *ssh_opts(result),
+        str(github_key_path),
+        f"{result.ssh_target}:~/.ssh/{github_key}",
+    ]
+    key_result = subprocess.run(scp_key_cmd, check=False)
+    if key_result.returncode != 0:
+        aws_log(
+            event=EVENT,
+            attribute="⚠️ Warning: Failed to copy GitHub SSH key",
+            verbose=True,
+        )
+        return
+
+    # Set correct permissions and configure SSH to use the key for GitHub
+    ssh_config_cmd = [
+        "ssh",
+        *ssh_opts(result),
+        result.ssh_target,
+        f"chmod 600 ~/.ssh/{github_key} && "
+        "echo -e 'Host github.com\\n"
+        f"  IdentityFile ~/.ssh/{github_key}\\n"
+        "  IdentitiesOnly yes' >> ~/.ssh/config && "
+        f"chmod 600 ~/.ssh/config",
+    ]
+    subprocess.run(ssh_config_cmd, check=False)
+    aws_log(
+        event=EVENT,
+        attribute="✅ GitHub SSH key configured on instance",
+        verbose=True,
+    )
+
+
+def start_remote_bootstrap(
+    result: LaunchResult,
+    config_path: str,
+    interactive: bool = False,
+    tty: bool = True,
+) -> bool:
+    """Start run.sh inside a detached tmux session on the instance."""
+    config_name = Path(config_path).stem
+    # -t forces pseudo-terminal allocation for tmux; fleet mode starts many
+    # hosts from threads sharing one terminal, and a detached tmux session does
+    # not need it
+    ssh_args = ["ssh", "-A", "-t"] if tty else ["ssh", "-A"]
+    ssh_args.extend(ssh_opts(result, interactive))
+    ssh_args.append(result.ssh_target)
+
+    tmux_session = "bootstrap"
+    bootstrap_cmd = (
+        f"bash ~/bootstrap/run.sh --config ~/bootstrap/{config_name}.yaml --run"
+    )
+    # GitHub SSH key is copied to the instance, no agent forwarding needed
+    # inside tmux
+    remote_cmd = (
+        f"cd ~ && tmux new-session -d -s {tmux_session} '{bootstrap_cmd}'"
+    )
+
+    ssh_command = ssh_args + [remote_cmd]
+
+    if interactive:
+        response = (
+            input("\n👉 Execute bootstrap script on remote instance? [Y/n]: ")
+            .strip()
+            .lower()
+        )
+        if response not in ["", "y", "yes"]:
+            print("Skipped remote bootstrap execution")
+            return False
+
+    aws_log(
+        event=EVENT,
+        attribute="\n⚙️ Executing bootstrap script on remote instance...",
+        verbose=True,
+    )
+
+    aws_log(
+        event=EVENT,
+        attribute=f"🔄 Running: {' '.join(ssh_command)}",
+        verbose=True,
+    )
+
+    ssh_result = subprocess.run(ssh_command, check=False)
+    if ssh_result.returncode != 0:
+        aws_log(
+            event=EVENT,
+            attribute="⚠️ Warning: Failed to launch bootstrap script",
+            verbose=True,
+        )
+        return False
+
+    aws_log(
+        event=EVENT,
+        attribute="✅ Bootstrap script launched in tmux session",
+        verbose=True,
+    )
+
+    print("\n👉 To monitor the bootstrap process, run:")
+    print(f"   ssh -A -i {result.aws_key} {result.ssh_target}")
+    print(f"   tmux attach-session -t {tmux_session}")
+    print(r'   or tail -f ~/bootstrap/bootstrap.log | grep "\[2026"')
+    print(
+        "   or stream step progress: "
+        f"ec2_bootstrap_watch.py {result.host} -k {result.aws_key}"
+    )
+    return True
+
+
+def launch_instance(
+    template_path: str,
+    instance_name: str,
+    storage_size: int,
+    config_path: str,
+    interactive: bool = False,
+) -> LaunchResult:
+    """Launch in-process via launch_from_yaml(), return the structured result"""
 
     # Load config to extract git SSH key
     config = load_config(config_path)
@@ -199,222 +456,265 @@ def launch_instance(template_path: str, instance_name: str, storage_size: int, c
                 verbose=True)
     
     # Load template to extract KeyName (AWS key)
-    with open(template_path, 'r') as f:
-        template = yaml.safe_load(f)
+    template = load_yaml(template_path, validate_launch_template)
     aws_key = template.get('KeyName')
     if not aws_key:
         aws_log(event=EVENT, 
                 attribute="⚠️ Warning: KeyName not found in launch template", 
                 verbose=True)
-    
-    # Set environment variables for the subprocess
-    env = dict(os.environ)
-    if github_key:
-        env['DEFAULT_GITHUB_KEY'] = github_key
-    if aws_key:
-        env['DEFAULT_AWS_KEY'] = aws_key
-
-    cmd = [
-        str(launch_script),
-        template_path,
-        "--name", instance_name,
-        "--storage", str(storage_size)
-    ]
 
     aws_log(event=EVENT, 
                 attribute=f"🔄 Launching instance: {instance_name}", 
                 verbose=True)
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False,
-            env=env
-        )
-        
-        if result.returncode != 0:
-            aws_log(event=EVENT, 
-                    attribute="❌ Error: Failed to launch instance", 
-                    verbose=True)
-            aws_log(event=EVENT, attribute=f'cmd: {cmd}')
-            aws_log(event=EVENT, attribute=f'stdout: {result.stdout}')
-            aws_log(event=EVENT, attribute=f'stderr: {result.stderr}')
-            sys.exit(1)
-        
-        output_lines = result.stdout.split("\n")
-        scp_command = None
-        ssh_key = None
-        public_ip = None
-        
-        # Parse output
-        for line in output_lines:
-            if "Public IP:" in line:
-                public_ip = line.split("Public IP:")[-1].strip()
-            
-            elif "scp -i" in line:
-                scp_command = line.strip()
-                if scp_command.startswith("👉"):
-                    scp_command = scp_command[2:].strip()
-                
-                if "-i" in scp_command:
-                    parts = scp_command.split()
-                    key_idx = parts.index("-i")
-                    if key_idx + 1 < len(parts):
-                        ssh_key = parts[key_idx + 1]
-        
-        # Give some time for SSH to be ready before attempting file copy
-        if public_ip and not wait_for_ssh(public_ip):
-            aws_log(event=EVENT, 
-                attribute="⚠️ Warning: SSH service not ready, skipping file operations", 
+    result = launch_from_yaml(
+        Path(template_path),
+        name=instance_name,
+        storage=storage_size,
+        aws_key=aws_key,
+        github_key=github_key,
+        ebs_profile=config.get("ec2_instance", {}).get("ebs_profile"),
+        fallback=config.get("ec2_instance", {}).get("fallback") or False,
+        max_price=config.get("ec2_instance", {}).get("max_price"),
+    )
+    if result is None:
+        aws_log(event=EVENT, 
+                attribute="❌ Error: Failed to launch instance", 
                 verbose=True)
+        sys.exit(1)
 
-            print("\n" + result.stdout)
-            return
-        
-        if scp_command:
-            execute_scp = True
-            if interactive:
-                response = input("\n👉 Copy bootstrap files to instance? [Y/n]: ").strip().lower()
-                execute_scp = response in ["", "y", "yes"]
-            
-            if execute_scp:
-                # Add StrictHostKeyChecking option when not in interactive mode
-                if not interactive:
-                    scp_command = scp_command.replace("scp -i", "scp -o StrictHostKeyChecking=no -i")
-                
-                print("\n")
-                aws_log(event=EVENT, 
-                    attribute=f"🔄 Copying bootstrap files to instance...", 
-                    verbose=True)
-
-                print(f"⚙️  Executing: {scp_command}")
-                aws_log(event=EVENT, 
-                    attribute=f"⚙️  Executing: {scp_command}", 
-                    verbose=True)
-
-                scp_result = subprocess.run(
-                    scp_command,
-                    shell=True,
-                    check=False
-                )
-
-                if scp_result.returncode == 0:
-                    aws_log(event=EVENT, 
-                        attribute=f"✅ Bootstrap files copied successfully", 
-                        verbose=True)
-                    
-                    # Copy GitHub SSH key to the instance for git operations
-                    if github_key and ssh_key:
-                        github_key_path = Path.home() / ".ssh" / github_key
-                        if github_key_path.exists():
-                            scp_key_cmd = f"scp -o StrictHostKeyChecking=no -i {ssh_key} {github_key_path} ubuntu@{public_ip}:~/.ssh/{github_key}"
-                            aws_log(event=EVENT, 
-                                attribute=f"🔑 Copying GitHub SSH key to instance...", 
-                                verbose=True)
-                            key_result = subprocess.run(scp_key_cmd, shell=True, check=False)
-                            if key_result.returncode == 0:
-                                # Set correct permissions and configure SSH to use the key for GitHub
-                                ssh_config_cmd = [
-                                    "ssh", "-o", "StrictHostKeyChecking=no", "-i", ssh_key,
-                                    f"ubuntu@{public_ip}",
-                                    f"chmod 600 ~/.ssh/{github_key} && "
-                                    f"echo -e 'Host github.com\\n  IdentityFile ~/.ssh/{github_key}\\n  IdentitiesOnly yes' >> ~/.ssh/config && "
-                                    f"chmod 600 ~/.ssh/config"
-                                ]
-                                subprocess.run(ssh_config_cmd, check=False)
-                                aws_log(event=EVENT, 
-                                    attribute=f"✅ GitHub SSH key configured on instance", 
-                                    verbose=True)
-                            else:
-                                aws_log(event=EVENT, 
-                                    attribute=f"⚠️ Warning: Failed to copy GitHub SSH key", 
-                                    verbose=True)
-                        else:
-                            aws_log(event=EVENT, 
-                                attribute=f"⚠️ Warning: GitHub key not found at {github_key_path}", 
-                                verbose=True)
-
-                else:
-                    print("⚠️ Warning: scp command failed", file=sys.stderr)
-                    aws_log(event=EVENT, 
-                        attribute=f"⚠️ Warning: scp command failed", 
-                        verbose=True)
-
-            else:
-                print("Skipped copying bootstrap files")
+    timings = ", ".join(f"{k}={v:.1f}s" for k, v in result.timings.items())
+    aws_log(
+        event=EVENT,
+        attribute=f"launched {result.instance_id} {result.public_ip} "
+        f"({timings})",
+    )
+    return result
+
+
+def bootstrap_instance(
+    result: LaunchResult,
+    config_path: str,
+    interactive: bool = False,
+    bundle_dir: Path | None = None,
+) -> bool:
+    """Upload phase: wait for ssh, copy bootstrap + GitHub key, start run.sh"""
+
+    # Give some time for SSH to be ready before attempting file copy
+    if not result.host or not wait_for_ssh(result.host):
+        aws_log(
+            event=EVENT,
+            attribute="⚠️ Warning: SSH service not ready, "
+            "skipping file operations",
+            verbose=True,
+        )
+        print_launch_summary(result)
+        return False
 
-        else:
-            aws_log(event=EVENT, 
-                        attribute="⚠️ Warning: Could not find scp command in output", 
-                        verbose=True)
+    if upload_bootstrap(result, config_path, interactive, bundle_dir):
+        github_key = load_config(config_path).get("git", {}).get("ssh_key")
+        if github_key:
+            copy_github_key(result, github_key)
 
-        
-        # Execute remote bootstrap script if we have IP and key
-        if public_ip and ssh_key:
-            config_name = Path(config_path).stem
-            ssh_args = ["ssh", "-A", "-t"]  # -t forces pseudo-terminal allocation for tmux
-            if not interactive:
-                ssh_args.extend(["-o", "StrictHostKeyChecking=no"])
-            ssh_args.extend(["-i", ssh_key, f"ubuntu@{public_ip}"])
-
-            tmux_session = "bootstrap"
-            bootstrap_cmd = f"bash ~/bootstrap/run.sh --config ~/bootstrap/{config_name}.yaml --run"
-            # GitHub SSH key is copied to the instance, no agent forwarding needed inside tmux
-            remote_cmd = f"cd ~ && tmux new-session -d -s {tmux_session} '{bootstrap_cmd}'"
-
-            ssh_command = ssh_args + [remote_cmd]
-
-            execute_remote = True
-            if interactive:
-                response = input("\n👉 Execute bootstrap script on remote instance? [Y/n]: ").strip().lower()
-                execute_remote = response in ["", "y", "yes"]
-            
-            if execute_remote:
-                aws_log(event=EVENT, 
-                        attribute=f"\n⚙️ Executing bootstrap script on remote instance...", 
-                        verbose=True)
-
-                aws_log(event=EVENT, 
-                        attribute=f"🔄 Running: {' '.join(ssh_command)}", 
-                        verbose=True)
-
-                ssh_result = subprocess.run(ssh_command, check=False)
-                if ssh_result.returncode == 0:
-                    aws_log(event=EVENT, 
-                        attribute="✅ Bootstrap script launched in tmux session", 
-                        verbose=True)
-
-                    if public_ip and ssh_key:
-                        print(f"\n👉 To monitor the bootstrap process, run:")
-                        print(f"   ssh -A -i {ssh_key} ubuntu@{public_ip}")
-                        print(f"   tmux attach-session -t {tmux_session}")
-                        print(r'   or tail -f ~/bootstrap/bootstrap.log | grep "\[2026"')
-
-                else:
-                    aws_log(event=EVENT, 
-                        attribute="⚠️ Warning: Failed to launch bootstrap script", 
-                        verbose=True)
-                
-            else:
-                print("Skipped remote bootstrap execution")
+    started = start_remote_bootstrap(result, config_path, interactive)
+
+    print_launch_summary(result)
+    return started
+
+
+def watch_bootstrap(result: LaunchResult, since: float) -> int:
+    """Stream run.sh step events back over one ssh channel, return exit code."""
+    aws_log(
+        event=EVENT,
+        attribute=f"👀 Watching bootstrap on {result.name} ({result.host})...",
+        verbose=True,
+    )
+    label = result.name or result.instance_id
+    hosts = {label: (result.ssh_target, ssh_opts(result))}
+    final = watch_hosts(hosts, since=since)
+    aws_log(event=EVENT, attribute=f"bootstrap {result.name}: {final}")
+    return print_final(final, since)
+
+
+def collect_benchmarks(results: list[LaunchResult], config_path: str) -> None:
+    """Copy the 12_benchmark.sh report back from each host when the config
+    runs that step."""
+    if not step_enabled(load_config(config_path)):
+        return
+    dest_dir = user_configs.OUTPUTS_DIR / "benchmarks"
+    for result in results:
+        path = fetch_report(
+            result.ssh_target,
+            ssh_opts(result),
+            dest_dir,
+            result.instance_type,
+            result.name,
+        )
+        if path:
+            aws_log(
+                event=EVENT,
+                attribute=(
+                    f"📊 benchmark {result.name} ({result.instance_type}) "
+                    f"-> {path.name}"
+                ),
+                verbose=True,
+            )
         else:
-            aws_log(event=EVENT, 
-                        attribute="⚠️ Warning: Could not extract IP or SSH key for remote execution", 
-                        verbose=True)
+            aws_log(
+                event=EVENT,
+                attribute=f"⚠️ Warning: no benchmark report on {result.name}",
+                verbose=True,
+            )
+
+
+def host_result(host: str, template_path: str, config: dict) -> LaunchResult:
+    """LaunchResult for a running host ([user@]address), for fleet --hosts."""
+    template = load_yaml(template_path, validate_launch_template)
+    aws_key, github_key = resolve_keys(
+        template.get("KeyName"), config.get("git", {}).get("ssh_key")
+    )
+    user, _, address = host.rpartition("@")
+    return LaunchResult(
+        instance_id="",
+        name=address,
+        instance_type=config["ec2_instance"]["type"],
+        public_ip=address,
+        private_ip=None,
+        aws_key=aws_key,
+        github_key=github_key,
+        yaml_path=Path(template_path),
+        user=user or "ubuntu",
+    )
 
-            
-        # Print remaining output
-        print("\n" + result.stdout)
-        
-    except subprocess.CalledProcessError:
-        aws_log(event=EVENT, 
-                        attribute="❌ Error: Failed to launch instance --", 
-                        verbose=True)
 
-        aws_log(event=EVENT, attribute=f'cmd: {cmd}')
-        sys.exit(1)
+def host_label(result: LaunchResult) -> str:
+    """Name a fleet host goes by in the logs and the step summary."""
+    return result.name or result.host or result.instance_id
+
+
+def launch_fleet(
+    template_path: str,
+    ec2_config: dict,
+    config_path: str,
+    count: int,
+    max_parallel: int,
+) -> list[LaunchResult]:
+    """Launch count instances named <name>-01.. concurrently.
+
+    A node that fails to launch is logged and dropped; the others carry on.
+    """
+    names = [f"{ec2_config['name']}-{i:02d}" for i in range(1, count + 1)]
+
+    def launch(name: str) -> LaunchResult | None:
+        try:
+            return launch_instance(
+                template_path, name, ec2_config["ebs_storage"], config_path
+            )
+        except (
+            NameConflictError,
+            NoOfferingError,
+            ClientError,
+            WaiterError,
+        ) as e:
+            aws_log(event=EVENT, attribute=f"❌ {name}: {e}", verbose=True)
+        except SystemExit:  # launch_instance logs and exits on failure
+            pass
+        except Exception as e:  # one bad node must not take the fleet down
+            aws_log(event=EVENT, attribute=f"❌ {name}: {e!r}", verbose=True)
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        results = list(pool.map(launch, names))
+    return [r for r in results if r is not None]
+
+
+def prepare_host(
+    result: LaunchResult, config_path: str, payload: Payload, retries: int
+) -> bool:
+    """ssh wait + upload + GitHub key + start run.sh, retried with backoff."""
+    github_key = load_config(config_path).get("git", {}).get("ssh_key")
+    uploaded = False
+    for attempt in range(retries + 1):
+        if attempt:
+            aws_log(
+                event=EVENT,
+                attribute=f"🔁 {result.name}: retry {attempt}/{retries}",
+                verbose=True,
+            )
+            time.sleep(min(10 * attempt, 60))
+        if not result.host or not wait_for_ssh(result.host):
+            continue
+        if (
+            not uploaded
+        ):  # the key goes in once, copy_github_key appends to ~/.ssh/config
+            if not upload_bootstrap(result, config_path, payload=payload):
+                continue
+            if github_key:
+                copy_github_key(result, github_key)
+            uploaded = True
+        if start_remote_bootstrap(result, config_path, tty=False):
+            return True
+    aws_log(
+        event=EVENT,
+        attribute=f"❌ {result.name}: bootstrap not started",
+        verbose=True,
+    )
+    return False
+
+
+def bootstrap_fleet(
+    results: list[LaunchResult],
+    config_path: str,
+    bundle_dir: Path | None,
+    max_parallel: int,
+    retries: int,
+) -> int:
+    """Start the bootstrap on every host (at most max_parallel at once), then
+    watch them all and print a per-step summary. Returns the exit code."""
+    started_at = time.time()
+    # allow some clock skew between this machine and the instances
+    since = started_at - 30
+    payload = build_payload(
+        user_configs.BOOTSTRAP_DIR, Path(config_path), bundle_dir=bundle_dir
+    )
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        started = list(
+            pool.map(
+                lambda r: prepare_host(r, config_path, payload, retries),
+                results,
+            )
+        )
+    running = [r for r, ok in zip(results, started, strict=True) if ok]
+    aws_log(
+        event=EVENT,
+        attribute=f"🚀 bootstrap started on {len(running)}/{len(results)} "
+        f"hosts in {time.time() - started_at:.0f}s",
+        verbose=True,
+    )
+
+    events: dict[str, list[dict]] = {host_label(r): [] for r in running}
+    hosts = {host_label(r): (r.ssh_target, ssh_opts(r)) for r in running}
+    final = watch_hosts(
+        hosts,
+        since=since,
+        on_event=lambda label, e: events[label].append(e),
+        retries=retries,
+    )
+    final.update(
+        {
+            host_label(r): "not started"
+            for r, ok in zip(results, started, strict=True)
+            if not ok
+        }
+    )
+
+    print()
+    for line in step_summary(events):
+        print(line)
+    collect_benchmarks(running, config_path)
+    aws_log(event=EVENT, attribute=f"fleet bootstrap {config_path}: {final}")
+    return print_final(final, started_at)
 
 
 def main() -> None:
@@ -425,23 +725,55 @@ def main() -> None:
     parser.add_argument("config", help="Path to configuration YAML file")
     parser.add_argument("-i", "--interactive", action="store_true", 
                         help="Prompt for confirmation before scp and remote execution")
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="Stream live per-step progress and exit with the bootstrap status",
+    )
+    parser.add_argument(
+        "--bundle",
+        type=Path,
+        help="Offline package bundle dir to ship with the payload "
+        "(ec2_bootstrap_bundle.py)",
+    )
+    fleet = parser.add_mutually_exclusive_group()
+    fleet.add_argument(
+        "--count",
+        type=int,
+        help="Fleet: launch this many instances (<name>-01..) and bootstrap "
+        "them all",
+    )
+    fleet.add_argument(
+        "--hosts",
+        help="Fleet: bootstrap these running hosts ([user@]ip,ip,..)",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=8,
+        help="Fleet: hosts launched/uploaded to at the same time (default: 8)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Fleet: per-host retries for upload/start and the watch channel "
+        "(default: 2)",
+    )
 
+    add_metrics_args(parser)
     args = parser.parse_args()
+    setup_metrics(args.metrics, args.cprofile)
+    if args.interactive and (args.count or args.hosts):
+        parser.error("-i/--interactive cannot be combined with --count/--hosts")
 
     # Load configuration
     config = load_config(args.config)
     ec2_config = config.get("ec2_instance", {})
     aws_log(event=EVENT, attribute = args.config)
 
-    # Validate required fields
-    required_fields = ["type", "max_price", "name", "ebs_storage", "ubuntu"]
-    for field in required_fields:
-        if field not in ec2_config:
-            aws_log(event=EVENT, 
-                        attribute=f"❌ Error: Missing required config field: ec2_instance.{field}", 
-                        verbose=True)
-            sys.exit(1)
-
+    # Required fields were validated by load_config()
     aws_log(event=EVENT, attribute="validated configuration file")
 
     print(f"🔄 Loading configuration from {args.config}")
@@ -452,18 +784,70 @@ def main() -> None:
     print(f"✅ Found launch template: {Path(template_path).name}")
     aws_log(event=EVENT, attribute = template_path)
 
+    if args.hosts:
+        hosts = [h.strip() for h in args.hosts.split(",") if h.strip()]
+        results = [host_result(h, template_path, config) for h in hosts]
+        sys.exit(
+            bootstrap_fleet(
+                results,
+                args.config,
+                args.bundle,
+                args.max_parallel,
+                args.retries,
+            )
+        )
+
     # Check price
     if not check_instance_price(ec2_config["type"], ec2_config["max_price"]):
         sys.exit(1)
 
-    # Launch instance
-    launch_instance(
-        template_path,
-        ec2_config["name"],
-        ec2_config["ebs_storage"],
-        args.config,
-        args.interactive
+    if args.count:
+        results = launch_fleet(
+            template_path,
+            ec2_config,
+            args.config,
+            args.count,
+            args.max_parallel,
+        )
+        if not results:
+            sys.exit(1)
+        sys.exit(
+            bootstrap_fleet(
+                results,
+                args.config,
+                args.bundle,
+                args.max_parallel,
+                args.retries,
+            )
+        )
+
+    # Launch instance, then go straight into the upload phase
+    try:
+        result = launch_instance(
+            template_path,
+            ec2_config["name"],
+            ec2_config["ebs_storage"],
+            args.config,
+            args.interactive
+        )
+    except (
+        NameConflictError,
+        NoOfferingError,
+        ClientError,
+        WaiterError,
+    ) as e:
+        aws_log(event=EVENT, attribute=f"❌ Error: {e}", verbose=True)
+        sys.exit(1)
+    # allow some clock skew between this machine and the instance when
+    # matching the new run
+    since = time.time() - 30
+    started = bootstrap_instance(
+        result, args.config, args.interactive, args.bundle
     )
+    if args.watch and started:
+        rc = watch_bootstrap(result, since)
+        collect_benchmarks([result], args.config)
+        sys.exit(rc)
 
 if __name__ == "__main__":
     main()
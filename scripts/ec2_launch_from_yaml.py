@@ -12,12 +12,30 @@
 #   - Added: check for existing instances with the same name to avoid duplicates
 #   - Launches the instance using boto3
 #   - Fetches public/private IPs and rints usueful SSH and SCP user commands.
+#   - Adds a multiplexed `Host <Name>` entry to the managed block in
+#     ~/.ssh/config
 #  
 # Usage examples:
 #   python ec2_launch_from_yaml.py my_instance.yaml
 #   python ec2_launch_from_yaml.py my_instance.yaml --name node0 --storage 100
 #   python ec2_launch_from_yaml.py my_instance.yaml --profile myprofile --region us-west-2
 #   python ec2_launch_from_yaml.py my_instance.yaml --dry-run
+#   # offline
+#   python ec2_launch_from_yaml.py my_instance.yaml --dry-run \
+#       --replay ~/aws-frozen
+#   # gp3 sized to instance
+#   python ec2_launch_from_yaml.py my_instance.yaml --ebs-profile balanced
+#   python ec2_launch_from_yaml.py my_instance.yaml --iops 6000 --throughput 500
+#   # other AZs/cheapest similar types
+#   python ec2_launch_from_yaml.py g4dn.yaml --fallback
+#   python ec2_launch_from_yaml.py g4dn.yaml \
+#       --fallback-types g5.xlarge,g6.xlarge --max-price 1.2
+#   # per-API-call latencies
+#   python ec2_launch_from_yaml.py my_instance.yaml --metrics launch.json
+#
+# Can also be imported: launch_from_yaml() returns a LaunchResult (instance id,
+# IPs, key paths, timings) which ec2_launch_bootstrap.py passes straight into
+# its upload phase.
 #
 # Arguments:
 #  yaml_path   Path to the EC2 launch YAML spec
@@ -26,21 +44,40 @@
 #   --dry-run  Validate parameters only, do not launch
 #   --storage  Override EBS volume size (GB)
 #   --name     Override Name tag for instance and volume
+#   --record / --replay DIR  Save / serve AWS responses (with --dry-run), see
+#                            src/aws_replay.py
+#   --metrics [FILE] / --cprofile FILE  Per-operation latency summary
+#                    (+ JSON) / cProfile, see src/aws_metrics.py
+#   --ebs-profile  balanced|max: gp3 Iops/Throughput from the instance's EBS
+#                  bandwidth (src/ebs_provision.py); with --fallback it is
+#                  sized for the YAML's InstanceType
+#   --iops / --throughput    Explicit gp3 values for all volumes (override the
+#                            profile)
+#   --fallback       On capacity errors retry in other AZs, then with catalog
+#                    types (src/capacity_fallback.py)
+#   --fallback-types Explicit fallback types (comma separated, tried cheapest
+#                    first)
+#   --max-price      Highest $/hr for catalog fallback types (default 1.5x the
+#                    template's type)
+#   --no-ssh-config  Skip the managed ~/.ssh/config Host entry
+#                    (src/ssh_config.py)
 #
 # To do:
 #   - Add user-data encoding, key-pair checks
 #   - Replace reliance on configs/user_configs.py
 
-import os, sys
 import argparse
+import os
+import sys
+import time
+from dataclasses import dataclass
+from dataclasses import field
 from pathlib import Path
-
 from typing import Any
 
-import boto3 
-import yaml
 import botocore
 from botocore.exceptions import ClientError
+from botocore.exceptions import WaiterError
 
 CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
 SRC_DIR = Path(__file__).resolve().parents[1] / "src"
@@ -48,15 +85,38 @@ sys.path.append(str(SRC_DIR))
 sys.path.append(str(CONFIGS_DIR))
 
 import user_configs
+
 from aws_logger import aws_log
+from aws_metrics import add_metrics_args
+from aws_metrics import setup as setup_metrics
+from aws_replay import ReplayMissError
+from aws_replay import add_replay_args
+from aws_replay import make_session
+from capacity_fallback import DEFAULT_MAX_FALLBACKS
+from capacity_fallback import FAST_CLIENT_CONFIG
+from capacity_fallback import NoOfferingError
+from capacity_fallback import fallback_types
+from capacity_fallback import latest_catalog
+from capacity_fallback import load_catalog
+from capacity_fallback import plan_attempts
+from capacity_fallback import run_with_fallback
+from config_cache import Validator
+from config_cache import load_yaml as load_cached_yaml
+from config_cache import validate_launch_template
+from ebs_provision import PROFILES
+from ebs_provision import apply_plan
+from ebs_provision import instance_ebs_limits
+from ebs_provision import plan_volumes
+from ssh_config import default_user
+from ssh_config import entry_for
+from ssh_config import update_hosts
 
 PROJECT_ROOT = user_configs.PROJECT_ROOT
 EVENT = "ec2-launch-instance-from-yaml.py"
 
 
-def load_yaml(path: Path) -> dict:
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+def load_yaml(path: Path, validator: Validator | None = None) -> dict:
+    return load_cached_yaml(path, validator)
     
 def extract_instance_name(spec: dict) -> Any:
     """Return the 'Name' tag value from TagSpecifications for ResourceType=instance."""
@@ -82,6 +142,86 @@ def override_volume_size(spec: dict, volume_size: int) -> None:
             if "Ebs" in bdm and "VolumeSize" in bdm["Ebs"]:
                 bdm["Ebs"]["VolumeSize"] = volume_size
 
+def provision_volumes(
+    ec2: Any,
+    spec: dict,
+    profile: str | None,
+    iops: int | None,
+    throughput: int | None,
+) -> None:
+    """Set gp3 Iops/Throughput on all BlockDeviceMappings and log the extra
+    cost."""
+    limits = instance_ebs_limits(ec2, spec["InstanceType"]) if profile else None
+    plans = plan_volumes(spec, limits, profile, iops, throughput)
+    apply_plan(spec, plans)
+    if limits:
+        print(
+            f"💾 {limits.instance_type} EBS: "
+            f"baseline {limits.baseline_mbps:.0f} MB/s / "
+            f"{limits.baseline_iops} IOPS, "
+            f"max {limits.max_mbps:.0f} MB/s / {limits.max_iops} IOPS"
+        )
+    for plan in plans:
+        aws_log(event=EVENT, attribute=f"💾 {plan.describe()}", verbose=True)
+    extra = sum(p.extra_usd_hour for p in plans)
+    if extra:
+        per_month = sum(p.extra_usd_month for p in plans)
+        print(
+            f"👉 EBS performance adds ${extra:.4f}/hr "
+            f"(${per_month:.2f}/month)"
+        )
+
+
+def plan_fallback(
+    ec2: Any,
+    spec: dict,
+    types: list[str] | None,
+    max_price: float | None,
+    limit: int = DEFAULT_MAX_FALLBACKS,
+) -> list:
+    """Launch attempts for spec: its type in every offering AZ, then fallback
+    types by price."""
+    primary = spec["InstanceType"]
+    catalog_path = latest_catalog(user_configs.OUTPUTS_DIR, primary)
+    catalog = load_catalog(catalog_path) if catalog_path else {}
+    if not catalog_path and not types:
+        print(
+            f"⚠️  no spec/price catalog for {primary} in "
+            f"{user_configs.OUTPUTS_DIR} (ec2_specs_price.py --save); "
+            f"falling back across AZs only",
+            file=sys.stderr,
+        )
+    candidates = fallback_types(catalog, primary, types, max_price, limit)
+    attempts = plan_attempts(ec2, spec, [primary, *candidates])
+    for i, attempt in enumerate(attempts, 1):
+        usd = catalog.get(attempt.instance_type, {}).get("USDPerHr") or "?"
+        print(f"   {i:>2}. {attempt.label}  ${usd}/hr")
+    return attempts
+
+
+def add_ssh_host(
+    ec2: Any, inst: dict, identity_file: str
+) -> tuple[str, str | None]:
+    """Write the managed ~/.ssh/config entry for inst. Returns (login user,
+    alias or None)."""
+    images = ec2.describe_images(ImageIds=[inst["ImageId"]])["Images"]
+    image_name = images[0].get("Name") if images else None
+    user = default_user(image_name, inst.get("Architecture"))
+    entry = entry_for(inst, ec2.meta.region_name, user)
+    if entry is None:
+        return user, None
+    entry.identity_file = identity_file
+    update_hosts([entry])
+    aws_log(
+        event=EVENT,
+        attribute=(
+            f"🔗 ~/.ssh/config: Host {entry.alias} -> {user}@{entry.hostname}"
+        ),
+        verbose=True,
+    )
+    return user, entry.alias
+
+
 def override_tag_name(spec: dict, tag_name: str) -> None:
     """Override the Name tag in TagSpecifications for both instance and volume."""
     if "TagSpecifications" in spec:
@@ -136,78 +276,190 @@ def check_instance_name_exists(ec2_client: Any, instance_name: str) -> bool:
         return False
     except ClientError as e:
         print(f"❌ Error checking for existing instances: {e}", file=sys.stderr)
-        sys.exit(1)
+        raise
 
 
 
-def main() -> None:
-    ap = argparse.ArgumentParser(description="Launch EC2 instance from YAML (minimal)")
-    ap.add_argument("yaml_path", type=Path, help="Path to launch YAML")
-    ap.add_argument("--profile", help="AWS profile name (e.g., default)")
-    ap.add_argument("--region", help="AWS region (e.g., us-east-1)")
-    ap.add_argument("--dry-run", action="store_true", help="Validate parameters only")
-    ap.add_argument("--storage", type=int, help="Override volume size in GB")
-    ap.add_argument("--name", help="Override the Name tag for instance and volume")
-    args = ap.parse_args()
+class NameConflictError(RuntimeError):
+    """An instance with the requested Name tag already exists."""
 
-    spec = load_yaml(args.yaml_path)
-    spec.pop("Notes", None)
 
-    # Check environment variables first (set by ec2_launch_bootstrap.py)
-    default_aws_key = os.getenv('DEFAULT_AWS_KEY')
-    default_github_key = os.getenv('DEFAULT_GITHUB_KEY')
+@dataclass
+class LaunchResult:
+    """Structured outcome of a launch, consumed by the upload phase."""
+
+    instance_id: str
+    name: str | None
+    instance_type: str | None
+    public_ip: str | None
+    private_ip: str | None
+    aws_key: str
+    github_key: str
+    yaml_path: Path
+    user: str = "ubuntu"  # ec2_user@ for ARM arch
+    timings: dict[str, float] = field(default_factory=dict)
+    ssh_alias: str | None = (
+        None  # managed ~/.ssh/config Host entry, when written
+    )
+
+    @property
+    def host(self) -> str | None:
+        return self.public_ip or self.private_ip
+
+    @property
+    def ssh_target(self) -> str:
+        return f"{self.user}@{self.host}"
 
-    # If not set via environment, load from REPO_DEFAULTS
-    if not default_aws_key or not default_github_key:
-        aws_log(event=EVENT, attribute="no env keys set. Grabbing from repo defaults...")
+
+def resolve_keys(
+    aws_key: str | None = None, github_key: str | None = None
+) -> tuple[str, str]:
+    """Return full paths for the AWS and GitHub ssh keys.
+
+    Explicit key names win, then DEFAULT_AWS_KEY/DEFAULT_GITHUB_KEY env vars,
+    then REPO_DEFAULTS.
+    """
+    aws_key = aws_key or os.getenv("DEFAULT_AWS_KEY")
+    github_key = github_key or os.getenv("DEFAULT_GITHUB_KEY")
+
+    if not aws_key or not github_key:
+        aws_log(
+            event=EVENT,
+            attribute="no env keys set. Grabbing from repo defaults...",
+        )
         user_defaults_from_file_all = load_yaml(user_configs.REPO_DEFAULTS)
         user_defaults_from_file = user_defaults_from_file_all["default"]
-        if not default_aws_key:
-            default_aws_key = f"{user_configs.SSH_KEYS_DIR}/{user_defaults_from_file['aws']['default_key']}"
-        if not default_github_key:
-            default_github_key = f"{user_configs.SSH_KEYS_DIR}/{user_defaults_from_file['github']['default_key']}"
-    else:
-        default_aws_key = f"{user_configs.SSH_KEYS_DIR}/{default_aws_key}"
-        default_github_key = f"{user_configs.SSH_KEYS_DIR}/{default_github_key}"
+        aws_key = aws_key or user_defaults_from_file["aws"]["default_key"]
+        github_key = (
+            github_key or user_defaults_from_file["github"]["default_key"]
+        )
+
+    return (
+        f"{user_configs.SSH_KEYS_DIR}/{aws_key}",
+        f"{user_configs.SSH_KEYS_DIR}/{github_key}",
+    )
+
+
+def add_key_to_agent(key_path: str) -> None:
+    """ssh-add the key so that ssh -A can forward it to the remote machine."""
+    print(
+        f"✅  ssh-add {key_path} 🔑  - verify via ssh-add -l  "
+        "#ssh authentication agent"
+    )
+    os.system(f"ssh-add {key_path}")
+    print("\n")
+
+
+def launch_from_yaml(
+    yaml_path: Path,
+    name: str | None = None,
+    storage: int | None = None,
+    profile: str | None = None,
+    region: str | None = None,
+    dry_run: bool = False,
+    aws_key: str | None = None,
+    github_key: str | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+    ebs_profile: str | None = None,
+    iops: int | None = None,
+    throughput: int | None = None,
+    fallback: bool | list[str] = False,
+    max_price: float | None = None,
+    ssh_config: bool = True,
+    ) -> LaunchResult | None:
+    """Launch an instance from a YAML spec and wait until it is running.
+
+    fallback: True to retry capacity errors in other AZs and with catalog
+    types, or a list of fallback instance types.  ssh_config writes a managed
+    ~/.ssh/config Host entry for the instance's Name (src/ssh_config.py).
+    Returns None for a successful dry-run (or if AWS returned no instances).
+    Raises NameConflictError when an instance with the same Name is already
+    pending/running/stopped.
+    """
+    t_start = time.perf_counter()
+
+    spec = load_yaml(yaml_path, validate_launch_template)
+    spec.pop("Notes", None)
+
+    default_aws_key, default_github_key = resolve_keys(aws_key, github_key)
 
     # Apply overrides if provided
-    if args.storage:
-        override_volume_size(spec, args.storage)
+    if storage:
+        override_volume_size(spec, storage)
     
-    if args.name:
-        override_tag_name(spec, args.name)
-
-    # Create boto3 session
-    session_args = {}
-    if args.profile:
-        session_args["profile_name"] = args.profile
-    if args.region:
-        session_args["region_name"] = args.region
+    if name:
+        override_tag_name(spec, name)
+
+    # Create boto3 session (with recorded responses when record/replay is set)
+    # was boto3.session.Session(blah)
+    session = make_session(profile, region, record, replay)
+    if fallback:
+        ec2 = session.client("ec2", config=FAST_CLIENT_CONFIG)
+    else:
+        ec2 = session.client("ec2")
 
-    session = boto3.Session(**session_args) # was boto3.session.Session(blah)
-    ec2 = session.client("ec2")
+    if ebs_profile or iops or throughput:
+        provision_volumes(ec2, spec, ebs_profile, iops, throughput)
 
     # Check if instance name already exists
-    instance_name = extract_instance_name(spec) or args.name
+    instance_name = extract_instance_name(spec) or name
     if instance_name:
         if check_instance_name_exists(ec2, instance_name):
-            print(f"❌ Error: An instance with the name '{instance_name}' already exists.", file=sys.stderr)
-            print(f"👉 Choose a different name or terminate conflicting instance.", file=sys.stderr)
-            sys.exit(1)
+            raise NameConflictError(
+                f"An instance with the name '{instance_name}' already exists."
+            )
+
+    timings: dict[str, float] = {}
+    primary_type = spec["InstanceType"]
+    attempts = None
+    if fallback:
+        t0 = time.perf_counter()
+        aws_log(
+            event=EVENT,
+            attribute="🔁 launch attempts (capacity fallback):",
+            verbose=True,
+        )
+        types = fallback if isinstance(fallback, list) else None
+        attempts = plan_fallback(ec2, spec, types, max_price)
+        timings["plan_fallback"] = time.perf_counter() - t0
+
+    def log_capacity_miss(attempt: Any, code: str) -> None:
+        aws_log(
+            event=EVENT,
+            attribute=f"⚠️ {code}: {attempt.label}, trying next",
+            verbose=True,
+        )
 
+    t0 = time.perf_counter()
     try:
-        resp = ec2.run_instances(**spec, DryRun=args.dry_run)
+        if attempts is not None:
+            resp, spec = run_with_fallback(
+                ec2, spec, attempts, dry_run, log_capacity_miss
+            )
+        else:
+            resp = ec2.run_instances(**spec, DryRun=dry_run)
 
     except ClientError as e:
-        if args.dry_run and "DryRunOperation" in str(e):
+        if dry_run and "DryRunOperation" in str(e):
             print("[ok] Dry-run successful; parameters are valid.")
-            return
+            return None
         raise
+    timings["run_instances"] = time.perf_counter() - t0
+    if ebs_profile and spec["InstanceType"] != primary_type:
+        # gp3 sizing ran once, before fallback, against the primary type's EBS
+        # limits
+        aws_log(
+            event=EVENT,
+            attribute=f"⚠️ EBS {ebs_profile} plan was sized for "
+            f"{primary_type}, launched {spec['InstanceType']}",
+            verbose=True,
+        )
 
     instances = resp.get("Instances", [])
     if not instances:
         print("[warn] No Instances returned.")
-        return
+        return None
 
     inst = instances[0]
     instance_id = inst["InstanceId"]
@@ -219,56 +471,189 @@ def main() -> None:
     aws_log(event=EVENT, 
             attribute="[..] Waiting for instance to enter running state...", 
             verbose=True)
+    t0 = time.perf_counter()
     waiter.wait(InstanceIds=[instance_id])
+    timings["wait_running"] = time.perf_counter() - t0
 
     # Refresh details
+    t0 = time.perf_counter()
     desc = ec2.describe_instances(InstanceIds=[instance_id])
     inst_info = desc["Reservations"][0]["Instances"][0]
+    timings["describe"] = time.perf_counter() - t0
+    timings["total"] = time.perf_counter() - t_start
 
     name_tag = extract_instance_name(spec)
+    user, ssh_alias = "ubuntu", None
+    if ssh_config:
+        user, ssh_alias = add_ssh_host(ec2, inst_info, default_aws_key)
 
-    print('\n')
-    print(f"✅ Instance {name_tag} now running")
+    yaml_filename = yaml_path.name
+    attribute = f"{yaml_filename}({name_tag})" if name_tag else yaml_filename
+    aws_log(event=EVENT, attribute=attribute)
 
-    public_ip = inst_info.get("PublicIpAddress")
-    private_ip = inst_info.get("PrivateIpAddress")
+    return LaunchResult(
+        instance_id=instance_id,
+        name=name_tag,
+        instance_type=inst_info.get("InstanceType", spec.get("InstanceType")),
+        public_ip=inst_info.get("PublicIpAddress"),
+        private_ip=inst_info.get("PrivateIpAddress"),
+        aws_key=default_aws_key,
+        github_key=default_github_key,
+        yaml_path=yaml_path,
+        user=user,
+        timings=timings,
+        ssh_alias=ssh_alias,
+    )
+
+
+def print_launch_summary(result: LaunchResult) -> None:
+    """Print the running-instance details and useful SSH/SCP user commands."""
+    print("\n")
+    print(f"✅ Instance {result.name} now running")
+
+    if result.public_ip:
+        print(f"📡 Public IP: {result.public_ip}")
+    if result.private_ip:
+        print(f"🔒 Private IP: {result.private_ip}")
+
+    if result.ssh_alias:
+        print(
+            f"👉 ~/.ssh/config has Host {result.ssh_alias} (multiplexed): "
+            f"ssh {result.ssh_alias}"
+        )
+    else:
+        print(
+            "👉 Add public IP address to ~/.ssh/config "
+            "to support quick launch via ssh blah"
+        )
+    print("\n")
 
-    if public_ip:
-        print(f"📡 Public IP: {public_ip}")
-    if private_ip:
-        print(f"🔒 Private IP: {private_ip}")
+    print(result.aws_key)
+    print(result.github_key)
 
+    print(
+        f"👉 export default_aws_key={result.aws_key} "
+        "if you want to persist the 🔑"
+    )
+    print("\n")
 
-    print("👉 Add public IP address to ~/.ssh/config to support quick launch via ssh blah")
-    print('\n')
+    add_key_to_agent(result.github_key)
 
-    print(default_aws_key)
-    print(default_github_key)
-    
-    print(f'👉 export default_aws_key={default_aws_key} if you want to persist the 🔑')
-    print('\n')
+    scp_location = user_configs.BOOTSTRAP_DIR
+    print("📡 💾 copy set-up scripts to remote machine:")
+    print(
+        f"👉 scp -i {result.aws_key} -r {scp_location}/ "
+        f"{result.user}@{result.public_ip}:~/"
+    )
+    print("\n")
 
-    print(f'✅  ssh-add {default_github_key} 🔑  - verify via ssh-add -l  #ssh authentication agent')
-    os.system(f'ssh-add {default_github_key}')
-    print('\n')
+    # print(f'🤖 run remotely using:')
+    # print(f'👉 ssh -A -i {default_aws_key} ubuntu@{public_ip} '
+    #       '"bash ~/bootstrap/run.sh"')
+    # print('\n')
 
-    scp_location = user_configs.BOOTSTRAP_DIR
-    print(f'📡 💾 copy set-up scripts to remote machine:')
-    print(f'👉 scp -i {default_aws_key} -r {scp_location}/ ubuntu@{public_ip}:~/')
-    print('\n')
+    print("🖥️  or login to remote machine:")
+    # ec2_user@ for ARM arch
+    print(f"👉 ssh -A -i {result.aws_key} {result.user}@{result.public_ip}")
+    print("\n")
 
-    #print(f'🤖 run remotely using:')
-    #print(f'👉 ssh -A -i {default_aws_key} ubuntu@{public_ip} "bash ~/bootstrap/run.sh"')
-    #print('\n')
 
-    print(f'🖥️  or login to remote machine:')
-    print(f'👉 ssh -A -i {default_aws_key} ubuntu@{public_ip}') # ec2_user@ for ARM arch
-    print('\n')
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Launch EC2 instance from YAML (minimal)"
+    )
+    ap.add_argument("yaml_path", type=Path, help="Path to launch YAML")
+    ap.add_argument("--profile", help="AWS profile name (e.g., default)")
+    ap.add_argument("--region", help="AWS region (e.g., us-east-1)")
+    ap.add_argument(
+        "--dry-run", action="store_true", help="Validate parameters only"
+    )
+    ap.add_argument("--storage", type=int, help="Override volume size in GB")
+    ap.add_argument(
+        "--name", help="Override the Name tag for instance and volume"
+    )
+    ap.add_argument(
+        "--ebs-profile",
+        choices=PROFILES,
+        help="Size gp3 Iops/Throughput from the instance's EBS baseline "
+        "(balanced) or max bandwidth",
+    )
+    ap.add_argument(
+        "--iops",
+        type=int,
+        help="gp3 Iops for all volumes (overrides --ebs-profile)",
+    )
+    ap.add_argument(
+        "--throughput",
+        type=int,
+        help="gp3 Throughput in MiB/s for all volumes "
+        "(overrides --ebs-profile)",
+    )
+    ap.add_argument(
+        "--fallback",
+        action="store_true",
+        help="On capacity errors retry other AZs, then the cheapest similar "
+        "catalog types",
+    )
+    ap.add_argument(
+        "--fallback-types",
+        help="Comma-separated fallback instance types (implies --fallback)",
+    )
+    ap.add_argument(
+        "--max-price", type=float, help="Max $/hr for catalog fallback types"
+    )
+    ap.add_argument(
+        "--no-ssh-config",
+        action="store_true",
+        help="Do not add a ~/.ssh/config Host entry",
+    )
+    add_replay_args(ap)
+    add_metrics_args(ap)
+    args = ap.parse_args()
+    setup_metrics(args.metrics, args.cprofile)
+    if (args.record or args.replay) and not args.dry_run:
+        ap.error(
+            "--record/--replay are for --dry-run runs "
+            "(a replayed launch would not be real)"
+        )
 
-    yaml_filename = args.yaml_path.name
-    attribute = f"{yaml_filename}({name_tag})" if name_tag else yaml_filename
+    try:
+        result = launch_from_yaml(
+            args.yaml_path,
+            name=args.name,
+            storage=args.storage,
+            profile=args.profile,
+            region=args.region,
+            dry_run=args.dry_run,
+            record=args.record,
+            replay=args.replay,
+            ebs_profile=args.ebs_profile,
+            iops=args.iops,
+            throughput=args.throughput,
+            fallback=(
+                args.fallback_types.split(",")
+                if args.fallback_types
+                else args.fallback
+            ),
+            max_price=args.max_price,
+            ssh_config=not args.no_ssh_config,
+        )
+    except ReplayMissError:
+        sys.exit(1)
+    except NameConflictError as e:
+        print(f"❌ Error: {e}", file=sys.stderr)
+        print(
+            "👉 Choose a different name or terminate conflicting instance.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    except (NoOfferingError, ClientError, WaiterError) as e:
+        aws_log(event=EVENT, attribute=f"❌ Error: {e}", verbose=True)
+        sys.exit(1)
+    if result is None:
+        return
 
-    aws_log(event=EVENT, attribute=attribute)
+    print_launch_summary(result)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# List the launch templates as the launcher sees them (see
+# src/template_registry.py): instance type, Ubuntu release, DLAMI, arch, volume
+# size and AMI per template, plus any mismatch between a template's filename /
+# directory and its content.
+#
+# Usage examples:
+#   python ec2_launch_templates.py            # table of all templates
+#   python ec2_launch_templates.py --type g6  # only types starting with g6
+#   python ec2_launch_templates.py --check    # exit 1 if a template is flagged
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+import user_configs
+
+from template_registry import TemplateRegistry
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="List launch templates indexed by content"
+    )
+    ap.add_argument(
+        "--type", default="", help="only instance types starting with this"
+    )
+    ap.add_argument(
+        "--check", action="store_true", help="exit 1 if any template is flagged"
+    )
+    ap.add_argument(
+        "--dir",
+        type=Path,
+        default=user_configs.PROJECT_ROOT / "launch",
+        help="launch template directory",
+    )
+    args = ap.parse_args()
+
+    registry = TemplateRegistry.load(args.dir)
+    templates = sorted(
+        (
+            t
+            for t in registry.templates
+            if t.instance_type.startswith(args.type)
+        ),
+        key=lambda t: (t.instance_type, t.ubuntu or "", t.dlami),
+    )
+
+    print(
+        f"{'instance type':<14} {'ubuntu':<6} {'dlami':<5} {'arch':<6} "
+        f"{'GB':>4}  {'ami':<21}  template"
+    )
+    for t in templates:
+        flag = "  ⚠️" if t.mismatches else ""
+        dlami = "Y" if t.dlami else "N"
+        print(
+            f"{t.instance_type:<14} {t.ubuntu or '?':<6} {dlami:<5} "
+            f"{t.arch:<6} "
+            f"{t.volume_size or '-':>4}  {t.image_id:<21}  "
+            f"{t.path.relative_to(args.dir)}{flag}"
+        )
+
+    flagged = [t for t in templates if t.mismatches]
+    for t in flagged:
+        print(f"\n⚠️ {t.path.relative_to(args.dir)}")
+        for mismatch in t.mismatches:
+            print(f"   - {mismatch}")
+    for path, error in registry.errors.items():
+        print(f"\n❌ {path.relative_to(args.dir)}: {error}")
+
+    if args.check and (flagged or registry.errors):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
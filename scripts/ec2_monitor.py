@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Utilization of all running instances from CloudWatch, without logging in to
+# each one (see src/fleet_monitor.py).
+#
+# High-level overview:
+#   - Lists running instances (optionally by Name tag pattern) with one
+#     describe_instances
+#   - Pulls cpu / network / gpu for all of them with batched get_metric_data
+#     calls (up to 500 metric queries per call) and keeps a rolling series in
+#     outputs/monitor/
+#   - Prints a table with the latest values and flags instances idle for the
+#     whole window
+#   - --stop stops the idle ones (one batched stop call, see
+#     src/instance_actions.py)
+#
+# Usage examples:
+#   python ec2_monitor.py                     # one poll, table + idle flags
+#   python ec2_monitor.py 'node-*' --idle-minutes 120
+#   python ec2_monitor.py --watch 5           # poll every 5 minutes
+#   python ec2_monitor.py --stop --dry-run    # show what would be stopped
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+import user_configs
+
+from aws_logger import aws_log
+from aws_replay import make_session
+from fleet_monitor import IdleThresholds
+from fleet_monitor import SeriesStore
+from fleet_monitor import fetch_metrics
+from fleet_monitor import find_idle
+from fleet_monitor import list_instances
+from instance_actions import Target
+from instance_actions import act
+
+EVENT = "EC2_monitor"
+
+
+def latest(store: SeriesStore, instance_id: str, key: str) -> float | None:
+    points = store.data.get(instance_id, {}).get(key)
+    return points[-1][1] if points else None
+
+
+def fmt(value: float | None, scale: float = 1, unit: str = "") -> str:
+    return "-" if value is None else f"{value / scale:.1f}{unit}"
+
+
+def poll(
+    ec2: Any,
+    cloudwatch: Any,
+    store: SeriesStore,
+    args: argparse.Namespace,
+    thresholds: IdleThresholds,
+) -> dict[str, str]:
+    t0 = time.perf_counter()
+    instances = list_instances(ec2, args.names or None)
+    now = time.time()
+    lookback = thresholds.window_minutes * 60 + 2 * args.period
+    last = store.last_time([i.instance_id for i in instances])
+    start = (
+        now - lookback
+        if last is None
+        else max(now - lookback, last - args.period)
+    )
+
+    fetched, calls = (
+        fetch_metrics(cloudwatch, instances, start, now, args.period)
+        if instances
+        else ({}, 0)
+    )
+    store.merge(fetched)
+    store.trim(now, keep={i.instance_id for i in instances})
+    store.save()
+    idle = find_idle(store, instances, thresholds, args.period, now)
+
+    print(
+        f"\n{time.strftime('%H:%M:%S')}  {len(instances)} running, "
+        f"{calls} get_metric_data call(s), "
+        f"{time.perf_counter() - t0:.1f}s"
+    )
+    print(
+        f"{'name':<20} {'instance':<20} {'type':<13} "
+        f"{'cpu':>6} {'gpu':>6} {'net MB':>8}  idle"
+    )
+    for inst in sorted(instances, key=lambda i: i.name or i.instance_id):
+        net = [
+            latest(store, inst.instance_id, k) for k in ("net_in", "net_out")
+        ]
+        net_total = (
+            sum(v for v in net if v is not None)
+            if any(v is not None for v in net)
+            else None
+        )
+        print(
+            f"{(inst.name or '-')[:20]:<20} {inst.instance_id:<20} "
+            f"{inst.instance_type:<13} "
+            f"{fmt(latest(store, inst.instance_id, 'cpu'), unit='%'):>6} "
+            f"{fmt(latest(store, inst.instance_id, 'gpu'), unit='%'):>6} "
+            f"{fmt(net_total, 1e6):>8}  {idle.get(inst.instance_id, '')}"
+        )
+
+    names = {i.instance_id: i.name for i in instances}
+    return {
+        instance_id: f"{names[instance_id]} ({reason})"
+        for instance_id, reason in idle.items()
+    }
+
+
+def stop_idle(ec2: Any, idle: dict[str, str], dry_run: bool) -> None:
+    for instance_id, reason in idle.items():
+        print(f"💤 {instance_id} {reason}")
+    if dry_run:
+        print(f"(dry-run) would stop {len(idle)} idle instance(s)")
+        return
+    region = ec2.meta.region_name
+    act(
+        {region: ec2},
+        "stop",
+        [Target(region, instance_id, None, "running") for instance_id in idle],
+    )
+    for instance_id, reason in idle.items():
+        aws_log(
+            event=EVENT,
+            attribute=f"🛑 stopped idle {instance_id} {reason}",
+            verbose=True,
+        )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Batched CloudWatch utilization + idle detection"
+    )
+    ap.add_argument(
+        "names",
+        nargs="*",
+        help="only instances whose Name tag matches (wildcards ok)",
+    )
+    ap.add_argument(
+        "--period",
+        type=int,
+        default=300,
+        help="metric period in seconds (default: 300)",
+    )
+    ap.add_argument(
+        "--idle-minutes", type=int, default=60, help="idle window (default: 60)"
+    )
+    ap.add_argument(
+        "--cpu",
+        type=float,
+        default=5.0,
+        help="idle if cpu stays below this %% (default: 5)",
+    )
+    ap.add_argument(
+        "--gpu",
+        type=float,
+        default=5.0,
+        help="idle if gpu stays below this %% (default: 5)",
+    )
+    ap.add_argument(
+        "--net-mb",
+        type=float,
+        default=5.0,
+        help="idle if in+out stays below this many MB per period (default: 5)",
+    )
+    ap.add_argument(
+        "--stop", action="store_true", help="stop instances found idle"
+    )
+    ap.add_argument(
+        "--dry-run", action="store_true", help="with --stop: only report"
+    )
+    ap.add_argument(
+        "--watch",
+        type=float,
+        metavar="MINUTES",
+        help="keep polling every N minutes",
+    )
+    ap.add_argument(
+        "--store",
+        type=Path,
+        default=user_configs.OUTPUTS_DIR / "monitor" / "series.json",
+        help="rolling time-series file",
+    )
+    ap.add_argument("--profile", help="AWS profile name")
+    ap.add_argument("--region", help="AWS region")
+    args = ap.parse_args()
+
+    thresholds = IdleThresholds(
+        args.idle_minutes, args.cpu, args.gpu, args.net_mb * 1e6
+    )
+    session = make_session(args.profile, args.region)
+    ec2, cloudwatch = session.client("ec2"), session.client("cloudwatch")
+    store = SeriesStore(args.store)
+
+    while True:
+        idle = poll(ec2, cloudwatch, store, args, thresholds)
+        if idle and args.stop:
+            stop_idle(ec2, idle, args.dry_run)
+        if not args.watch:
+            break
+        time.sleep(args.watch * 60)
+
+
+if __name__ == "__main__":
+    main()
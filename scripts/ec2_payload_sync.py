@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Build the content-addressed bootstrap payload and optionally sync it to a
+# remote.
+#
+# High-level overview:
+#   - Packs bootstrap/ + the chosen config into a cached .tar.gz named by
+#     content hash
+#   - Syncs to an instance over ssh (full archive first time, changed files
+#     afterwards)
+#   - --local-remote syncs into a local directory instead of an instance
+#   - --check runs a self-contained full sync -> edit -> delta sync round trip
+#     in a temp dir and reports bytes sent vs the full archive
+#
+# Usage examples:
+#   python ec2_payload_sync.py ~/aws-utils/bootstrap/config_t3a_2404.yaml
+#   python ec2_payload_sync.py config.yaml --host ubuntu@1.2.3.4 \
+#       --key ~/.ssh/default_ed25519
+#   python ec2_payload_sync.py config.yaml --local-remote /tmp/fake_home
+#   python ec2_payload_sync.py config.yaml --bundle outputs/bundles/config \
+#       --host ubuntu@1.2.3.4
+#   python ec2_payload_sync.py config.yaml --check
+# -----------------------------------------------------------------------------
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+import user_configs
+
+from bootstrap_payload import EXCLUDE_NAMES
+from bootstrap_payload import PAYLOAD_ROOT
+from bootstrap_payload import LocalRemote
+from bootstrap_payload import SSHRemote
+from bootstrap_payload import SyncStats
+from bootstrap_payload import build_payload
+from bootstrap_payload import sync_payload
+
+
+def print_stats(label: str, stats: SyncStats) -> None:
+    print(
+        f"{label:<14} mode={stats.mode:<5} sent={stats.bytes_sent:>9,} B "
+        f"full={stats.full_bytes:>9,} B saved={stats.bytes_saved:>9,} B "
+        f"files={stats.files_sent} removed={stats.files_removed}"
+    )
+
+
+def check_round_trip(config_path: Path) -> bool:
+    """Full sync, edit a step, delta sync, no-op sync; check the remote copy."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        src = tmp_dir / "bootstrap"
+        shutil.copytree(
+            user_configs.BOOTSTRAP_DIR,
+            src,
+            ignore=shutil.ignore_patterns(*EXCLUDE_NAMES, "*.log"),
+        )
+        cache = tmp_dir / "cache"
+        remote = LocalRemote(tmp_dir / "remote_home")
+
+        payload = build_payload(src, config_path, cache_dir=cache)
+        print_stats("initial", sync_payload(payload, remote))
+
+        step = sorted((src / "steps").glob("*.sh"))[0]
+        step.write_text(step.read_text() + "\n# edited\n")
+        payload = build_payload(src, config_path, cache_dir=cache)
+        delta = sync_payload(payload, remote)
+        print_stats("after edit", delta)
+        print_stats("no change", sync_payload(payload, remote))
+
+        mismatched = [
+            rel
+            for rel, path in payload.files.items()
+            if (remote.root / rel).read_bytes() != path.read_bytes()
+        ]
+        ok = (
+            delta.mode == "delta"
+            and delta.bytes_sent < delta.full_bytes
+            and not mismatched
+        )
+        print(
+            "✅ remote matches source"
+            if ok
+            else f"❌ check failed: {mismatched or delta}"
+        )
+        return ok
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Build/sync the content-addressed bootstrap payload"
+    )
+    ap.add_argument("config", type=Path, help="Path to bootstrap config yaml")
+    ap.add_argument(
+        "--bootstrap-dir",
+        type=Path,
+        default=user_configs.BOOTSTRAP_DIR,
+        help="bootstrap directory to pack (default: repo bootstrap/)",
+    )
+    ap.add_argument(
+        "--bundle",
+        type=Path,
+        help="offline package bundle to ship as ~/bootstrap/bundle "
+        "(ec2_bootstrap_bundle.py)",
+    )
+    ap.add_argument("--host", help="user@host to sync to over ssh")
+    ap.add_argument("--key", help="ssh identity file for --host")
+    ap.add_argument(
+        "--local-remote",
+        type=Path,
+        help="sync into this local dir instead of a host",
+    )
+    ap.add_argument(
+        "--check",
+        action="store_true",
+        help="run a local full/delta sync round trip",
+    )
+    args = ap.parse_args()
+
+    if args.check:
+        sys.exit(0 if check_round_trip(args.config) else 1)
+
+    payload = build_payload(
+        args.bootstrap_dir, args.config, bundle_dir=args.bundle
+    )
+    print(
+        f"📦 {payload.archive} ({payload.archive.stat().st_size:,} B, "
+        f"{len(payload.files)} files, digest {payload.digest[:16]})"
+    )
+
+    remote: LocalRemote | SSHRemote | None = None
+    if args.local_remote:
+        remote = LocalRemote(args.local_remote)
+    elif args.host:
+        ssh_opts = ["-o", "StrictHostKeyChecking=no"] + (
+            ["-i", args.key] if args.key else []
+        )
+        remote = SSHRemote(args.host, ssh_opts)
+
+    if remote is not None:
+        print_stats(f"~/{PAYLOAD_ROOT}", sync_payload(payload, remote))
+
+
+if __name__ == "__main__":
+    main()
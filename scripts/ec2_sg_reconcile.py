@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Bring the ingress rules of security groups in line with a desired set of
+# (port, cidr) (see src/sg_reconcile.py).  Replaces calling ec2_allow_ip /
+# ec2_revoke_ip per instance and per port: one describe for the instances, one
+# for the groups, then one authorize + one revoke per group that actually needs
+# changes.
+#
+# Modes:
+#   sync   (default) allow the cidrs on the ports, revoke every other cidr on
+#          those ports
+#   allow  only add missing rules
+#   revoke only remove the given cidrs
+#
+# Usage examples:
+#   # my current IP on 22 + 8888, drop old IPs
+#   python ec2_sg_reconcile.py node-*
+#   python ec2_sg_reconcile.py node0 node1 --ports 22 --cidr 10.0.0.0/16 \
+#       --mode allow
+#   python ec2_sg_reconcile.py --sg sg-0c1f8430a8cf53bec --keep 10.0.0.0/16 \
+#       --dry-run
+#   # like ec2_revoke_ip node0
+#   python ec2_sg_reconcile.py node0 --mode revoke
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+from aws_logger import aws_log
+from aws_replay import make_session
+from sg_reconcile import DEFAULT_PORTS
+from sg_reconcile import MODES
+from sg_reconcile import Rule
+from sg_reconcile import apply_changes
+from sg_reconcile import current_rules
+from sg_reconcile import groups_for_instances
+from sg_reconcile import my_cidr
+from sg_reconcile import normalise_cidr
+from sg_reconcile import plan_changes
+
+EVENT = "EC2_sg_reconcile"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Reconcile security-group ingress for ports/cidrs"
+    )
+    ap.add_argument(
+        "names",
+        nargs="*",
+        help="instance Name tags (wildcards ok); their groups are used",
+    )
+    ap.add_argument(
+        "--sg",
+        action="append",
+        default=[],
+        help="security group id (repeatable)",
+    )
+    ap.add_argument(
+        "--ports",
+        default=",".join(map(str, DEFAULT_PORTS)),
+        help="comma-separated tcp ports to manage (default: %(default)s)",
+    )
+    ap.add_argument(
+        "--cidr",
+        action="append",
+        default=[],
+        help="cidr to allow/revoke (repeatable, default: my public IP/32)",
+    )
+    ap.add_argument(
+        "--keep",
+        action="append",
+        default=[],
+        help="cidr never revoked by sync (repeatable)",
+    )
+    ap.add_argument("--mode", choices=MODES, default="sync")
+    ap.add_argument(
+        "--stopped",
+        action="store_true",
+        help="also match stopped instances by name",
+    )
+    ap.add_argument("--profile", help="AWS profile name")
+    ap.add_argument("--region", help="AWS region")
+    ap.add_argument(
+        "--dry-run", action="store_true", help="show the plan, change nothing"
+    )
+    args = ap.parse_args()
+
+    if not args.names and not args.sg:
+        ap.error("give instance names and/or --sg")
+
+    try:
+        ports = {int(p) for p in args.ports.split(",") if p}
+        cidrs = [normalise_cidr(c) for c in args.cidr] or [my_cidr()]
+        keep = {normalise_cidr(c) for c in args.keep}
+    except ValueError as e:
+        ap.error(str(e))
+    desired = {Rule(port, cidr) for port in ports for cidr in cidrs}
+
+    session = make_session(args.profile, args.region)
+    ec2 = session.client("ec2")
+
+    groups: dict[str, list[str]] = {sg: [] for sg in args.sg}
+    if args.names:
+        states = ("running", "stopped") if args.stopped else ("running",)
+        for sg, names in groups_for_instances(ec2, args.names, states).items():
+            groups.setdefault(sg, []).extend(names)
+        if not any(groups.values()) and not args.sg:
+            aws_log(
+                event=EVENT,
+                attribute=f"❌ no instances match {' '.join(args.names)}",
+                verbose=True,
+            )
+            sys.exit(1)
+
+    current = current_rules(ec2, list(groups), ports)
+    changes = plan_changes(current, desired, args.mode, keep)
+
+    for sg, change in changes.items():
+        used_by = f" ({', '.join(sorted(groups[sg]))})" if groups[sg] else ""
+        print(f"🔐 {sg}{used_by}")
+        for rule in sorted(change.add):
+            print(f"   + {rule}")
+        for rule in sorted(change.remove):
+            print(f"   - {rule}")
+        if not change:
+            print("   = up to date")
+
+    if args.dry_run or not any(changes.values()):
+        return
+
+    errors = apply_changes(ec2, changes, description=f"{EVENT} {args.mode}")
+    for sg, change in changes.items():
+        if not change:
+            continue
+        if sg in errors:
+            aws_log(
+                event=EVENT, attribute=f"❌ {sg}: {errors[sg]}", verbose=True
+            )
+        else:
+            aws_log(
+                event=EVENT,
+                attribute=f"✅ {sg}: +{len(change.add)} -{len(change.remove)} "
+                f"({args.mode} {','.join(cidrs)} on {args.ports})",
+                verbose=True,
+            )
+    if errors:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,19 +6,51 @@
 # detailed specs including CPU, memory, GPU, storage, and network performance.
 # Results are displayed as a DataFrame and can be saved to CSV.
 #
+# --stream csv|jsonl runs the same steps as a pipeline instead: each
+# describe_instance_types page is flattened and priced (a few lookups in flight
+# at once) while the next page is fetched, and every row is written out as soon
+# as it is ready - to stdout, or appended to --stream-to FILE.  The sorted table
+# is still built at the end (printed to stderr so stdout stays pipe-able, and
+# --save works as usual).
+#
 # Usage examples:
 #   python ec2_specs_price.py --fam t --vcpus 2
 #   python ec2_specs_price.py --pattern "g5.*" --price --save g_instances.csv
+#   # save AWS responses, then rerun offline from them
+#   python ec2_specs_price.py --fam g --price --record ~/aws-frozen
+#   python ec2_specs_price.py --fam g --price --replay ~/aws-frozen
+#   # + measured throughput per $ (12_benchmark.sh)
+#   python ec2_specs_price.py --fam g --price --bench
+#   python ec2_specs_price.py --pattern "*" --price --stream jsonl \
+#       | jq -c 'select(.USDPerHr < 0.5)'
+#   python ec2_specs_price.py --fam m --price --stream csv \
+#       --stream-to m_rows.csv --silent
+#   # where time goes
+#   python ec2_specs_price.py --fam g --price --metrics run.json \
+#       --cprofile run.prof
+#   # index for the zsh helpers
+#   python ec2_specs_price.py --pattern "*" --price --stream csv --silent \
+#       --index
 #
 # To do:
 #  - a more robust way to pass region configs
 
 
+import argparse
+import csv
+import json
+import math
+import os
 import sys
+import time
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from pathlib import Path
-import argparse
-import yaml
 from typing import Any
+from typing import TextIO
 
 import boto3
 import pandas as pd
@@ -31,29 +63,40 @@ sys.path.append(str(CONFIGS_DIR))
 
 import user_configs
 
+from aws_metrics import add_metrics_args
+from aws_metrics import setup as setup_metrics
+from aws_replay import ReplayMissError
+from aws_replay import add_replay_args
+from aws_replay import make_session
+from benchmark_results import add_bench_columns
+from benchmark_results import load_reports
+from config_cache import load_yaml
+from config_cache import validate_regions
 from get_prices import ondemand2
+from lookup_index import INDEX_PATH
+from lookup_index import write_index
 
-with open(CONFIGS_DIR / "regions.yaml", "r") as f:
-    REGION_TO_LOCATION = yaml.safe_load(f)
+REGION_TO_LOCATION = load_yaml(CONFIGS_DIR / "regions.yaml", validate_regions)
 
 
-def collect_instance_types(
+def iter_instance_types(
     pattern: str, 
     vcpus: int, 
     region: str, 
-    profile: str
-    ) -> list[dict[str, Any]]:
+    profile: str,
+    session: boto3.Session | None = None,
+    ) -> Iterator[dict[str, Any]]:
 
-    #Call EC2 DescribeInstanceTypes with filters and return the raw items
-    if profile:
+    #Call EC2 DescribeInstanceTypes with filters and yield the raw items page by
+    #page
+    if session is None and profile:
         boto3.setup_default_session(profile_name=profile)
-    ec2 = boto3.client("ec2", region_name=region)
+    ec2 = (session or boto3).client("ec2", region_name=region)
 
     filters = [{"Name": "instance-type", "Values": [pattern]}]
     if vcpus is not None:
         filters.append({"Name": "vcpu-info.default-vcpus", "Values": [str(vcpus)]})
 
-    items: list[dict[str, Any]] = []
     next_token: Any = None
     
     while True:
@@ -61,11 +104,22 @@ def collect_instance_types(
         if next_token:
             kwargs["NextToken"] = next_token
         resp = ec2.describe_instance_types(**kwargs)
-        items.extend(resp.get("InstanceTypes", []))
+        yield from resp.get("InstanceTypes", [])
         next_token = resp.get("NextToken")
         if not next_token:
             break
-    return items
+
+
+def collect_instance_types(
+    pattern: str,
+    vcpus: int,
+    region: str,
+    profile: str,
+    session: boto3.Session | None = None,
+) -> list[dict[str, Any]]:
+
+    # All pages of DescribeInstanceTypes as one list of raw items
+    return list(iter_instance_types(pattern, vcpus, region, profile, session))
 
 
 def flatten(item: dict[str, Any]) -> dict[str, Any]:
@@ -101,20 +155,28 @@ def flatten(item: dict[str, Any]) -> dict[str, Any]:
 
 
 
-def add_prices_column(df: pd.DataFrame, region: str) -> pd.DataFrame:
-
+def pricing_location(
+    region: str, session: boto3.Session | None = None
+) -> str | None:
     if not region:
         # If region wasn’t specified, use the default session region for EC2 — then map to Pricing location.
-        session = boto3.Session()  #was boto3.session.Session()
+        # was boto3.session.Session()
+        session = session or boto3.Session()
         region = session.region_name or "us-east-1"
+    return REGION_TO_LOCATION.get(region)
+
+
+def add_prices_column(
+    df: pd.DataFrame, region: str, session: boto3.Session | None = None
+) -> pd.DataFrame:
 
-    location = REGION_TO_LOCATION.get(region)
+    location = pricing_location(region, session)
     if not location:
         # Fallback: if we can’t map, just return the df with NaNs
         df["USDPerHour"] = pd.NA
         return df
 
-    pricing = boto3.client("pricing", region_name="us-east-1")
+    pricing = (session or boto3).client("pricing", region_name="us-east-1")
 
     cache: dict[str, float] = {}
     prices: list[float] = []
@@ -130,6 +192,115 @@ def add_prices_column(df: pd.DataFrame, region: str) -> pd.DataFrame:
     return df
 
 
+def iter_priced(
+    rows: Iterable[dict[str, Any]],
+    region: str,
+    session: boto3.Session | None = None,
+    workers: int = 4,
+) -> Iterator[dict[str, Any]]:
+
+    # Add USDPerHr to each flattened row; yields rows as their lookups finish
+    # (not in input order).  At most 2 x workers lookups are queued, so rows
+    # are pulled from the pages only as fast as they can be priced.
+    location = pricing_location(region, session)
+    if not location:
+        for row in rows:
+            yield {**row, "USDPerHr": float("nan")}
+        return
+
+    pricing = (session or boto3).client("pricing", region_name="us-east-1")
+
+    def price(row: dict[str, Any]) -> dict[str, Any]:
+        usd = ondemand2(pricing, row["Type"], location)
+        return {**row, "USDPerHr": usd if usd is not None else float("nan")}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for row in rows:
+            pending.add(pool.submit(price, row))
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+class RowWriter:
+    """Writes rows one at a time as csv (header once, also when appending) or
+    JSON lines."""
+
+    def __init__(self, out: TextIO, fmt: str, header: bool = True) -> None:
+        self.out, self.fmt, self.header = out, fmt, header
+        self.csv: csv.DictWriter | None = None
+
+    def write(self, row: dict[str, Any]) -> None:
+        if self.fmt == "jsonl":
+            clean = {
+                k: None if isinstance(v, float) and math.isnan(v) else v
+                for k, v in row.items()
+            }
+            self.out.write(json.dumps(clean, default=str) + "\n")
+        else:
+            if self.csv is None:
+                self.csv = csv.DictWriter(self.out, fieldnames=list(row))
+                if self.header:
+                    self.csv.writeheader()
+            self.csv.writerow(row)
+        self.out.flush()
+
+
+def stream_rows(
+    args: argparse.Namespace, pattern: str, session: boto3.Session | None
+) -> pd.DataFrame:
+    # Run the pipeline, writing each row as it comes; returns the full (sorted)
+    # table at the end
+    t0 = time.perf_counter()
+    rows: Iterator[dict[str, Any]] = (
+        flatten(item)
+        for item in iter_instance_types(
+            pattern=pattern,
+            vcpus=args.vcpus,
+            region=args.region,
+            profile=args.profile,
+            session=session,
+        )
+    )
+    if args.price:
+        rows = iter_priced(rows, args.region, session, args.workers)
+
+    target = Path(args.stream_to) if args.stream_to else None
+    out = target.open("a", newline="") if target else sys.stdout
+    writer = RowWriter(
+        out, args.stream, header=not (target and target.stat().st_size)
+    )
+    collected = []
+    first = None
+    try:
+        for row in rows:
+            writer.write(row)
+            collected.append(row)
+            first = first or time.perf_counter() - t0
+    finally:
+        if target:
+            out.close()
+
+    elapsed = time.perf_counter() - t0
+    print(
+        f"{len(collected)} rows, first after {first or 0:.2f}s, "
+        f"all after {elapsed:.2f}s",
+        file=sys.stderr,
+    )
+    df = pd.DataFrame(collected)
+    if df.empty:
+        return df
+    return df.sort_values(
+        ["USDPerHr", "Type"] if args.price else ["Type"]
+    ).reset_index(drop=True)
+
+
 def main() -> None:
     ap = argparse.ArgumentParser(description="List EC2 instance specs.")
     ap.add_argument("--fam", default="t", help='Instance family/prefix. Pattern is "<fam>*" (default: t).')
@@ -140,25 +311,101 @@ def main() -> None:
     ap.add_argument("--save", default="", help="filename to save CSV in aws/outputs")
     ap.add_argument("--silent", action="store_true", help="Print the DataFrame.")
     ap.add_argument("--price", action="store_true", help="If set, add On-Demand Linux hourly price column.")
+    ap.add_argument(
+        "--stream",
+        choices=["csv", "jsonl"],
+        help="Pipeline mode: write each row as soon as it is flattened/priced.",
+    )
+    ap.add_argument(
+        "--stream-to",
+        metavar="FILE",
+        help="With --stream: append rows to FILE instead of stdout.",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="With --stream --price: concurrent price lookups (default: 4).",
+    )
+    ap.add_argument(
+        "--index",
+        nargs="?",
+        type=Path,
+        const=INDEX_PATH,
+        metavar="FILE",
+        help="Merge the rows into the zsh helpers' lookup index "
+        "(default: ~/.cache/aws-utils/ec2_index.tsv).",
+    )
+    ap.add_argument(
+        "--bench",
+        nargs="?",
+        type=Path,
+        const=user_configs.OUTPUTS_DIR / "benchmarks",
+        metavar="DIR",
+        help="Merge measured benchmark results (default: outputs/benchmarks).",
+    )
+    add_replay_args(ap)
+    add_metrics_args(ap)
     args = ap.parse_args()
+    setup_metrics(args.metrics, args.cprofile)
 
-    pattern = args.pattern if args.pattern else f"{args.fam}*"
-    items = collect_instance_types(pattern=pattern, vcpus=args.vcpus, region=args.region, profile=args.profile)
-
-    rows = [flatten(item) for item in items]
-    df = pd.DataFrame(rows).sort_values(["Type"]).reset_index(drop=True)
+    session = make_session(args.profile, record=args.record, replay=args.replay)
 
-    if args.price:
-        df = add_prices_column(df, args.region)
+    pattern = args.pattern if args.pattern else f"{args.fam}*"
+    if args.stream:
+        try:
+            df = stream_rows(args, pattern, session)
+        except ReplayMissError:
+            sys.exit(1)
+        except BrokenPipeError:
+            # reader went away (eg | head): stop quietly, as other
+            # pipe-friendly tools do
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(0)
+    else:
+        try:
+            items = collect_instance_types(
+                pattern=pattern,
+                vcpus=args.vcpus,
+                region=args.region,
+                profile=args.profile,
+                session=session,
+            )
+        except ReplayMissError:
+            sys.exit(1)
+
+        rows = [flatten(item) for item in items]
+        df = pd.DataFrame(rows).sort_values(["Type"]).reset_index(drop=True)
+
+        if args.price:
+            df = add_prices_column(df, args.region, session)
+
+    if args.bench:
+        df = add_bench_columns(df, load_reports(args.bench))
 
     if not args.silent:
+        # in stream mode stdout carries the rows, so the final table goes to
+        # stderr
+        to_stderr = args.stream and not args.stream_to
+        table_out = sys.stderr if to_stderr else sys.stdout
         with pd.option_context("display.max_rows", 100, "display.max_columns", 80, "display.width", 200):
-            print(df.to_string(index=False))
+            print(df.to_string(index=False), file=table_out)
+
+    if args.index:
+        region = args.region or session.region_name or "us-east-1"
+        count = write_index(df, region, args.index)
+        print(
+            f"Indexed {len(df)} types → {args.index} ({count} total, {region})",
+            file=sys.stderr if args.stream else sys.stdout,
+        )
 
     if args.save:
         save_path = user_configs.OUTPUTS_DIR / (args.save or "default.csv")
         df.to_csv(save_path, index=False)
-        print(f"Saved CSV → {save_path}")
+        print(
+            f"Saved CSV → {save_path}",
+            file=sys.stderr if args.stream else sys.stdout,
+        )
         
 
     #if args.save_parquet:
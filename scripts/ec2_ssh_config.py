@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+# -----------------------------------------------------------------------------
+# Keep a managed block of `Host <Name>` entries for our instances in
+# ~/.ssh/config (see src/ssh_config.py).
+#
+# Each entry carries the IP, user, key and ControlMaster/ControlPersist
+# settings, so after the first connection `ssh node0`, `scp file node0:` etc.
+# reuse one multiplexed connection. ec2_launch_from_yaml.py adds the entry at
+# launch and ec2_instance_actions.py keeps it current on start/stop/terminate;
+# this script covers everything else (eg the zsh helpers, console use).
+#
+# Usage examples:
+#   # all running instances, drop terminated
+#   python ec2_ssh_config.py sync
+#   python ec2_ssh_config.py sync 'node-*' \
+#       --region us-east-1 --region us-west-2
+#   python ec2_ssh_config.py remove node0
+#   python ec2_ssh_config.py list
+# -----------------------------------------------------------------------------
+
+import argparse
+import sys
+from pathlib import Path
+
+CONFIGS_DIR = Path(__file__).resolve().parents[1] / "configs"
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(CONFIGS_DIR))
+
+from aws_logger import aws_log
+from aws_replay import make_session
+from ssh_config import CONFIG_PATH
+from ssh_config import read_hosts
+from ssh_config import sync_hosts
+from ssh_config import update_hosts
+
+EVENT = "EC2_ssh_config"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Managed ~/.ssh/config entries for EC2 instances"
+    )
+    ap.add_argument("command", choices=["sync", "remove", "list"])
+    ap.add_argument(
+        "names",
+        nargs="*",
+        help="Name tag globs for sync (default: all), aliases for remove",
+    )
+    ap.add_argument(
+        "--region",
+        action="append",
+        help="region (repeatable, default: profile's region)",
+    )
+    ap.add_argument("--profile", help="AWS profile name")
+    ap.add_argument(
+        "--config",
+        type=Path,
+        default=CONFIG_PATH,
+        help="ssh config file (default: ~/.ssh/config)",
+    )
+    args = ap.parse_args()
+
+    if args.command == "list":
+        for entry in read_hosts(args.config).values():
+            print(
+                f"   {entry.alias:<20} {entry.user}@{entry.hostname:<16} "
+                f"{entry.instance_id}  {entry.note}"
+            )
+        return
+
+    if args.command == "remove":
+        if not args.names:
+            ap.error("give the Host aliases to remove")
+        removed = update_hosts(remove=args.names, path=args.config)
+        for alias in removed:
+            print(f"🗑️  Host {alias}")
+        aws_log(
+            event=EVENT, attribute=f"removed {' '.join(removed) or 'nothing'}"
+        )
+        return
+
+    session = make_session(args.profile)
+    regions = args.region or [session.region_name]
+    clients = {
+        region: session.client("ec2", region_name=region) for region in regions
+    }
+    upserted, removed = sync_hosts(clients, args.names or None, args.config)
+
+    hosts = read_hosts(args.config)
+    for alias in upserted:
+        print(f"✅ Host {alias} -> {hosts[alias].user}@{hosts[alias].hostname}")
+    for alias in removed:
+        print(f"🗑️  Host {alias} (terminated)")
+    if not upserted and not removed:
+        print(f"[ok] {args.config} already up to date")
+    aws_log(
+        event=EVENT,
+        attribute=f"sync: {len(upserted)} updated, {len(removed)} removed",
+        verbose=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
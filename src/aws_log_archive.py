@@ -0,0 +1,416 @@
+# -----------------------------------------------------------------------------
+# Rotation, compressed archives and a binary sidecar index for
+# ~/logs/aws/aws_cli.log
+#
+# aws_log() appends free-form entries "timestamp - event - attribute -
+# device_ip/32" (an attribute may span several lines).  Once the live log passes
+# a size or age limit it is moved into archive/ as a multi-member gzip (each
+# member holds a block of whole entries) with an .idx sidecar:
+#
+#   header   magic, first/last entry time, member/entry counts, event names
+#   members  (offset, length) of every gzip member in the archive
+#   entries  (epoch seconds, event id, member no) per entry, in time order
+#
+# A query mmaps the sidecars, bisects to the time window and filters on event
+# ids, so only the gzip members that hold matching entries are ever
+# decompressed.  The live log is mmapped and scanned directly (it is bounded by
+# the rotation size).
+#
+# Main functions:
+#   - rotate_if_needed: called by aws_log() before each write (cheap stat +
+#     first-line check)
+#   - rotate:           archive + index the live log now
+#   - query:            yield Entry objects matching a time/event/text filter
+# -----------------------------------------------------------------------------
+
+import bisect
+import fcntl
+import gzip
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+
+LOG_NAME = "aws_cli.log"
+ARCHIVE_DIR_NAME = "archive"
+LOCK_NAME = ".aws_cli.lock"
+
+MAX_BYTES = int(os.environ.get("AWS_LOG_MAX_BYTES", 8 * 1024 * 1024))
+MAX_DAYS = int(os.environ.get("AWS_LOG_MAX_DAYS", 30))
+MEMBER_BYTES = 64 * 1024  # uncompressed entry bytes per gzip member
+
+# aws_log() writes local time at a fixed UTC-5 offset
+LOG_TZ = timezone(timedelta(hours=-5))
+
+MAGIC = b"AWSLIDX1"
+# magic, first_t, last_t, n_members, n_entries, events len
+HEADER = struct.Struct("<8sqqIII")
+MEMBER = struct.Struct("<QI")  # offset, length
+ENTRY = struct.Struct("<qHI")  # epoch seconds, event id, member no
+
+ENTRY_RE = re.compile(rb"^(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d) - (.*?) - ", re.M)
+
+
+@dataclass
+class Entry:
+    t: int  # epoch seconds
+    event: str
+    text: str  # the full entry as written, without the trailing newline
+
+    @property
+    def when(self) -> datetime:
+        return datetime.fromtimestamp(self.t, LOG_TZ)
+
+
+def parse_time(stamp: str | bytes) -> int:
+    if isinstance(stamp, bytes):
+        stamp = stamp.decode()
+    return int(datetime.fromisoformat(stamp).replace(tzinfo=LOG_TZ).timestamp())
+
+
+def split_entries(
+    data: bytes | mmap.mmap,
+) -> Iterator[tuple[int, str, bytes]]:
+    """Yield (epoch, event, raw entry bytes) for every entry in a chunk of log.
+
+    An entry runs from its timestamp line up to the next timestamp line, so
+    multi-line attributes stay with their entry.  Text before the first
+    timestamp is dropped.  data may be an mmap of the live log.
+    """
+    matches = list(ENTRY_RE.finditer(data))
+    for i, m in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(data)
+        yield (
+            parse_time(m.group(1)),
+            m.group(2).decode(errors="replace"),
+            data[m.start() : end],
+        )
+
+
+# -----------------------------------------------------------------------------
+# rotation
+
+
+def _first_time(log_path: Path) -> int | None:
+    with open(log_path, "rb") as f:
+        m = ENTRY_RE.match(f.read(64))
+    return parse_time(m.group(1)) if m else None
+
+
+def rotation_due(
+    log_path: Path, max_bytes: int = MAX_BYTES, max_days: int = MAX_DAYS
+) -> bool:
+    try:
+        size = log_path.stat().st_size
+    except FileNotFoundError:
+        return False
+    if size == 0:
+        return False
+    if size >= max_bytes:
+        return True
+    first = _first_time(log_path)
+    return first is not None and time.time() - first >= max_days * 86400
+
+
+def write_archive(data: bytes, archive: Path) -> None:
+    """Compress log text into a multi-member gzip + .idx sidecar next to it."""
+    events: dict[str, int] = {}
+    members: list[tuple[int, int]] = []
+    entries: list[tuple[int, int, int]] = []
+
+    tmp = archive.with_name(archive.name + ".tmp")
+    with open(tmp, "wb") as out:
+        block: list[bytes] = []
+        block_size = 0
+
+        def flush() -> None:
+            nonlocal block, block_size
+            if not block:
+                return
+            offset = out.tell()
+            out.write(gzip.compress(b"".join(block), compresslevel=6, mtime=0))
+            members.append((offset, out.tell() - offset))
+            block, block_size = [], 0
+
+        for t, event, raw in split_entries(data):
+            event_id = events.setdefault(event, len(events))
+            entries.append((t, event_id, len(members)))
+            block.append(raw)
+            block_size += len(raw)
+            if block_size >= MEMBER_BYTES:
+                flush()
+        flush()
+
+    names = "\n".join(events).encode()
+    first_t = entries[0][0] if entries else 0
+    last_t = max((t for t, _, _ in entries), default=0)
+    idx_tmp = tmp.with_suffix(".idx.tmp")
+    with open(idx_tmp, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC, first_t, last_t, len(members), len(entries), len(names)
+            )
+        )
+        f.write(names)
+        for member in members:
+            f.write(MEMBER.pack(*member))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    tmp.replace(archive)
+    idx_tmp.replace(index_path(archive))
+
+
+def index_path(archive: Path) -> Path:
+    return archive.with_name(archive.name.removesuffix(".log.gz") + ".idx")
+
+
+def rotate(log_dir: Path) -> Path | None:
+    """Move the live log into archive/ (compressed + indexed).
+
+    The caller holds the log lock.
+    """
+    log_path = log_dir / LOG_NAME
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return None
+    data = log_path.read_bytes()
+    first = _first_time(log_path) or int(log_path.stat().st_mtime)
+    stamp = datetime.fromtimestamp(first, LOG_TZ).strftime("%Y%m%dT%H%M%S")
+
+    archive_dir = log_dir / ARCHIVE_DIR_NAME
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archive = archive_dir / f"aws_cli-{stamp}.log.gz"
+    n = 1
+    while archive.exists():
+        archive = archive_dir / f"aws_cli-{stamp}-{n}.log.gz"
+        n += 1
+    write_archive(data, archive)
+    log_path.unlink()
+    return archive
+
+
+class log_lock:
+    """Exclusive flock shared by every aws_log() writer.
+
+    The fleet launcher logs from threads, so writers must not interleave.
+    """
+
+    def __init__(self, log_dir: Path) -> None:
+        self.path = log_dir / LOCK_NAME
+
+    def __enter__(self) -> "log_lock":
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def rotate_if_needed(log_dir: Path) -> Path | None:
+    """Rotate when the live log is over MAX_BYTES or older than MAX_DAYS."""
+    if not rotation_due(log_dir / LOG_NAME):
+        return None
+    with log_lock(log_dir):
+        if not rotation_due(
+            log_dir / LOG_NAME
+        ):  # another writer got there first
+            return None
+        return rotate(log_dir)
+
+
+# -----------------------------------------------------------------------------
+# queries
+
+
+class ArchiveIndex:
+    """mmap view of one .idx sidecar."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            self.first_t,
+            self.last_t,
+            self.n_members,
+            self.n_entries,
+            names_len,
+        ) = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an aws log index")
+        pos = HEADER.size
+        names = self.mm[pos : pos + names_len].decode()
+        self.events = names.split("\n") if names else []
+        self.members_at = pos + names_len
+        self.entries_at = self.members_at + self.n_members * MEMBER.size
+
+    def close(self) -> None:
+        self.mm.close()
+
+    def member(self, n: int) -> tuple[int, int]:
+        return MEMBER.unpack_from(self.mm, self.members_at + n * MEMBER.size)
+
+    def entry(self, n: int) -> tuple[int, int, int]:
+        return ENTRY.unpack_from(self.mm, self.entries_at + n * ENTRY.size)
+
+    def entries(self, start: int = 0) -> Iterator[tuple[int, int, int]]:
+        return ENTRY.iter_unpack(
+            self.mm[
+                self.entries_at + start * ENTRY.size : self.entries_at
+                + self.n_entries * ENTRY.size
+            ]
+        )
+
+    def first_at_or_after(self, t: int) -> int:
+        keys = _EntryTimes(self)
+        return bisect.bisect_left(keys, t)
+
+
+class _EntryTimes:
+    """Sequence of entry times, read lazily from the mmap (for bisect)."""
+
+    def __init__(self, index: ArchiveIndex) -> None:
+        self.index = index
+
+    def __len__(self) -> int:
+        return self.index.n_entries
+
+    def __getitem__(self, n: int) -> int:
+        return self.index.entry(n)[0]
+
+
+def archives(log_dir: Path) -> list[Path]:
+    """Archives oldest first.
+
+    Names are aws_cli-<stamp>.log.gz, then -1, -2.. for same-second rotations.
+    """
+
+    def key(path: Path) -> tuple[str, int]:
+        stamp, _, n = (
+            path.name.removesuffix(".log.gz")
+            .removeprefix("aws_cli-")
+            .partition("-")
+        )
+        return stamp, int(n or 0)
+
+    return sorted(
+        (log_dir / ARCHIVE_DIR_NAME).glob("aws_cli-*.log.gz"), key=key
+    )
+
+
+def _event_ids(events: list[str], event: str | None) -> set[int] | None:
+    if event is None:
+        return None
+    needle = event.lower()
+    return {i for i, name in enumerate(events) if needle in name.lower()}
+
+
+def _matches(
+    t: int,
+    name: str,
+    raw: bytes,
+    since: int | None,
+    until: int | None,
+    event: str | None,
+    text: bytes | None,
+) -> bool:
+    if since is not None and t < since:
+        return False
+    if until is not None and t >= until:
+        return False
+    if event is not None and event.lower() not in name.lower():
+        return False
+    return text is None or text.lower() in raw.lower()
+
+
+def query_archive(
+    archive: Path,
+    since: int | None = None,
+    until: int | None = None,
+    event: str | None = None,
+    text: str | None = None,
+) -> Iterator[Entry]:
+    index = ArchiveIndex(index_path(archive))
+    try:
+        if (since is not None and index.last_t < since) or (
+            until is not None and index.first_t >= until
+        ):
+            return
+        wanted = _event_ids(index.events, event)
+        if wanted is not None and not wanted:
+            return
+
+        # Which members hold at least one entry in the window with a wanted
+        # event
+        members: list[int] = []
+        start = index.first_at_or_after(since) if since is not None else 0
+        for t, event_id, member in index.entries(start):
+            if until is not None and t >= until:
+                break
+            if (wanted is None or event_id in wanted) and (
+                not members or members[-1] != member
+            ):
+                members.append(member)
+        if not members:
+            return
+
+        needle = text.encode() if text else None
+        with (
+            open(archive, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            for member in members:
+                offset, length = index.member(member)
+                data = zlib.decompress(mm[offset : offset + length], wbits=31)
+                for t, name, raw in split_entries(data):
+                    if _matches(t, name, raw, since, until, event, needle):
+                        yield Entry(
+                            t, name, raw.decode(errors="replace").rstrip("\n")
+                        )
+    finally:
+        index.close()
+
+
+def query_live(
+    log_path: Path,
+    since: int | None = None,
+    until: int | None = None,
+    event: str | None = None,
+    text: str | None = None,
+) -> Iterator[Entry]:
+    if not log_path.exists() or log_path.stat().st_size == 0:
+        return
+    needle = text.encode() if text else None
+    with (
+        open(log_path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+    ):
+        for t, name, raw in split_entries(mm):
+            if _matches(t, name, raw, since, until, event, needle):
+                yield Entry(t, name, raw.decode(errors="replace").rstrip("\n"))
+
+
+def query(
+    log_dir: Path,
+    since: int | None = None,
+    until: int | None = None,
+    event: str | None = None,
+    text: str | None = None,
+) -> Iterator[Entry]:
+    """Entries in [since, until) whose event contains `event` and whose text
+    contains `text` (both case-insensitive), oldest first, across archives and
+    the live log."""
+    for archive in archives(log_dir):
+        if index_path(archive).exists():
+            yield from query_archive(archive, since, until, event, text)
+    yield from query_live(log_dir / LOG_NAME, since, until, event, text)
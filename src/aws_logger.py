@@ -3,10 +3,16 @@
 # Needs a bit of refinement but for now does what I need it to.
 
 import os
-from datetime import datetime, timezone, timedelta
-import requests
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 from pathlib import Path
 
+import requests
+
+from aws_log_archive import LOG_NAME
+from aws_log_archive import log_lock
+from aws_log_archive import rotate_if_needed
 
 AWSLOGS = Path(f"~/logs/aws").expanduser()
 AWSLOGS.mkdir(parents=True, exist_ok=True)
@@ -28,8 +34,11 @@ def aws_log(event: str, attribute: str, device: str | None = None, verbose: bool
 
     log_line = f"{timestamp} - {event} - {attribute} - {device}_{public_ip}/32\n"
 
-    log_path = AWSLOGS / "aws_cli.log"
-    with log_path.open("a", encoding="utf-8") as f:
+    # Past the size/age limit the log moves to archive/ (gzip + index, see
+    # aws_log_archive.py)
+    rotate_if_needed(AWSLOGS)
+    log_path = AWSLOGS / LOG_NAME
+    with log_lock(AWSLOGS), log_path.open("a", encoding="utf-8") as f:
         f.write(log_line)
 
     if verbose:
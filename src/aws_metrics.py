@@ -0,0 +1,356 @@
+# -----------------------------------------------------------------------------
+# Per-operation AWS call metrics and optional cProfile for a script run
+#
+# Off unless asked for with --metrics / --cprofile (scripts that have them) or
+# the environment:
+#   AWS_UTILS_METRICS=1            summary table on stderr at exit
+#   AWS_UTILS_METRICS=run.json     ... plus a JSON dump
+#   AWS_UTILS_CPROFILE=run.prof    cProfile of the main thread, for
+#                                  python -m pstats / snakeviz
+#
+# When on, aws_replay.make_session hooks botocore events on every session it
+# creates (and the boto3 default session), so all clients made from them are
+# covered:
+#   - before-call / after-call(-error): latency of the whole call (retries
+#     included), error code, RetryAttempts, request/response payload bytes
+#   - needs-retry: throttled attempts (Throttling, RequestLimitExceeded, ...)
+# Latencies go into HDR-style histograms (log-linear buckets, 32 per power of
+# two, so any percentile is within ~3% of the true value) per service.Operation.
+#
+# Main functions:
+#   - setup:            turn metrics / profiling on (from arguments, else the
+#                       environment)
+#   - attach:           hook a boto3 Session when metrics are on
+#   - add_metrics_args: the --metrics [FILE] / --cprofile FILE options for a
+#                       script's argparse
+# -----------------------------------------------------------------------------
+
+import argparse
+import atexit
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlencode
+
+import boto3
+
+METRICS_ENV = "AWS_UTILS_METRICS"
+CPROFILE_ENV = "AWS_UTILS_CPROFILE"
+THROTTLE_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "RequestLimitExceeded",
+    "RequestThrottled",
+    "RequestThrottledException",
+    "TooManyRequestsException",
+    "SlowDown",
+    "PriorRequestNotComplete",
+}
+SUB_BUCKET_BITS = 5  # 32 buckets per power of two
+
+
+class Histogram:
+    """Log-linear histogram of integer values (microseconds), HDR style."""
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}  # bucket lower bound -> count
+        self.count = 0
+        self.total = 0
+        self.min: int | None = None
+        self.max = 0
+
+    @staticmethod
+    def _bucket(value: int) -> int:
+        shift = max(value.bit_length() - 1 - SUB_BUCKET_BITS, 0)
+        return (value >> shift) << shift
+
+    @staticmethod
+    def _upper(bucket: int) -> int:
+        return (
+            bucket
+            + (1 << max(bucket.bit_length() - 1 - SUB_BUCKET_BITS, 0))
+            - 1
+        )
+
+    def record(self, value: int) -> None:
+        value = max(int(value), 0)
+        bucket = self._bucket(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> int:
+        """Upper bound of the bucket holding the q-th percentile (capped at the
+        max seen)."""
+        if not self.count:
+            return 0
+        rank = max(1, round(q / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._upper(bucket), self.max)
+        return self.max
+
+    def buckets(self) -> list[list[int]]:
+        return [
+            [bucket, self._upper(bucket), self.counts[bucket]]
+            for bucket in sorted(self.counts)
+        ]
+
+
+@dataclass
+class OpMetrics:
+    latency_us: Histogram = field(default_factory=Histogram)
+    errors: dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    throttles: int = 0
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        h = self.latency_us
+        return {
+            "count": h.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttles": self.throttles,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "latency_ms": {
+                "total": round(h.total / 1e3, 3),
+                "mean": round(h.total / max(h.count, 1) / 1e3, 3),
+                "min": round((h.min or 0) / 1e3, 3),
+                "p50": h.percentile(50) / 1e3,
+                "p90": h.percentile(90) / 1e3,
+                "p99": h.percentile(99) / 1e3,
+                "max": h.max / 1e3,
+            },
+            "histogram_us": h.buckets(),  # [low, high, count]
+        }
+
+
+class Metrics:
+    def __init__(self) -> None:
+        self.ops: dict[str, OpMetrics] = {}
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+
+    def op(self, name: str) -> OpMetrics:
+        with self.lock:
+            return self.ops.setdefault(name, OpMetrics())
+
+    def summary(self) -> str:
+        rows = sorted(
+            self.ops.items(),
+            key=lambda kv: kv[1].latency_us.total,
+            reverse=True,
+        )
+        calls = sum(m.latency_us.count for _, m in rows)
+        api_s = sum(m.latency_us.total for _, m in rows) / 1e6
+        run_s = time.perf_counter() - self.started
+        lines = [
+            f"📊 AWS calls: {calls} taking {api_s:.2f}s (run {run_s:.2f}s)",
+            f"   {'operation':<40} {'calls':>5} {'err':>4} {'retry':>5} "
+            f"{'thrtl':>5} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} "
+            f"{'maxms':>8} {'total_s':>8} {'req_kB':>7} {'resp_kB':>8}",
+        ]
+        for name, m in rows:
+            h = m.latency_us
+            lines.append(
+                f"   {name:<40} {h.count:>5} {sum(m.errors.values()):>4} "
+                f"{m.retries:>5} {m.throttles:>5} "
+                f"{h.percentile(50) / 1e3:>8.1f} "
+                f"{h.percentile(90) / 1e3:>8.1f} "
+                f"{h.percentile(99) / 1e3:>8.1f} {h.max / 1e3:>8.1f} "
+                f"{h.total / 1e6:>8.2f} "
+                f"{m.request_bytes / 1024:>7.1f} "
+                f"{m.response_bytes / 1024:>8.1f}"
+            )
+        return "\n".join(lines)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "schema": 1,
+            "script": Path(sys.argv[0]).name,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "operations": {
+                name: m.as_dict() for name, m in sorted(self.ops.items())
+            },
+        }
+
+
+_metrics: Metrics | None = None
+_configured = False
+
+
+def _op_name(model: Any) -> str:
+    return f"{model.service_model.service_name}.{model.name}"
+
+
+def _body_size(body: Any) -> int:
+    if isinstance(
+        body, dict
+    ):  # query protocol (eg ec2) serialises to a dict before urlencoding
+        return len(urlencode(body, doseq=True))
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0
+
+
+def _response_size(http_response: Any) -> int:
+    try:
+        return len(http_response.content or b"")
+    except Exception:  # replayed responses have no raw body
+        return 0
+
+
+def attach(session: boto3.Session) -> Metrics | None:
+    """Hook session's clients into the run's metrics (no-op when metrics are
+    off)."""
+    setup()
+    metrics = _metrics
+    if metrics is None or getattr(session, "_aws_metrics", None) is metrics:
+        return metrics
+    session._aws_metrics = metrics
+    events = session.events
+
+    def start(
+        model: Any,
+        params: dict[str, Any],
+        context: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        context["metrics_t0"] = time.perf_counter()
+        context["metrics_op"] = _op_name(model)
+        context["metrics_request_bytes"] = _body_size(params.get("body"))
+
+    def finish(
+        context: dict[str, Any],
+        code: str | None,
+        retries: int,
+        response_bytes: int,
+    ) -> None:
+        t0 = context.get("metrics_t0")
+        if t0 is None:
+            return
+        m = metrics.op(context["metrics_op"])
+        with metrics.lock:
+            m.latency_us.record((time.perf_counter() - t0) * 1e6)
+            m.retries += retries
+            m.request_bytes += context.get("metrics_request_bytes", 0)
+            m.response_bytes += response_bytes
+            if code:
+                m.errors[code] = m.errors.get(code, 0) + 1
+
+    def done(
+        http_response: Any,
+        parsed: dict[str, Any],
+        context: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        code = (
+            parsed.get("Error", {}).get("Code")
+            if http_response.status_code >= 300
+            else None
+        )
+        retries = parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+        finish(context, code, retries, _response_size(http_response))
+
+    def failed(
+        exception: Exception, context: dict[str, Any], **kwargs: Any
+    ) -> None:
+        finish(context, type(exception).__name__, 0, 0)
+
+    def retry_check(response: Any, operation: Any, **kwargs: Any) -> None:
+        parsed = response[1] if response else {}
+        if parsed.get("Error", {}).get("Code") in THROTTLE_CODES:
+            m = metrics.op(_op_name(operation))
+            with metrics.lock:
+                m.throttles += 1
+
+    # registered ahead of aws_replay's before-call, which answers (and ends) the
+    # event
+    events.register_first("before-call", start)
+    events.register("after-call", done)
+    events.register("after-call-error", failed)
+    events.register("needs-retry", retry_check)
+    return metrics
+
+
+def _report(metrics: Metrics, dump: Path | None) -> None:
+    if not metrics.ops:
+        return
+    print(metrics.summary(), file=sys.stderr)
+    if dump is not None:
+        dump.parent.mkdir(parents=True, exist_ok=True)
+        dump.write_text(json.dumps(metrics.as_dict(), indent=1))
+        print(f"📊 AWS call metrics → {dump}", file=sys.stderr)
+
+
+def _stop_profile(profiler: cProfile.Profile, path: Path) -> None:
+    profiler.disable()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(path)
+    print(
+        f"🔬 cProfile → {path}  (python -m pstats {path}, or snakeviz)",
+        file=sys.stderr,
+    )
+
+
+def setup(metrics: str | None = None, cprofile: str | None = None) -> None:
+    """Turn on metrics ("1" or a JSON path) and/or cProfile (output path) for
+    this run.
+
+    Arguments win over AWS_UTILS_METRICS / AWS_UTILS_CPROFILE.  Only the first
+    call counts.
+    """
+    global _metrics, _configured
+    if _configured:
+        return
+    _configured = True
+    metrics = metrics or os.getenv(METRICS_ENV)
+    cprofile = cprofile or os.getenv(CPROFILE_ENV)
+
+    if cprofile:
+        profiler = cProfile.Profile()
+        atexit.register(_stop_profile, profiler, Path(cprofile).expanduser())
+        profiler.enable()
+    if metrics and metrics not in ("0", "false", "no"):
+        _metrics = Metrics()
+        dump = (
+            None
+            if metrics in ("1", "true", "yes", "-")
+            else Path(metrics).expanduser()
+        )
+        atexit.register(_report, _metrics, dump)
+        attach(boto3._get_default_session())  # plain boto3.client(...) calls
+
+
+def add_metrics_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument(
+        "--metrics",
+        nargs="?",
+        const="1",
+        metavar="FILE",
+        help=(
+            "per-API-call latency summary at exit, plus JSON to FILE "
+            f"(or ${METRICS_ENV})"
+        ),
+    )
+    ap.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help=f"cProfile the run into FILE (or ${CPROFILE_ENV})",
+    )
@@ -0,0 +1,236 @@
+# -----------------------------------------------------------------------------
+# Record / replay of AWS API responses for offline runs
+#
+# Hooks botocore's client events on a boto3 Session, so every client made from
+# it is covered without changing the calling code:
+#   - provide-client-params: derives a key from service, region, operation and
+#     the normalised call parameters (sorted keys, order-insensitive Filters,
+#     idempotency tokens dropped)
+#   - before-call (replay): answers from the store, so nothing is signed or
+#     sent
+#   - after-call (record): stores the parsed response (errors included, eg
+#     DryRunOperation)
+#
+# The store is one gzip'd pickle per directory (DIR/aws_responses.pkl.gz)
+# holding key -> (status code, parsed response) with ResponseMetadata stripped.
+# Recording merges into an existing store; replaying a call that was never
+# recorded raises ReplayMissError.
+#
+# Main functions:
+#   - make_session:    boto3 Session with record or replay attached (or a
+#                      plain one), and the per-call metrics of
+#                      src/aws_metrics.py when those are on
+#   - attach:          hook an existing Session
+#   - add_replay_args: the --record DIR / --replay DIR options for a
+#                      script's argparse
+# -----------------------------------------------------------------------------
+
+import argparse
+import atexit
+import gzip
+import hashlib
+import json
+import pickle
+import sys
+from pathlib import Path
+from typing import Any
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+import aws_metrics
+
+STORE_NAME = "aws_responses.pkl.gz"
+STORE_VERSION = 1
+ORDER_FREE_LISTS = {"Filters", "InstanceIds", "InstanceTypes", "GroupIds"}
+
+
+class ReplayMissError(LookupError):
+    pass
+
+
+def normalise(value: Any, key: str = "") -> Any:
+    """Canonical form of call parameters: sorted dict keys, order-free lists
+    sorted."""
+    if isinstance(value, dict):
+        return {k: normalise(v, k) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        items = [normalise(v) for v in value]
+        if key in ORDER_FREE_LISTS:
+            items.sort(key=lambda v: json.dumps(v, sort_keys=True, default=str))
+        return items
+    return value
+
+
+def call_key(
+    service: str, region: str | None, operation: str, params: dict[str, Any]
+) -> str:
+    body = json.dumps(
+        normalise(params), sort_keys=True, default=str, separators=(",", ":")
+    )
+    digest = hashlib.sha1(body.encode()).hexdigest()[:20]
+    return f"{service}/{region or '-'}/{operation}/{digest}"
+
+
+class ResponseStore:
+    """key -> (HTTP status, parsed response), persisted as
+    DIR/aws_responses.pkl.gz."""
+
+    def __init__(self, directory: Path) -> None:
+        self.path = Path(directory).expanduser() / STORE_NAME
+        self.responses: dict[str, tuple[int, dict[str, Any]]] = {}
+        self.dirty = False
+        if self.path.exists():
+            with gzip.open(self.path, "rb") as f:
+                version, responses = pickle.load(f)
+            if version == STORE_VERSION:
+                self.responses = responses
+
+    def get(self, key: str) -> tuple[int, dict[str, Any]] | None:
+        return self.responses.get(key)
+
+    def put(self, key: str, status: int, parsed: dict[str, Any]) -> None:
+        parsed = {k: v for k, v in parsed.items() if k != "ResponseMetadata"}
+        self.responses[key] = (status, parsed)
+        self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as f:
+            pickle.dump(
+                (STORE_VERSION, self.responses),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        tmp.replace(self.path)
+        self.dirty = False
+
+
+def _params_without_tokens(
+    params: dict[str, Any], model: Any
+) -> dict[str, Any]:
+    # auto-generated idempotency tokens (eg run_instances ClientToken) differ on
+    # every call
+    shape = model.input_shape
+    if shape is None:
+        return params
+    tokens = {
+        name
+        for name, member in shape.members.items()
+        if member.metadata.get("idempotencyToken")
+    }
+    return {k: v for k, v in params.items() if k not in tokens}
+
+
+def attach(
+    session: boto3.Session,
+    record: Path | None = None,
+    replay: Path | None = None,
+) -> ResponseStore | None:
+    """Hook record or replay onto session; clients created from it afterwards
+    are covered."""
+    if record and replay:
+        raise ValueError("record and replay are mutually exclusive")
+    if not (record or replay):
+        return None
+    directory = record or replay
+    assert directory is not None
+    store = ResponseStore(directory)
+    events = session.events
+
+    def remember_key(
+        params: dict[str, Any],
+        model: Any,
+        context: dict[str, Any],
+        **kwargs: Any,
+    ) -> None:
+        service = model.service_model.service_name
+        context["replay_key"] = call_key(
+            service,
+            context.get("client_region"),
+            model.name,
+            _params_without_tokens(params, model),
+        )
+
+    events.register("provide-client-params", remember_key)
+
+    if replay:
+
+        def serve(
+            model: Any, context: dict[str, Any], **kwargs: Any
+        ) -> tuple[AWSResponse, dict] | None:
+            hit = store.get(context["replay_key"])
+            if hit is None:
+                service = model.service_model.service_name
+                print(
+                    f"⚠️  no recorded response for {service}.{model.name} "
+                    f"in {store.path} (record it first with --record)",
+                    file=sys.stderr,
+                )
+                raise ReplayMissError(context["replay_key"])
+            status, parsed = hit
+            response = dict(
+                parsed,
+                ResponseMetadata={
+                    "HTTPStatusCode": status,
+                    "HTTPHeaders": {},
+                    "RetryAttempts": 0,
+                },
+            )
+            return AWSResponse("replay://", status, {}, None), response
+
+        events.register("before-call", serve)
+    else:
+
+        def keep(
+            http_response: AWSResponse,
+            parsed: dict[str, Any],
+            context: dict[str, Any],
+            **kwargs: Any,
+        ) -> None:
+            if "replay_key" in context:
+                store.put(
+                    context["replay_key"], http_response.status_code, parsed
+                )
+
+        events.register("after-call", keep)
+        atexit.register(store.save)
+    return store
+
+
+def make_session(
+    profile: str | None = None,
+    region: str | None = None,
+    record: Path | None = None,
+    replay: Path | None = None,
+) -> boto3.Session:
+    session_args = {}
+    if profile:
+        session_args["profile_name"] = profile
+    if region:
+        session_args["region_name"] = region
+    session = boto3.Session(**session_args)
+    aws_metrics.attach(
+        session
+    )  # before replay, whose before-call handler answers the call
+    attach(session, record, replay)
+    return session
+
+
+def add_replay_args(ap: argparse.ArgumentParser) -> None:
+    group = ap.add_mutually_exclusive_group()
+    group.add_argument(
+        "--record",
+        type=Path,
+        metavar="DIR",
+        help="save every AWS response to DIR for later --replay",
+    )
+    group.add_argument(
+        "--replay",
+        type=Path,
+        metavar="DIR",
+        help="answer AWS calls from responses recorded in DIR (no network)",
+    )
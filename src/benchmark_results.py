@@ -0,0 +1,107 @@
+# -----------------------------------------------------------------------------
+# Measured price-performance from bootstrap/steps/12_benchmark.sh
+#
+# The benchmark step writes one JSON report per machine
+# (~/.bootstrap_state/benchmark.json). ec2_launch_bootstrap.py copies it back
+# into outputs/benchmarks/ after a watched bootstrap, and ec2_specs_price.py
+# --bench merges the reports into the spec/price table: the measured values
+# (median per instance type when there are several runs) plus each one divided
+# by USDPerHr, ie throughput per dollar-hour.
+#
+# Main functions:
+#   - fetch_report:      scp a host's report into
+#                        outputs/benchmarks/<type>_<name>_<time>.json
+#   - load_reports:      one row per instance type from a directory of reports
+#   - add_bench_columns: merge measured and per-dollar columns into a
+#                        spec/price DataFrame
+# -----------------------------------------------------------------------------
+
+import json
+import subprocess
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REMOTE_REPORT = "~/.bootstrap_state/benchmark.json"
+STEP_FILE = "12_benchmark.sh"
+METRICS = {  # report key -> table column
+    "cpu_single_mbps": "CpuSingleMBps",
+    "cpu_multi_mbps": "CpuMultiMBps",
+    "mem_copy_gbps": "MemCopyGBps",
+    "disk_write_mbps": "DiskWriteMBps",
+    "disk_read_mbps": "DiskReadMBps",
+    "gpu_fp16_tflops": "GpuFp16Tflops",
+}
+
+
+def step_enabled(config: dict) -> bool:
+    """True if the bootstrap config runs the benchmark step (and it is not
+    xx_'d out)."""
+    bootstraps = config.get("bootstraps") or ""
+    steps = (
+        bootstraps.split()
+        if isinstance(bootstraps, str)
+        else [str(s) for s in bootstraps]
+    )
+    return STEP_FILE in steps
+
+
+def fetch_report(
+    ssh_target: str,
+    ssh_opts: list[str],
+    dest_dir: Path,
+    instance_type: str | None,
+    name: str | None = None,
+) -> Path | None:
+    """Copy the host's benchmark report into dest_dir. Returns the local path
+    or None."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M")
+    dest = (
+        dest_dir / f"{instance_type or 'unknown'}_{name or 'host'}_{stamp}.json"
+    )
+    scp = subprocess.run(
+        ["scp", "-q", *ssh_opts, f"{ssh_target}:{REMOTE_REPORT}", str(dest)],
+        check=False,
+        capture_output=True,
+    )
+    return dest if scp.returncode == 0 and dest.exists() else None
+
+
+def load_reports(directory: Path) -> pd.DataFrame:
+    """One row per instance type: Type, BenchRuns and the median of each
+    measured metric."""
+    rows = []
+    for path in sorted(Path(directory).glob("*.json")):
+        try:
+            report = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        results = report.get("results") or {}
+        row = {"Type": report.get("instance_type")}
+        row.update({col: results.get(key) for key, col in METRICS.items()})
+        rows.append(row)
+
+    columns = ["Type", "BenchRuns", *METRICS.values()]
+    if not rows:
+        return pd.DataFrame(columns=columns)
+    df = pd.DataFrame(rows)
+    grouped = df.groupby("Type")
+    summary = grouped[list(METRICS.values())].median()
+    summary.insert(0, "BenchRuns", grouped.size())
+    return summary.reset_index()[columns]
+
+
+def add_bench_columns(df: pd.DataFrame, reports: pd.DataFrame) -> pd.DataFrame:
+    """Left-join measured metrics onto df by Type and add <metric>PerUSD where
+    priced."""
+    measured = [c for c in METRICS.values() if reports[c].notna().any()]
+    df = df.merge(
+        reports[["Type", "BenchRuns", *measured]], on="Type", how="left"
+    )
+    df["BenchRuns"] = df["BenchRuns"].astype("Int64")
+    if "USDPerHr" in df.columns:
+        for col in measured:
+            df[f"{col}PerUSD"] = (df[col] / df["USDPerHr"]).round(1)
+    return df
@@ -0,0 +1,469 @@
+# -----------------------------------------------------------------------------
+# Offline package bundle for the python / mamba / torch bootstrap steps
+#
+# Resolves everything a bootstrap config asks for once, on the local machine,
+# and downloads it into a locked bundle directory the steps can install from
+# with no index access:
+#
+#   bundle/
+#     bundle.json               what was resolved (config, platform, sha256s)
+#     wheels/                   pip/setuptools/wheel/uv, pipx, pip_install
+#     requirements-py3.12.lock  exact pins for wheels/ (pip/uv constraints)
+#     torch/<variant>/          torch/torchvision/torchaudio (+ deps)
+#     torch/<variant>/requirements-py3.12.lock
+#     conda/                    local conda channel (if 04_mamba runs)
+#     miniforge/Miniforge3-Linux-<arch>.sh
+#
+# Resolution uses `pip install --dry-run --report` for the instance's
+# platform/python (not the local one), so the lock holds exactly the wheels the
+# instance needs.  Downloads are verified against the index sha256 and skipped
+# when a matching file is already in the bundle, so a rebuild after a config
+# change only fetches the difference.
+#
+# The bundle either ships inside the bootstrap payload
+# (ec2_launch_bootstrap.py --bundle) or lives on a reusable volume pointed to by
+# `bundle.dir` in the config.  bundle.json records the torch variants it holds;
+# 11_torch_setup picks the newest of them the instance's driver can run.
+#
+# Main functions:
+#   - spec_from_config: work out platform, pythons, packages from a config
+#   - resolve:          lock a requirement set for a target platform/python
+#   - build_bundle:     resolve + download everything into a bundle directory
+# -----------------------------------------------------------------------------
+
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+import yaml
+
+BUNDLE_MANIFEST = "bundle.json"
+BASE_TOOLS = ["pip", "setuptools", "wheel", "uv"]
+TORCH_PACKAGES = ["torch", "torchvision", "torchaudio"]
+TORCH_VARIANTS = ("cpu", "cu118", "cu121", "cu124", "cu130")
+# Default for GPU families: the instance's driver is unknown here, so bundle the
+# newest wheels most drivers can run; 11_torch_setup falls back to them when
+# the driver reports a newer CUDA
+GPU_TORCH_VARIANT = "cu124"
+TORCH_INDEX = "https://download.pytorch.org/whl/{variant}"
+MINIFORGE_URL = "https://github.com/conda-forge/miniforge/releases/latest/download/Miniforge3-Linux-{arch}.sh"
+
+# Ubuntu release -> (default python3, glibc) for the manylinux platform tag
+UBUNTU_DEFAULTS = {
+    "20.04": ("3.8", "2_31"),
+    "22.04": ("3.10", "2_35"),
+    "24.04": ("3.12", "2_39"),
+}
+CONDA_SUBDIRS = {"x86_64": "linux-64", "aarch64": "linux-aarch64"}
+
+
+@dataclass
+class BundleSpec:
+    config: Path
+    arch: str  # x86_64 | aarch64
+    glibc: str  # e.g. "2_39" -> manylinux_2_39_<arch>
+    python_versions: list[str]  # every python the steps will pip install into
+    pip_packages: list[str]
+    pipx_tools: list[str]
+    torch_variants: list[str] = field(default_factory=list)
+    torch_version: str | None = None
+    mamba_python: str | None = (
+        None  # set when the config runs 04_mamba_python_tooling
+    )
+
+    @property
+    def platform(self) -> str:
+        return f"manylinux_{self.glibc}_{self.arch}"
+
+    @property
+    def platform_tags(self) -> list[str]:
+        """pip matches --platform tags literally: list older manylinux too."""
+        newest = int(self.glibc.split("_")[1])
+        tags = [
+            f"manylinux_2_{minor}_{self.arch}"
+            for minor in range(newest, 16, -1)
+        ]
+        return tags + [f"manylinux2014_{self.arch}"]
+
+
+@dataclass
+class Locked:
+    name: str
+    version: str
+    url: str
+    sha256: str
+
+    @property
+    def filename(self) -> str:
+        return self.url.rsplit("/", 1)[-1].split("#", 1)[0]
+
+
+def enabled_steps(config: dict) -> list[str]:
+    """Step names in the config's bootstraps block, minus xx_'d out ones."""
+    steps = str(config.get("bootstraps") or "").split()
+    return [s.removesuffix(".sh") for s in steps if not s.startswith("xx_")]
+
+
+def arch_for_instance_type(instance_type: str) -> str:
+    """Graviton families have a 'g' after the generation digit (t4g, c7gn)."""
+    family = instance_type.split(".", 1)[0]
+    return "aarch64" if re.match(r"^[a-z]+\d+g", family) else "x86_64"
+
+
+def spec_from_config(
+    config_path: Path,
+    arch: str | None = None,
+    python_versions: list[str] | None = None,
+    torch_variants: list[str] | None = None,
+) -> BundleSpec:
+    config_path = Path(config_path).expanduser().resolve()
+    # BaseLoader keeps versions as written (python.version: 3.10 must not
+    # become 3.1)
+    config = yaml.load(config_path.read_text(), Loader=yaml.BaseLoader) or {}
+    instance = config.get("ec2_instance") or {}
+    python_cfg = config.get("python") or {}
+    bundle_cfg = config.get("bundle") or {}
+    steps = enabled_steps(config)
+
+    ubuntu = str(instance.get("ubuntu", "24.04"))
+    default_python, glibc = UBUNTU_DEFAULTS.get(
+        ubuntu, UBUNTU_DEFAULTS["24.04"]
+    )
+    arch = arch or arch_for_instance_type(str(instance.get("type", "")))
+
+    mamba_python = None
+    if any(s.startswith("04_") for s in steps):
+        mamba_python = str(python_cfg.get("mamba_python_version", "3.11"))
+
+    if not python_versions:
+        version = str(python_cfg.get("version", "default"))
+        python_versions = [
+            default_python if version in ("default", "", "None") else version
+        ]
+        if mamba_python:
+            python_versions.append(mamba_python)
+
+    if torch_variants is None:
+        torch_variants = list(bundle_cfg.get("torch_variants") or [])
+        if not torch_variants and any(s.startswith("11_") for s in steps):
+            gpu = str(instance.get("family", "")) in ("g", "p")
+            torch_variants = [GPU_TORCH_VARIANT if gpu else "cpu"]
+    unknown = [v for v in torch_variants if v not in TORCH_VARIANTS]
+    if unknown:
+        raise ValueError(
+            f"unknown torch variant(s) {unknown}; "
+            f"expected one of {TORCH_VARIANTS}"
+        )
+
+    return BundleSpec(
+        config=config_path,
+        arch=arch,
+        glibc=glibc,
+        python_versions=list(dict.fromkeys(python_versions)),
+        pip_packages=[str(p) for p in python_cfg.get("pip_install") or []],
+        pipx_tools=[str(p) for p in config.get("pipx") or []],
+        torch_variants=torch_variants,
+        torch_version=bundle_cfg.get("torch_version"),
+        mamba_python=mamba_python,
+    )
+
+
+def resolve(
+    requirements: list[str],
+    spec: BundleSpec,
+    python_version: str,
+    index_url: str | None = None,
+) -> list[Locked]:
+    """Resolve requirements (+ deps) to exact wheels for the target platform."""
+    with tempfile.TemporaryDirectory() as target:
+        cmd = [
+            sys.executable,
+            "-m",
+            "pip",
+            "install",
+            "--dry-run",
+            "--ignore-installed",
+            "--quiet",
+            "--report",
+            "-",
+            "--target",
+            target,
+            "--only-binary=:all:",
+            *(arg for tag in spec.platform_tags for arg in ("--platform", tag)),
+            "--python-version",
+            python_version,
+            "--implementation",
+            "cp",
+            *(["--index-url", index_url] if index_url else []),
+            *requirements,
+        ]
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, check=False
+        )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"pip could not resolve {requirements} for py{python_version}/"
+            f"{spec.platform}:\n{result.stderr.strip()}"
+        )
+
+    locked = []
+    for item in json.loads(result.stdout)["install"]:
+        info = item["download_info"]
+        hashes = info.get("archive_info", {}).get("hashes", {})
+        sha256 = hashes.get("sha256") or info.get("archive_info", {}).get(
+            "hash", ""
+        ).removeprefix("sha256=")
+        locked.append(
+            Locked(
+                item["metadata"]["name"],
+                item["metadata"]["version"],
+                info["url"],
+                sha256,
+            )
+        )
+    return sorted(locked, key=lambda x: x.name.lower())
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def download(url: str, dest: Path, sha256: str | None = None) -> bool:
+    """Fetch url to dest unless an identical file is there. True if fetched."""
+    if dest.exists() and (not sha256 or _sha256(dest) == sha256):
+        return False
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(dest.name + ".part")
+    with urllib.request.urlopen(url) as response, open(tmp, "wb") as f:
+        shutil.copyfileobj(response, f, length=1 << 20)
+    if sha256 and _sha256(tmp) != sha256:
+        tmp.unlink()
+        raise RuntimeError(f"sha256 mismatch for {url}")
+    tmp.replace(dest)
+    return True
+
+
+def write_lock(path: Path, locked: list[Locked], note: str) -> None:
+    lines = [
+        f"# {note}",
+        "# generated by scripts/ec2_bootstrap_bundle.py - do not edit",
+    ]
+    lines += [f"{x.name}=={x.version}" for x in locked]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def _conda_exe() -> str | None:
+    return shutil.which("mamba") or shutil.which("conda")
+
+
+def resolve_conda(
+    specs: list[str], channels: list[str], subdir: str
+) -> list[dict]:
+    """Package records (url, fn, subdir, sha256/md5) for a solved conda env."""
+    exe = _conda_exe()
+    if exe is None:
+        raise RuntimeError(
+            "conda/mamba not found locally; needed to build the conda channel"
+        )
+    channel_args = [arg for ch in channels for arg in ("-c", ch)]
+    cmd = [
+        exe,
+        "create",
+        "--dry-run",
+        "--json",
+        "--override-channels",
+        *channel_args,
+        "--platform",
+        subdir,
+        "-n",
+        "_aws_utils_bundle",
+        *specs,
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    try:
+        solved = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        solved = {}
+    if result.returncode != 0 or "actions" not in solved:
+        error = solved.get("error") or result.stderr.strip()
+        raise RuntimeError(f"conda could not solve {specs}: {error}")
+    return solved["actions"].get("LINK", [])
+
+
+def index_conda_channel(channel_dir: Path) -> None:
+    (channel_dir / "noarch").mkdir(parents=True, exist_ok=True)
+    for cmd in (
+        [sys.executable, "-m", "conda_index", str(channel_dir)],
+        [_conda_exe() or "conda", "index", str(channel_dir)],
+    ):
+        if (
+            subprocess.run(cmd, capture_output=True, check=False).returncode
+            == 0
+        ):
+            return
+    raise RuntimeError(
+        "could not index the conda channel (pip install conda-index)"
+    )
+
+
+def build_bundle(
+    spec: BundleSpec,
+    out_dir: Path,
+    jobs: int = 8,
+    conda: bool | None = None,
+    printer: Callable[..., None] = print,
+) -> dict:
+    """Resolve and download everything for spec into out_dir; the manifest."""
+    out_dir = Path(out_dir).expanduser().resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    conda = bool(spec.mamba_python) if conda is None else conda
+    fetch: dict[Path, tuple[str, str | None]] = {}  # dest -> (url, sha256)
+    locks: dict[str, list[str]] = {}
+
+    # wheels/: base tools + pip_install (locked, one lock per target python) and
+    # the pipx tools (resolved on their own for the system python, since pipx
+    # gives each tool its own venv)
+    for py in spec.python_versions:
+        locked = resolve(BASE_TOOLS + spec.pip_packages, spec, py)
+        lock = out_dir / f"requirements-py{py}.lock"
+        write_lock(lock, locked, f"{spec.config.name} py{py} {spec.platform}")
+        locks[lock.name] = [x.filename for x in locked]
+        if py == spec.python_versions[0]:
+            for tool in spec.pipx_tools:
+                locked += resolve([tool], spec, py)
+        for x in locked:
+            fetch[out_dir / "wheels" / x.filename] = (x.url, x.sha256)
+        printer(
+            f"🔒 py{py}: {len(locks[lock.name])} wheels locked -> {lock.name}"
+        )
+
+    # torch/<variant>/: straight from the pytorch wheel index (it carries the
+    # deps too)
+    pins = (
+        [f"{p}=={spec.torch_version}" for p in TORCH_PACKAGES]
+        if spec.torch_version
+        else TORCH_PACKAGES
+    )
+    for variant in spec.torch_variants:
+        torch_dir = out_dir / "torch" / variant
+        torch_dir.mkdir(parents=True, exist_ok=True)
+        for py in spec.python_versions:
+            locked = resolve(
+                pins, spec, py, TORCH_INDEX.format(variant=variant)
+            )
+            lock = torch_dir / f"requirements-py{py}.lock"
+            write_lock(lock, locked, f"torch {variant} py{py} {spec.platform}")
+            locks[f"torch/{variant}/{lock.name}"] = [x.filename for x in locked]
+            for x in locked:
+                fetch[torch_dir / x.filename] = (x.url, x.sha256)
+            printer(f"🔒 torch {variant} py{py}: {len(locked)} wheels locked")
+
+    # conda/: local channel with python (+ pytorch for the mamba path of
+    # 11_torch_setup)
+    if conda:
+        subdir = CONDA_SUBDIRS[spec.arch]
+        python_spec = f"python={spec.mamba_python or spec.python_versions[0]}"
+        solves = [([python_spec], ["conda-forge"])]
+        if "cpu" in spec.torch_variants:
+            solves.append(
+                (
+                    [
+                        python_spec,
+                        "pytorch",
+                        "torchvision",
+                        "torchaudio",
+                        "cpuonly",
+                    ],
+                    ["pytorch", "conda-forge"],
+                )
+            )
+        if any(v.startswith("cu") for v in spec.torch_variants):
+            solves.append(
+                (
+                    [
+                        python_spec,
+                        "pytorch",
+                        "torchvision",
+                        "torchaudio",
+                        "pytorch-cuda",
+                    ],
+                    ["pytorch", "nvidia", "conda-forge"],
+                )
+            )
+        for specs, channels in solves:
+            records = resolve_conda(specs, channels, subdir)
+            for rec in records:
+                base = f"{rec['base_url']}/{rec['platform']}"
+                url = rec.get("url") or f"{base}/{rec['dist_name']}.conda"
+                fn = rec.get("fn") or url.rsplit("/", 1)[-1]
+                fetch[out_dir / "conda" / rec.get("subdir", subdir) / fn] = (
+                    url,
+                    rec.get("sha256"),
+                )
+            printer(f"🔒 conda {' '.join(specs)}: {len(records)} packages")
+        fetch[out_dir / "miniforge" / f"Miniforge3-Linux-{spec.arch}.sh"] = (
+            MINIFORGE_URL.format(arch=spec.arch),
+            None,
+        )
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        fetched = sum(
+            pool.map(
+                lambda item: download(item[1][0], item[0], item[1][1]),
+                fetch.items(),
+            )
+        )
+    printer(
+        f"⬇️  {fetched} downloaded, {len(fetch) - fetched} already in bundle "
+        f"({time.time() - started:.0f}s)"
+    )
+
+    if conda:
+        index_conda_channel(out_dir / "conda")
+
+    manifest = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "spec": {
+            **asdict(spec),
+            "config": spec.config.name,
+            "platform": spec.platform,
+        },
+        "locks": locks,
+        "files": {
+            str(p.relative_to(out_dir)): sha
+            for p, (_, sha) in sorted(fetch.items())
+        },
+    }
+    (out_dir / BUNDLE_MANIFEST).write_text(
+        json.dumps(manifest, indent=1) + "\n"
+    )
+    return manifest
+
+
+def prune_bundle(out_dir: Path, manifest: dict) -> int:
+    """Remove wheels/torch files from earlier builds the new locks don't use."""
+    keep = set(manifest["files"])
+    removed = 0
+    for sub in ("wheels", "torch"):
+        for path in (out_dir / sub).rglob("*.whl"):
+            if str(path.relative_to(out_dir)) not in keep:
+                path.unlink()
+                removed += 1
+    return removed
@@ -0,0 +1,206 @@
+# -----------------------------------------------------------------------------
+# Live bootstrap progress from the step events written by bootstrap/run.sh
+#
+# run.sh appends one JSON object per line to ~/bootstrap/bootstrap.events:
+#   {"t": 1767225600, "run": "...",
+#    "event": "start|done|skip|dry|fail|begin|end",
+#    "step": "03_system_python", "secs": 42, "status": "ok|fail", ...}
+#
+# Each host is followed over a single ssh channel (tail -F) until the run's
+# 'end' event, so the launcher can show per-step progress for one or many hosts
+# and exit with the final status.
+#
+# Main functions:
+#   - parse_event:   parse one events line (None for partial/garbage lines)
+#   - follow_events: yield events for a host until the run ends
+#   - watch_hosts:   follow many hosts concurrently, print progress, return
+#                    final status per host
+#   - step_summary:  per-step durations/failures across hosts (fleet summary
+#                    table)
+# -----------------------------------------------------------------------------
+
+import json
+import queue
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+EVENTS_PATH = "~/bootstrap/bootstrap.events"
+
+STATUS_ICONS = {
+    "begin": "🔄",
+    "start": "▶️ ",
+    "done": "✅",
+    "skip": "⏭️ ",
+    "dry": "📝",
+    "fail": "❌",
+    "end": "🏁",
+}
+
+
+def parse_event(line: str | bytes) -> dict[str, Any] | None:
+    if isinstance(line, bytes):
+        line = line.decode(errors="replace")
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return event if isinstance(event, dict) and "event" in event else None
+
+
+def follow_events(
+    target: str,
+    ssh_opts: list[str] | None = None,
+    since: float | None = None,
+    events_path: str = EVENTS_PATH,
+) -> Iterator[dict[str, Any]]:
+    """Yield events from a host until the 'end' event of the current run.
+
+    Runs that began before `since` (epoch seconds) are ignored, so a watcher
+    started just before run.sh rotates its events file does not pick up the
+    previous run's 'end'.
+    """
+    remote_cmd = (
+        f"touch {events_path} && tail -n +1 -F {events_path} 2>/dev/null"
+    )
+    proc = subprocess.Popen(
+        ["ssh", *(ssh_opts or []), target, remote_cmd],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert proc.stdout is not None
+    run_id = None
+    try:
+        for raw in proc.stdout:
+            event = parse_event(raw)
+            if event is None:
+                continue
+            if event["event"] == "begin":
+                if since is not None and event.get("t", 0) < since:
+                    continue
+                run_id = event.get("run")
+            if run_id is None or event.get("run") != run_id:
+                continue
+            yield event
+            if event["event"] == "end":
+                return
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def format_event(label: str, event: dict[str, Any]) -> str:
+    icon = STATUS_ICONS.get(event["event"], "  ")
+    step = event.get("step") or "bootstrap"
+    secs = (
+        f"{event.get('secs', 0)}s"
+        if event["event"] in ("done", "fail", "end")
+        else ""
+    )
+    detail = event.get("detail") or event.get("status") or ""
+    return (
+        f"[{label}] {icon} {event['event']:<5} {step:<28} {secs:>6}  {detail}"
+    )
+
+
+def watch_hosts(
+    hosts: dict[str, tuple[str, list[str]]],
+    since: float | None = None,
+    printer: Callable[[str], None] = print,
+    on_event: Callable[[str, dict[str, Any]], None] | None = None,
+    retries: int = 0,
+) -> dict[str, str]:
+    """Follow several hosts at once. hosts maps label -> (ssh target, options).
+
+    A dropped ssh channel is re-opened up to `retries` times; events already
+    seen are not repeated.  Returns label -> final status ("ok", "fail" or
+    "lost" if the ssh channel dropped early).
+    """
+    events: queue.Queue = queue.Queue()
+
+    def worker(label: str, target: str, opts: list[str]) -> None:
+        final = "lost"
+        seen: set[tuple] = set()
+        try:
+            for attempt in range(retries + 1):
+                if attempt:
+                    time.sleep(min(5 * attempt, 30))
+                for event in follow_events(target, opts, since=since):
+                    key = (
+                        event.get("run"),
+                        event["event"],
+                        event.get("step"),
+                        event.get("t"),
+                    )
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    events.put((label, event))
+                    if event["event"] == "end":
+                        final = event.get("status") or "fail"
+                if final != "lost":
+                    break
+        finally:
+            events.put((label, {"event": "_closed", "status": final}))
+
+    for label, (target, opts) in hosts.items():
+        threading.Thread(
+            target=worker, args=(label, target, opts), daemon=True
+        ).start()
+
+    final: dict[str, str] = {}
+    while len(final) < len(hosts):
+        label, event = events.get()
+        if event["event"] == "_closed":
+            final[label] = event["status"]
+            continue
+        if on_event is not None:
+            on_event(label, event)
+        printer(format_event(label, event))
+    return final
+
+
+def step_summary(events_by_host: dict[str, list[dict[str, Any]]]) -> list[str]:
+    """Table lines: per step, hosts finished/failed, min/median/max seconds."""
+    steps: dict[str, list[tuple[str, int, str]]] = {}
+    for label, events in events_by_host.items():
+        for event in events:
+            if event["event"] in ("done", "fail") and event.get("step"):
+                steps.setdefault(event["step"], []).append(
+                    (label, int(event.get("secs", 0)), event["event"])
+                )
+
+    lines = [
+        f"{'step':<28} {'ok':>4} {'fail':>4} {'min':>6} {'median':>6} "
+        f"{'max':>6}  slowest / failed on"
+    ]
+    for step in sorted(steps):
+        runs = steps[step]
+        secs = [s for _, s, _ in runs]
+        failed = sorted(label for label, _, status in runs if status == "fail")
+        slowest = max(runs, key=lambda run: run[1])[0]
+        lines.append(
+            f"{step:<28} {len(runs) - len(failed):>4} {len(failed):>4} "
+            f"{min(secs):>5}s {statistics.median(secs):>5.0f}s "
+            f"{max(secs):>5}s  {slowest}"
+            + (f" / ❌ {', '.join(failed)}" if failed else "")
+        )
+    return lines
+
+
+def print_final(final: dict[str, str], started: float) -> int:
+    """Print a one-line result per host and return a process exit code."""
+    print(f"\n=== bootstrap finished in {time.time() - started:.0f}s ===")
+    for label, status in sorted(final.items()):
+        icon = "✅" if status == "ok" else "❌"
+        print(f"{icon} {label}: {status}")
+    sys.stdout.flush()
+    return 0 if final and all(s == "ok" for s in final.values()) else 1
@@ -0,0 +1,278 @@
+# -----------------------------------------------------------------------------
+# Content-addressed bootstrap payload + delta uploads
+#
+# Packs bootstrap/ plus the chosen config yaml (and optionally an offline
+# package bundle, see bootstrap_bundle.py) into a single compressed tar archive
+# whose name is derived from the hashes of its contents.  The archive is built
+# once and re-used from the local cache for as long as nothing changes.  A
+# manifest (relative path -> sha256) travels inside the archive and is left on
+# the remote next to run.sh, so a re-sync to an existing host only has to send
+# the files whose hashes differ.
+#
+# Main functions:
+#   - build_payload: build (or re-use) the archive for a bootstrap dir + config
+#   - sync_payload:  send the full archive or only changed files to a remote
+#
+# Remotes:
+#   - SSHRemote:   instance reachable via ssh (one ssh channel per read/apply)
+#   - LocalRemote: plain local directory standing in for the remote home dir
+#                  (used to check behaviour and bytes saved without AWS, see
+#                  scripts/ec2_payload_sync.py)
+# -----------------------------------------------------------------------------
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import shlex
+import subprocess
+import tarfile
+from dataclasses import dataclass
+from pathlib import Path
+
+PAYLOAD_CACHE_DIR = Path("~/.cache/aws-utils/payloads").expanduser()
+PAYLOAD_ROOT = (
+    "bootstrap"  # top-level dir inside the archive / in the remote home dir
+)
+MANIFEST_NAME = ".payload_manifest.json"
+
+# Files that live in bootstrap/ on the remote but are never part of the payload
+EXCLUDE_NAMES = {"__pycache__", ".DS_Store", MANIFEST_NAME}
+EXCLUDE_SUFFIXES = (".log", ".events", ".pyc", ".part")
+BUNDLE_ROOT = (
+    f"{PAYLOAD_ROOT}/bundle"  # where the steps look for the bundle by default
+)
+
+
+@dataclass
+class Payload:
+    digest: str  # sha256 over the manifest, names the archive
+    archive: Path  # cached .tar.gz with every file + manifest
+    manifest: dict[str, str]  # archive-relative path -> sha256
+    files: dict[str, Path]  # archive-relative path -> local source file
+
+
+@dataclass
+class SyncStats:
+    mode: str  # "full", "delta" or "noop"
+    bytes_sent: int
+    full_bytes: int  # size of the full archive, for comparison
+    files_sent: int
+    files_removed: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.full_bytes - self.bytes_sent
+
+
+def _excluded(path: Path) -> bool:
+    return any(
+        part in EXCLUDE_NAMES for part in path.parts
+    ) or path.name.endswith(EXCLUDE_SUFFIXES)
+
+
+def payload_files(
+    bootstrap_dir: Path,
+    config_path: Path | None = None,
+    bundle_dir: Path | None = None,
+) -> dict[str, Path]:
+    """Map archive-relative paths (bootstrap/...) to local files."""
+    bootstrap_dir = Path(bootstrap_dir).expanduser().resolve()
+    files: dict[str, Path] = {}
+    for path in sorted(bootstrap_dir.rglob("*")):
+        rel = path.relative_to(bootstrap_dir)
+        if path.is_file() and not _excluded(rel):
+            files[f"{PAYLOAD_ROOT}/{rel.as_posix()}"] = path
+
+    # The chosen config always lands in ~/bootstrap/<name>.yaml where run.sh
+    # expects it
+    if config_path is not None:
+        config_path = Path(config_path).expanduser().resolve()
+        files[f"{PAYLOAD_ROOT}/{config_path.name}"] = config_path
+
+    if bundle_dir is not None:
+        bundle_dir = Path(bundle_dir).expanduser().resolve()
+        for path in sorted(bundle_dir.rglob("*")):
+            rel = path.relative_to(bundle_dir)
+            if path.is_file() and not _excluded(rel):
+                files[f"{BUNDLE_ROOT}/{rel.as_posix()}"] = path
+    return files
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_manifest(files: dict[str, Path]) -> dict[str, str]:
+    return {rel: file_sha256(src) for rel, src in sorted(files.items())}
+
+
+def manifest_digest(manifest: dict[str, str]) -> str:
+    return hashlib.sha256(
+        json.dumps(manifest, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def _write_archive(
+    fileobj: io.BufferedIOBase | io.BytesIO,
+    files: dict[str, Path],
+    manifest: dict[str, str],
+    compresslevel: int = 9,
+) -> None:
+    """Write a deterministic tar.gz (fixed mtimes/owners) of files + manifest"""
+    with gzip.GzipFile(
+        filename="",
+        fileobj=fileobj,
+        mode="wb",
+        compresslevel=compresslevel,
+        mtime=0,
+    ) as gz:
+        with tarfile.open(
+            fileobj=gz, mode="w", format=tarfile.PAX_FORMAT
+        ) as tar:
+            for rel in sorted(files):
+                src = files[rel]
+                info = tarfile.TarInfo(rel)
+                info.size = src.stat().st_size
+                info.mode = 0o755 if os.access(src, os.X_OK) else 0o644
+                info.mtime = 0
+                with open(src, "rb") as f:
+                    tar.addfile(info, f)
+
+            data = json.dumps(manifest, indent=1, sort_keys=True).encode()
+            info = tarfile.TarInfo(f"{PAYLOAD_ROOT}/{MANIFEST_NAME}")
+            info.size = len(data)
+            info.mode = 0o644
+            tar.addfile(info, io.BytesIO(data))
+
+
+def _compresslevel(files: dict[str, Path]) -> int:
+    # Bundles are mostly wheels/conda packages that are already compressed;
+    # level 1 keeps the archive build fast without costing much size
+    return 1 if any(rel.startswith(BUNDLE_ROOT + "/") for rel in files) else 9
+
+
+def build_payload(
+    bootstrap_dir: Path,
+    config_path: Path | None = None,
+    cache_dir: Path = PAYLOAD_CACHE_DIR,
+    bundle_dir: Path | None = None,
+) -> Payload:
+    """Content-addressed payload; the archive is only built if not cached."""
+    files = payload_files(bootstrap_dir, config_path, bundle_dir)
+    manifest = build_manifest(files)
+    digest = manifest_digest(manifest)
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    archive = cache_dir / f"bootstrap-{digest[:16]}.tar.gz"
+    if not archive.exists():
+        tmp = archive.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            _write_archive(f, files, manifest, _compresslevel(files))
+        tmp.replace(archive)
+
+    return Payload(
+        digest=digest, archive=archive, manifest=manifest, files=files
+    )
+
+
+def delta_archive(payload: Payload, changed: list[str]) -> bytes:
+    """Compressed archive of only the changed files (plus the new manifest)."""
+    buf = io.BytesIO()
+    _write_archive(
+        buf,
+        {rel: payload.files[rel] for rel in changed},
+        payload.manifest,
+        _compresslevel(payload.files),
+    )
+    return buf.getvalue()
+
+
+class LocalRemote:
+    """A local directory standing in for the remote home directory."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root).expanduser()
+
+    def read_manifest(self) -> dict[str, str] | None:
+        path = self.root / PAYLOAD_ROOT / MANIFEST_NAME
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def apply(self, archive: bytes, removed: list[str]) -> None:
+        for rel in removed:
+            (self.root / rel).unlink(missing_ok=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(fileobj=io.BytesIO(archive), mode="r:gz") as tar:
+            tar.extractall(self.root, filter="data")
+
+
+class SSHRemote:
+    """Remote home directory on an instance, reached with plain ssh."""
+
+    def __init__(self, target: str, ssh_opts: list[str] | None = None) -> None:
+        self.target = target
+        self.ssh_opts = ssh_opts or []
+
+    def _ssh(
+        self, remote_cmd: str, data: bytes | None = None
+    ) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["ssh", *self.ssh_opts, self.target, remote_cmd],
+            input=data,
+            capture_output=True,
+            check=False,
+        )
+
+    def read_manifest(self) -> dict[str, str] | None:
+        result = self._ssh(f"cat ~/{PAYLOAD_ROOT}/{MANIFEST_NAME} 2>/dev/null")
+        if result.returncode != 0 or not result.stdout.strip():
+            return None
+        try:
+            return json.loads(result.stdout)
+        except json.JSONDecodeError:
+            return None
+
+    def apply(self, archive: bytes, removed: list[str]) -> None:
+        # Removal and extraction share one ssh channel; the archive streams over
+        # stdin.  Paths are quoted for the remote shell, with ~/ outside the
+        # quotes so that it still expands
+        paths = " ".join(f"~/{shlex.quote(rel)}" for rel in removed)
+        rm_cmd = f"rm -f {paths} && " if removed else ""
+        result = self._ssh(f"{rm_cmd}tar -xzf - -C ~", data=archive)
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"payload upload to {self.target} failed: "
+                f"{result.stderr.decode(errors='replace').strip()}"
+            )
+
+
+def sync_payload(
+    payload: Payload, remote: LocalRemote | SSHRemote
+) -> SyncStats:
+    """Update the remote: full archive on first sync, then only changed files"""
+    full_bytes = payload.archive.stat().st_size
+    remote_manifest = remote.read_manifest()
+
+    if remote_manifest is None:
+        remote.apply(payload.archive.read_bytes(), [])
+        return SyncStats("full", full_bytes, full_bytes, len(payload.files), 0)
+
+    changed = [
+        rel
+        for rel, h in payload.manifest.items()
+        if remote_manifest.get(rel) != h
+    ]
+    removed = [rel for rel in remote_manifest if rel not in payload.manifest]
+    if not changed and not removed:
+        return SyncStats("noop", 0, full_bytes, 0, 0)
+
+    data = delta_archive(payload, changed)
+    remote.apply(data, removed)
+    return SyncStats("delta", len(data), full_bytes, len(changed), len(removed))
@@ -0,0 +1,266 @@
+# -----------------------------------------------------------------------------
+# Capacity-aware launch: fall back across AZs and instance types on capacity
+# errors
+#
+# run_instances fails with InsufficientInstanceCapacity (or Unsupported, for a
+# type an AZ does not offer) far more often for GPU types.  Instead of editing
+# subnets/types by hand:
+#   - fallback types come from the spec/price catalog
+#     (outputs/<family>_<date>.csv written by ec2_specs_price.py --save): same
+#     architecture, at least the vCPUs / memory / GPUs of the requested type,
+#     under a max price, cheapest first (or an explicit list, also
+#     price-ordered)
+#   - one describe_instance_type_offerings call finds which AZs offer which
+#     candidate, and one describe_subnets call finds a subnet per AZ in the
+#     template's VPC
+#   - attempts are (type, subnet) pairs: requested type first, template subnet
+#     first; types no AZ offers are dropped before any launch is tried
+#   - run_instances is retried on the next attempt only for capacity/offering
+#     errors, with a short-timeout client so a slow endpoint does not stall the
+#     loop
+#
+# Main functions:
+#   - fallback_types:    price-ordered candidate types from the catalog
+#   - plan_attempts:     (type, subnet, az) attempts pre-filtered with the
+#                        offerings
+#   - run_with_fallback: run_instances over the attempts until one launches
+# -----------------------------------------------------------------------------
+
+import copy
+import csv
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from template_registry import arch_for
+from template_registry import family_dir_for
+
+RETRY_CODES = {
+    "InsufficientInstanceCapacity",
+    "InsufficientHostCapacity",
+    "InsufficientCapacity",
+    "Unsupported",
+}
+FAST_CLIENT_CONFIG = Config(
+    connect_timeout=3,
+    read_timeout=20,
+    retries={"mode": "standard", "max_attempts": 2},
+)
+DEFAULT_MAX_FALLBACKS = 3
+AUTO_PRICE_FACTOR = (
+    1.5  # without a max price, allow up to 1.5x the requested type's price
+)
+
+
+class NoOfferingError(LookupError):
+    pass
+
+
+@dataclass
+class Attempt:
+    instance_type: str
+    subnet_id: str | None
+    az: str | None
+
+    @property
+    def label(self) -> str:
+        return f"{self.instance_type} in {self.az or 'any AZ'}" + (
+            f" ({self.subnet_id})" if self.subnet_id else ""
+        )
+
+
+def latest_catalog(outputs_dir: Path, instance_type: str) -> Path | None:
+    """Newest outputs/<family>_<YYYYMMDD>.csv for the type's family letter."""
+    files = sorted(
+        outputs_dir.glob(f"{family_dir_for(instance_type)}_[0-9]*.csv")
+    )
+    return files[-1] if files else None
+
+
+def _float(value: str | None) -> float:
+    try:
+        return float(value) if value not in (None, "") else 0.0
+    except ValueError:
+        return 0.0
+
+
+def _gpu_vendor(row: dict[str, Any]) -> str | None:
+    if row.get("HasGPU") != "True":
+        return None
+    return (
+        "amd" if "Radeon" in (row.get("GpuName") or "") else "nvidia"
+    )  # drivers/AMIs differ
+
+
+def load_catalog(path: Path) -> dict[str, dict[str, Any]]:
+    with open(path, newline="") as f:
+        return {row["Type"]: row for row in csv.DictReader(f)}
+
+
+def validate_fallback(value: Any) -> list[str]:
+    """Problems with an ec2_instance.fallback config value (None: unset)."""
+    if value is None or isinstance(value, bool):
+        return []
+    if isinstance(value, list) and all(isinstance(t, str) for t in value):
+        return []
+    return ["ec2_instance.fallback: expected true/false or a list of types"]
+
+
+def fallback_types(
+    catalog: dict[str, dict[str, Any]],
+    primary: str,
+    explicit: list[str] | None = None,
+    max_price: float | None = None,
+    limit: int = DEFAULT_MAX_FALLBACKS,
+) -> list[str]:
+    """Fallback types cheapest first.
+
+    explicit: only these (unknown types keep their given order, after the
+    priced ones).  Otherwise: current-generation, non-metal types of the same
+    architecture and GPU vendor with at least the primary's vCPUs, memory and
+    GPU count, priced under max_price (default 1.5x the primary).
+    """
+
+    def price(t: str) -> float:
+        usd = _float(catalog.get(t, {}).get("USDPerHr"))
+        return usd if usd > 0 else float("inf")
+
+    if explicit:
+        return sorted((t for t in explicit if t != primary), key=price)
+
+    base = catalog.get(primary)
+    if base is None:
+        return []
+    cap = max_price if max_price else price(primary) * AUTO_PRICE_FACTOR
+    arch = arch_for(primary)
+    candidates = []
+    for t, row in catalog.items():
+        if t == primary or "metal" in t or row.get("CurrentGen") != "True":
+            continue
+        if arch not in (row.get("Arch") or "") or _gpu_vendor(
+            row
+        ) != _gpu_vendor(base):
+            continue
+        if (
+            _float(row.get("VCpu")) < _float(base.get("VCpu"))
+            or _float(row.get("MemoryMiB")) < _float(base.get("MemoryMiB"))
+            or _float(row.get("GpuCount")) < _float(base.get("GpuCount"))
+        ):
+            continue
+        if price(t) <= cap:
+            candidates.append(t)
+    return sorted(candidates, key=price)[:limit]
+
+
+def _template_subnet(spec: dict) -> str | None:
+    for ni in spec.get("NetworkInterfaces", []):
+        if ni.get("DeviceIndex", 0) == 0 and ni.get("SubnetId"):
+            return ni["SubnetId"]
+    return spec.get("SubnetId")
+
+
+def plan_attempts(ec2: Any, spec: dict, types: list[str]) -> list[Attempt]:
+    """(type, subnet) attempts in order, keeping only AZs that offer each
+    type."""
+    offered: dict[str, set[str]] = {t: set() for t in types}
+    paginator = ec2.get_paginator("describe_instance_type_offerings")
+    for page in paginator.paginate(
+        LocationType="availability-zone",
+        Filters=[{"Name": "instance-type", "Values": types}],
+    ):
+        for offering in page.get("InstanceTypeOfferings", []):
+            offered.setdefault(offering["InstanceType"], set()).add(
+                offering["Location"]
+            )
+
+    subnet_id = _template_subnet(spec)
+    subnets: list[
+        tuple[str | None, str]
+    ] = []  # (subnet, az), template subnet first
+    if subnet_id:
+        home = ec2.describe_subnets(SubnetIds=[subnet_id])["Subnets"][0]
+        vpc_subnets = ec2.describe_subnets(
+            Filters=[
+                {"Name": "vpc-id", "Values": [home["VpcId"]]},
+                {"Name": "state", "Values": ["available"]},
+            ]
+        )["Subnets"]
+        seen = {home["AvailabilityZone"]}
+        subnets.append((subnet_id, home["AvailabilityZone"]))
+        for subnet in sorted(
+            vpc_subnets,
+            key=lambda s: (not s.get("DefaultForAz"), s["AvailabilityZone"]),
+        ):
+            if subnet["AvailabilityZone"] not in seen:
+                seen.add(subnet["AvailabilityZone"])
+                subnets.append((subnet["SubnetId"], subnet["AvailabilityZone"]))
+    else:  # default VPC: place by AZ
+        zones = sorted(set().union(*offered.values()))
+        subnets = [(None, az) for az in zones]
+
+    return [
+        Attempt(t, subnet, az)
+        for t in types
+        for subnet, az in subnets
+        if az in offered.get(t, set())
+    ]
+
+
+def apply_attempt(spec: dict, attempt: Attempt) -> dict:
+    """Copy of spec launching attempt.instance_type into attempt's subnet /
+    AZ."""
+    spec = copy.deepcopy(spec)
+    if spec.get("InstanceType") != attempt.instance_type:
+        spec["InstanceType"] = attempt.instance_type
+        spec.pop("CpuOptions", None)  # core counts are per type
+    if attempt.subnet_id:
+        interfaces = [
+            ni
+            for ni in spec.get("NetworkInterfaces", [])
+            if ni.get("DeviceIndex", 0) == 0
+        ]
+        if interfaces:
+            interfaces[0]["SubnetId"] = attempt.subnet_id
+        else:
+            spec["SubnetId"] = attempt.subnet_id
+    elif attempt.az:
+        spec.setdefault("Placement", {})["AvailabilityZone"] = attempt.az
+    return spec
+
+
+def run_with_fallback(
+    ec2: Any,
+    spec: dict,
+    attempts: list[Attempt],
+    dry_run: bool = False,
+    on_fail: Callable[[Attempt, str], None] | None = None,
+) -> tuple[dict, dict]:
+    """run_instances over attempts until one is not a capacity/offering error.
+
+    Returns (response, spec used).  Other errors (including DryRunOperation)
+    propagate at once; if every attempt fails on capacity the last error is
+    raised.
+    """
+    last: ClientError | None = None
+    for attempt in attempts:
+        attempt_spec = apply_attempt(spec, attempt)
+        try:
+            return ec2.run_instances(
+                **attempt_spec, DryRun=dry_run
+            ), attempt_spec
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            if code not in RETRY_CODES:
+                raise
+            last = e
+            if on_fail is not None:
+                on_fail(attempt, code)
+    if last is None:
+        raise NoOfferingError(
+            "no AZ offers the requested or fallback instance types"
+        )
+    raise last
@@ -0,0 +1,157 @@
+# -----------------------------------------------------------------------------
+# Cached YAML loading for bootstrap configs, launch templates and
+# configs/regions.yaml
+#
+# Parsing is done with the C (libyaml) loader when PyYAML was built with it, and
+# the parsed + validated result is pickled into ~/.cache/aws-utils/configs keyed
+# by the file's resolved path, mtime and size.  A later load of an unchanged
+# file is a stat plus one small pickle read; an edited file is re-parsed and
+# re-validated on its next load.
+#
+# Callers pass the validator for the file they load (the generic ones live here;
+# modules that add config keys, eg ebs_provision, provide checks for their own
+# keys).  It runs once, when the cache entry is filled; an invalid file is never
+# cached and raises ConfigError (with every problem found, not just the first)
+# on each load until fixed.
+#
+# Main functions:
+#   - load_yaml:   parse (or fetch from cache) a yaml file, optionally checked
+#   - clear_cache: drop all cached entries
+# -----------------------------------------------------------------------------
+
+import hashlib
+import os
+import pickle
+import threading
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+# CSafeLoader only exists when PyYAML was built against libyaml
+Loader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+CONFIG_CACHE_DIR = Path("~/.cache/aws-utils/configs").expanduser()
+CACHE_VERSION = 4  # bump when validators or cached shapes change
+
+
+# data -> list of problems (empty when valid)
+Validator = Callable[[Any], list[str]]
+
+
+class ConfigError(ValueError):
+    """A yaml file that does not match its expected schema."""
+
+
+def _require(data: Any, fields: list[str], where: str) -> list[str]:
+    if not isinstance(data, dict):
+        return [f"{where}: expected a mapping"]
+    return [
+        f"missing required field: {where}.{field}"
+        for field in fields
+        if field not in data
+    ]
+
+
+def validate_bootstrap_config(data: Any) -> list[str]:
+    """bootstrap/config*.yaml as used by ec2_launch_bootstrap.py."""
+    if not isinstance(data, dict):
+        return ["expected a mapping at the top level"]
+    return _require(
+        data.get("ec2_instance"),
+        ["family", "type", "max_price", "name", "ebs_storage", "ubuntu"],
+        "ec2_instance",
+    )
+
+
+def validate_launch_template(data: Any) -> list[str]:
+    """launch/<family>/*.yaml (run-instances skeletons)."""
+    problems = _require(data, ["ImageId", "InstanceType"], "template")
+    if not problems and not isinstance(
+        data.get("BlockDeviceMappings", []), list
+    ):
+        problems.append("BlockDeviceMappings: expected a list")
+    return problems
+
+
+def validate_regions(data: Any) -> list[str]:
+    """configs/regions.yaml: region code -> pricing API location name."""
+    if not isinstance(data, dict):
+        return ["expected a mapping of region -> location"]
+    return [
+        f"{region}: expected a location string"
+        for region, location in data.items()
+        if not isinstance(location, str)
+    ]
+
+
+def _schema_name(validator: Validator | None) -> str | None:
+    if validator is None:
+        return None
+    name = getattr(validator, "__qualname__", repr(validator))
+    return f"{validator.__module__}.{name}"
+
+
+def _cache_path(path: Path, schema: str | None, cache_dir: Path) -> Path:
+    return cache_dir / (
+        hashlib.sha256(f"{path}|{schema}".encode()).hexdigest()[:24] + ".pickle"
+    )
+
+
+def _key(path: Path, stat: os.stat_result, schema: str | None) -> tuple:
+    return (CACHE_VERSION, str(path), stat.st_mtime_ns, stat.st_size, schema)
+
+
+def load_yaml(
+    path: Path | str,
+    validator: Validator | None = None,
+    cache_dir: Path = CONFIG_CACHE_DIR,
+) -> Any:
+    """Return the parsed yaml at path, checked with validator when given.
+
+    Entries are cached per validator, so loading the file with a different one
+    re-checks it.  Raises FileNotFoundError for a missing file and ConfigError
+    for a schema mismatch.
+    """
+    path = Path(path).expanduser().resolve()
+    schema = _schema_name(validator)
+    stat = path.stat()
+    key = _key(path, stat, schema)
+    cache_file = _cache_path(path, schema, cache_dir)
+
+    try:
+        with open(cache_file, "rb") as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == key:
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, TypeError):
+        pass  # missing or unreadable cache entry, re-parse
+
+    with open(path, "rb") as f:
+        data = yaml.load(f, Loader=Loader)
+
+    if validator is not None:
+        problems = validator(data)
+        if problems:
+            raise ConfigError(f"{path}: " + "; ".join(problems))
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(
+            f".{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        with open(tmp, "wb") as f:
+            pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_file)
+    except OSError:
+        pass  # read-only home etc: still return the parsed data
+    return data
+
+
+def clear_cache(cache_dir: Path = CONFIG_CACHE_DIR) -> int:
+    removed = 0
+    for entry in cache_dir.glob("*.pickle"):
+        entry.unlink(missing_ok=True)
+        removed += 1
+    return removed
@@ -0,0 +1,253 @@
+# -----------------------------------------------------------------------------
+# gp3 IOPS / throughput for launch specs, sized from the instance's EBS
+# bandwidth
+#
+# A gp3 volume comes with 3000 IOPS and 125 MiB/s whatever its size, far below
+# what most instances can push to EBS (eg ~1190 MB/s baseline on an
+# m7i.8xlarge).  Profiles size every gp3 (or gp2, converted) volume in
+# BlockDeviceMappings from describe_instance_types:
+#   - balanced: the instance's *baseline* EBS throughput and IOPS
+#   - max:      the instance's burst/maximum EBS throughput and IOPS
+# Explicit iops/throughput values win over the profile.  Results are clamped to
+# the gp3 rules (IOPS <= 500 per GiB, throughput <= 0.25 MiB/s per IOPS, 80000
+# IOPS / 2000 MiB/s max) and priced against the gp3 baseline with us-east-1 list
+# prices.
+#
+# Main functions:
+#   - instance_ebs_limits: baseline/max EBS bandwidth and IOPS for an
+#                          instance type
+#   - plan_volumes:        per-volume changes for a spec, with extra
+#                          monthly/hourly cost
+#   - apply_plan:          write the planned VolumeType/Iops/Throughput into
+#                          the spec
+# -----------------------------------------------------------------------------
+
+import math
+from dataclasses import dataclass
+from typing import Any
+
+PROFILES = ("balanced", "max")
+
+# gp3 rules
+GP3_FREE_IOPS = 3000
+GP3_FREE_THROUGHPUT = 125  # MiB/s
+GP3_MAX_IOPS = 80000
+GP3_MAX_THROUGHPUT = 2000  # MiB/s
+GP3_IOPS_PER_GIB = 500
+GP3_THROUGHPUT_PER_IOPS = 0.25  # MiB/s
+
+# us-east-1 list prices, per month
+USD_PER_GB_MONTH = 0.08
+USD_PER_IOPS_MONTH = 0.005  # above 3000
+USD_PER_MIBPS_MONTH = 0.04  # above 125 MiB/s
+HOURS_PER_MONTH = 730
+
+MB_TO_MIB = 1e6 / 2**20
+
+
+@dataclass
+class EbsLimits:
+    instance_type: str
+    baseline_mbps: float  # MB/s
+    max_mbps: float
+    baseline_iops: int
+    max_iops: int
+
+
+@dataclass
+class VolumePlan:
+    device: str
+    size_gib: int
+    old_type: str
+    old_iops: int
+    old_throughput: int
+    iops: int
+    throughput: int
+    notes: list[str]
+
+    @property
+    def changed(self) -> bool:
+        return (self.old_type, self.old_iops, self.old_throughput) != (
+            "gp3",
+            self.iops,
+            self.throughput,
+        )
+
+    @property
+    def extra_usd_month(self) -> float:
+        """Cost of the planned IOPS/throughput over what the spec had before."""
+        return gp3_perf_usd_month(
+            self.iops, self.throughput
+        ) - gp3_perf_usd_month(self.old_iops, self.old_throughput)
+
+    @property
+    def extra_usd_hour(self) -> float:
+        return self.extra_usd_month / HOURS_PER_MONTH
+
+    @property
+    def usd_month(self) -> float:
+        """Whole volume (storage + IOPS + throughput) as planned."""
+        return self.size_gib * USD_PER_GB_MONTH + gp3_perf_usd_month(
+            self.iops, self.throughput
+        )
+
+    def describe(self) -> str:
+        extra = (
+            f"{self.extra_usd_month:+.2f}$/mo "
+            f"({self.extra_usd_hour:+.4f}$/hr), "
+            f"volume {self.usd_month:.2f}$/mo"
+        )
+        volume_type = (
+            "gp3" if self.old_type == "gp3" else f"{self.old_type}->gp3"
+        )
+        text = (
+            f"{self.device} {volume_type} {self.size_gib}GiB: "
+            f"{self.old_iops} IOPS/{self.old_throughput} MiB/s -> "
+            f"{self.iops} IOPS/{self.throughput} MiB/s, {extra}"
+        )
+        return text + "".join(f"\n     ⚠️ {note}" for note in self.notes)
+
+
+def gp3_perf_usd_month(iops: int, throughput: int) -> float:
+    return (
+        max(iops - GP3_FREE_IOPS, 0) * USD_PER_IOPS_MONTH
+        + max(throughput - GP3_FREE_THROUGHPUT, 0) * USD_PER_MIBPS_MONTH
+    )
+
+
+def instance_ebs_limits(ec2: Any, instance_type: str) -> EbsLimits:
+    item = ec2.describe_instance_types(InstanceTypes=[instance_type])[
+        "InstanceTypes"
+    ][0]
+    info = item.get("EbsInfo", {}).get("EbsOptimizedInfo") or {}
+    baseline_mbps = (
+        info.get("BaselineThroughputInMBps")
+        or info.get("BaselineBandwidthInMbps", 0) / 8
+    )
+    return EbsLimits(
+        instance_type=instance_type,
+        baseline_mbps=float(baseline_mbps),
+        max_mbps=float(info.get("MaximumThroughputInMBps") or baseline_mbps),
+        baseline_iops=int(info.get("BaselineIops") or GP3_FREE_IOPS),
+        max_iops=int(
+            info.get("MaximumIops") or info.get("BaselineIops") or GP3_FREE_IOPS
+        ),
+    )
+
+
+def size_gp3(
+    size_gib: int, iops: int, throughput: int
+) -> tuple[int, int, list[str]]:
+    """Clamp a wanted iops/throughput pair to what a gp3 volume of size_gib
+    allows."""
+    notes = []
+    iops = max(iops, GP3_FREE_IOPS)
+    throughput = max(throughput, GP3_FREE_THROUGHPUT)
+    # throughput needs IOPS behind it (0.25 MiB/s per IOPS)
+    iops = max(iops, math.ceil(throughput / GP3_THROUGHPUT_PER_IOPS))
+
+    iops_cap = min(
+        GP3_MAX_IOPS, max(GP3_FREE_IOPS, size_gib * GP3_IOPS_PER_GIB)
+    )
+    if iops > iops_cap:
+        notes.append(
+            f"{iops} IOPS needs >= {math.ceil(iops / GP3_IOPS_PER_GIB)}GiB, "
+            f"capped at {iops_cap} for {size_gib}GiB"
+        )
+        iops = iops_cap
+    throughput_cap = min(
+        GP3_MAX_THROUGHPUT, int(iops * GP3_THROUGHPUT_PER_IOPS)
+    )
+    if throughput > throughput_cap:
+        notes.append(
+            f"{throughput} MiB/s capped at {throughput_cap} "
+            f"(gp3 limit for {iops} IOPS)"
+        )
+        throughput = throughput_cap
+    return iops, throughput, notes
+
+
+def validate_profile(value: Any) -> list[str]:
+    """Problems with an ec2_instance.ebs_profile config value (None: unset)."""
+    if value is None or value in PROFILES:
+        return []
+    return [f"ec2_instance.ebs_profile: expected one of {', '.join(PROFILES)}"]
+
+
+def plan_volumes(
+    spec: dict,
+    limits: EbsLimits | None = None,
+    profile: str | None = None,
+    iops: int | None = None,
+    throughput: int | None = None,
+) -> list[VolumePlan]:
+    """Planned gp3 settings for every EBS volume in spec's BlockDeviceMappings.
+
+    profile ("balanced"/"max") needs limits; explicit iops/throughput override
+    the profile.
+    Volumes that are not gp3/gp2 (io1/io2/st1/sc1) are left alone.
+    """
+    if profile is not None and profile not in PROFILES:
+        raise ValueError(
+            f"unknown EBS profile {profile!r} (use {' or '.join(PROFILES)})"
+        )
+    want_iops, want_throughput = GP3_FREE_IOPS, GP3_FREE_THROUGHPUT
+    if profile:
+        if limits is None:
+            raise ValueError("profile needs limits")
+        mbps = limits.max_mbps if profile == "max" else limits.baseline_mbps
+        want_iops = (
+            limits.max_iops if profile == "max" else limits.baseline_iops
+        )
+        want_throughput = int(mbps * MB_TO_MIB)
+
+    plans = []
+    for bdm in spec.get("BlockDeviceMappings", []):
+        ebs = bdm.get("Ebs")
+        if ebs is None:
+            continue
+        volume_type = ebs.get("VolumeType", "gp2")
+        if volume_type not in ("gp3", "gp2"):
+            continue
+        size = int(ebs.get("VolumeSize", 8))
+        old_iops = (
+            int(ebs.get("Iops", GP3_FREE_IOPS))
+            if volume_type == "gp3"
+            else GP3_FREE_IOPS
+        )
+        old_throughput = (
+            int(ebs.get("Throughput", GP3_FREE_THROUGHPUT))
+            if volume_type == "gp3"
+            else GP3_FREE_THROUGHPUT
+        )
+        new_iops, new_throughput, notes = size_gp3(
+            size,
+            iops if iops is not None else (want_iops if profile else old_iops),
+            throughput
+            if throughput is not None
+            else (want_throughput if profile else old_throughput),
+        )
+        plans.append(
+            VolumePlan(
+                bdm.get("DeviceName", "?"),
+                size,
+                volume_type,
+                old_iops,
+                old_throughput,
+                new_iops,
+                new_throughput,
+                notes,
+            )
+        )
+    return plans
+
+
+def apply_plan(spec: dict, plans: list[VolumePlan]) -> None:
+    by_device = {p.device: p for p in plans}
+    for bdm in spec.get("BlockDeviceMappings", []):
+        plan = by_device.get(bdm.get("DeviceName", "?"))
+        if plan is None or "Ebs" not in bdm:
+            continue
+        bdm["Ebs"].update(
+            VolumeType="gp3", Iops=plan.iops, Throughput=plan.throughput
+        )
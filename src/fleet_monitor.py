@@ -0,0 +1,300 @@
+# -----------------------------------------------------------------------------
+# Batched CloudWatch utilization for all running instances + idle detection
+#
+# Instances come from one paginated describe_instances.  Their metrics are
+# pulled with get_metric_data, packing up to 500 metric queries (instances x
+# metrics) into each call, so a fleet of a hundred instances costs one or two
+# calls per poll rather than one per instance per metric.  Points are merged
+# into a rolling local time series (outputs/monitor/series.json) and each poll
+# only asks for what is newer than the last stored point.
+#
+# Metrics:
+#   cpu      AWS/EC2 CPUUtilization (Average, %)
+#   net_in   AWS/EC2 NetworkIn  (Sum, bytes per period)
+#   net_out  AWS/EC2 NetworkOut (Sum, bytes per period)
+#   gpu      CWAgent nvidia_smi_utilization_gpu (Maximum, %), GPU instance
+#            types only.  Needs the CloudWatch agent's nvidia_gpu plugin with
+#            InstanceId as the only appended dimension; without it the gpu
+#            series stays empty and GPU instances are never reported idle
+#            (a GPU-bound job can sit at a few % cpu).
+#
+# An instance is idle when, over the whole idle window, no cpu/gpu point reached
+# the threshold and no period moved more than net_bytes.  Instances younger than
+# the window, or with gaps in any of their series (cpu, net_in, net_out and,
+# on GPU types, gpu), are never reported idle.
+#
+# Main functions:
+#   - list_instances: running instances (optionally Name-filtered), one
+#     paginated call
+#   - fetch_metrics:  batched get_metric_data for many instances at once
+#   - SeriesStore:    rolling local time series (load / merge / trim / save)
+#   - find_idle:      instances idle for the whole window
+# -----------------------------------------------------------------------------
+
+import json
+import time
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+MAX_QUERIES_PER_CALL = 500  # get_metric_data limit
+
+METRICS: dict[
+    str, tuple[str, str, str]
+] = {  # key -> (namespace, metric name, statistic)
+    "cpu": ("AWS/EC2", "CPUUtilization", "Average"),
+    "net_in": ("AWS/EC2", "NetworkIn", "Sum"),
+    "net_out": ("AWS/EC2", "NetworkOut", "Sum"),
+    "gpu": ("CWAgent", "nvidia_smi_utilization_gpu", "Maximum"),
+}
+GPU_FAMILIES = ("g", "p")  # g4dn, g5, g6, p4d, p5 ...
+
+
+@dataclass
+class InstanceInfo:
+    instance_id: str
+    name: str | None
+    instance_type: str
+    launch_time: float  # epoch seconds
+
+    @property
+    def has_gpu(self) -> bool:
+        return self.instance_type.startswith(GPU_FAMILIES)
+
+
+@dataclass
+class IdleThresholds:
+    window_minutes: int = 60
+    cpu_percent: float = 5.0
+    gpu_percent: float = 5.0
+    net_bytes: float = 5e6  # in + out, per period
+
+
+def list_instances(
+    ec2: Any, names: list[str] | None = None
+) -> list[InstanceInfo]:
+    filters = [{"Name": "instance-state-name", "Values": ["running"]}]
+    if names:
+        filters.append({"Name": "tag:Name", "Values": names})
+    instances = []
+    for page in ec2.get_paginator("describe_instances").paginate(
+        Filters=filters
+    ):
+        for reservation in page.get("Reservations", []):
+            for inst in reservation.get("Instances", []):
+                name = next(
+                    (
+                        t["Value"]
+                        for t in inst.get("Tags", [])
+                        if t["Key"] == "Name"
+                    ),
+                    None,
+                )
+                instances.append(
+                    InstanceInfo(
+                        inst["InstanceId"],
+                        name,
+                        inst["InstanceType"],
+                        inst["LaunchTime"].timestamp(),
+                    )
+                )
+    return instances
+
+
+def metric_queries(
+    instances: list[InstanceInfo], period: int
+) -> tuple[list[dict], dict[str, tuple[str, str]]]:
+    """MetricDataQueries for every instance x metric, plus query id ->
+    (instance id, metric key)."""
+    queries, lookup = [], {}
+    for i, inst in enumerate(instances):
+        for key, (namespace, metric, stat) in METRICS.items():
+            if key == "gpu" and not inst.has_gpu:
+                continue
+            query_id = f"q{i}_{key}"
+            lookup[query_id] = (inst.instance_id, key)
+            queries.append(
+                {
+                    "Id": query_id,
+                    "MetricStat": {
+                        "Metric": {
+                            "Namespace": namespace,
+                            "MetricName": metric,
+                            "Dimensions": [
+                                {
+                                    "Name": "InstanceId",
+                                    "Value": inst.instance_id,
+                                }
+                            ],
+                        },
+                        "Period": period,
+                        "Stat": stat,
+                    },
+                    "ReturnData": True,
+                }
+            )
+    return queries, lookup
+
+
+def fetch_metrics(
+    cloudwatch: Any,
+    instances: list[InstanceInfo],
+    start: float,
+    end: float,
+    period: int = 300,
+) -> tuple[dict[str, dict[str, list[tuple[int, float]]]], int]:
+    """instance id -> metric key -> [(epoch, value)] oldest first, and the
+    number of API calls."""
+    queries, lookup = metric_queries(instances, period)
+    series: dict[str, dict[str, list[tuple[int, float]]]] = {}
+    calls = 0
+    for chunk_start in range(0, len(queries), MAX_QUERIES_PER_CALL):
+        chunk = queries[chunk_start : chunk_start + MAX_QUERIES_PER_CALL]
+        kwargs: dict[str, Any] = {
+            "MetricDataQueries": chunk,
+            "StartTime": datetime.fromtimestamp(start, UTC),
+            "EndTime": datetime.fromtimestamp(end, UTC),
+            "ScanBy": "TimestampAscending",
+        }
+        while True:
+            resp = cloudwatch.get_metric_data(**kwargs)
+            calls += 1
+            for result in resp.get("MetricDataResults", []):
+                instance_id, key = lookup[result["Id"]]
+                points = series.setdefault(instance_id, {}).setdefault(key, [])
+                points.extend(
+                    (int(t.timestamp()), float(v))
+                    for t, v in zip(
+                        result["Timestamps"], result["Values"], strict=True
+                    )
+                )
+            if not resp.get("NextToken"):
+                break
+            kwargs["NextToken"] = resp["NextToken"]
+    return series, calls
+
+
+class SeriesStore:
+    """Rolling per-instance, per-metric time series kept in one json file."""
+
+    def __init__(self, path: Path, retention_hours: int = 72) -> None:
+        self.path = path
+        self.retention = retention_hours * 3600
+        self.data: dict[str, dict[str, list[list[float]]]] = {}
+        if path.exists():
+            self.data = json.loads(path.read_text())
+
+    def last_time(self, instance_ids: list[str]) -> float | None:
+        """Oldest 'latest point' across the given instances (None if any has
+        no data yet)."""
+        latest = []
+        for instance_id in instance_ids:
+            cpu = self.data.get(instance_id, {}).get("cpu")
+            if not cpu:
+                return None
+            latest.append(cpu[-1][0])
+        return min(latest) if latest else None
+
+    def merge(
+        self, fetched: dict[str, dict[str, list[tuple[int, float]]]]
+    ) -> None:
+        for instance_id, metrics in fetched.items():
+            for key, points in metrics.items():
+                merged = {
+                    int(t): v
+                    for t, v in self.data.setdefault(instance_id, {}).get(
+                        key, []
+                    )
+                }
+                merged.update(points)
+                self.data[instance_id][key] = [
+                    [t, merged[t]] for t in sorted(merged)
+                ]
+
+    def trim(self, now: float, keep: set[str] | None = None) -> None:
+        """Drop points past retention, and instances no longer running (if
+        keep is given)."""
+        cutoff = now - self.retention
+        for instance_id in list(self.data):
+            if keep is not None and instance_id not in keep:
+                del self.data[instance_id]
+                continue
+            for key, points in self.data[instance_id].items():
+                self.data[instance_id][key] = [
+                    p for p in points if p[0] >= cutoff
+                ]
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, separators=(",", ":")))
+        tmp.replace(self.path)
+
+    def window(
+        self, instance_id: str, key: str, start: float
+    ) -> list[list[float]]:
+        return [
+            p
+            for p in self.data.get(instance_id, {}).get(key, [])
+            if p[0] >= start
+        ]
+
+
+def find_idle(
+    store: SeriesStore,
+    instances: list[InstanceInfo],
+    thresholds: IdleThresholds,
+    period: int = 300,
+    now: float | None = None,
+) -> dict[str, str]:
+    """instance id -> reason for every instance idle over the whole window."""
+    now = now or time.time()
+    start = now - thresholds.window_minutes * 60
+    # CloudWatch lags a period or two behind; expect at least this many points
+    # in the window
+    needed = max(1, thresholds.window_minutes * 60 // period - 2)
+
+    idle = {}
+    for inst in instances:
+        if inst.launch_time > start:
+            continue
+        cpu = store.window(inst.instance_id, "cpu", start)
+        net_in = {
+            int(t): v
+            for t, v in store.window(inst.instance_id, "net_in", start)
+        }
+        net_out = {
+            int(t): v
+            for t, v in store.window(inst.instance_id, "net_out", start)
+        }
+        gpu = store.window(inst.instance_id, "gpu", start)
+        # a missing period would count as 0% / 0 bytes, so gaps rule out idle;
+        # without gpu points a GPU instance's real load is unknown
+        if min(len(cpu), len(net_in), len(net_out)) < needed:
+            continue
+        if inst.has_gpu and len(gpu) < needed:
+            continue
+
+        cpu_max = max(v for _, v in cpu)
+        net_max = max(
+            (
+                net_in.get(t, 0) + net_out.get(t, 0)
+                for t in net_in.keys() | net_out.keys()
+            ),
+            default=0,
+        )
+        gpu_max = max((v for _, v in gpu), default=0)
+        if (
+            cpu_max < thresholds.cpu_percent
+            and gpu_max < thresholds.gpu_percent
+            and net_max < thresholds.net_bytes
+        ):
+            gpu_note = f", gpu max {gpu_max:.0f}%" if gpu else ""
+            idle[inst.instance_id] = (
+                f"cpu max {cpu_max:.1f}%{gpu_note}, net max "
+                f"{net_max / 1e6:.1f} MB/{period // 60}min "
+                f"over {thresholds.window_minutes}min"
+            )
+    return idle
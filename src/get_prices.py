@@ -12,6 +12,10 @@
 #   - ondemand2: More robust price lookup, filtering out zero-priced and
 #                capacity block SKUs, with pagination and extra safety checks
 #
+# Both take the pricing client from the caller, so a client made from
+# aws_replay.make_session(record=DIR / replay=DIR) records or replays these
+# lookups too.
+#
 # -----------------------------------------------------------------------------
 
 
@@ -0,0 +1,174 @@
+# -----------------------------------------------------------------------------
+# Batched start / stop / terminate for many instances across regions
+#
+# Targets are resolved from Name globs (EC2 filters take * and ? natively) and
+# tag filters with one paginated describe_instances per region.  Each region
+# then gets a single start/stop/terminate_instances call carrying all of its
+# ids, and a single shared poller describes all pending ids per region each
+# round until every instance reaches the target state, instead of a waiter per
+# instance.
+#
+# Main functions:
+#   - find_targets: resolve names/tags to Target objects, one paginated call per
+#     region
+#   - act:          one start/stop/terminate call per region; a call EC2 rejects
+#                   (ClientError) fails only its own ids
+#   - wait_all:     shared poller for all targets, reports each state change
+# -----------------------------------------------------------------------------
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from botocore.exceptions import ClientError
+
+# action -> (states an instance can be acted on from, state to wait for);
+# EC2 refuses to stop a pending instance (IncorrectInstanceState), so stop only
+# takes running ones
+ACTIONS = {
+    "start": (("stopped",), "running"),
+    "stop": (("running",), "stopped"),
+    "terminate": (("pending", "running", "stopping", "stopped"), "terminated"),
+}
+FAILED_STATES = {
+    "start": {"terminated", "shutting-down"},
+    "stop": {"terminated"},
+    "terminate": set(),
+}
+MAX_IDS_PER_CALL = 1000
+
+
+@dataclass
+class Target:
+    region: str
+    instance_id: str
+    name: str | None
+    state: str
+    public_ip: str | None = None
+    private_ip: str | None = None
+
+    @property
+    def label(self) -> str:
+        return f"{self.name or '-'} ({self.instance_id})"
+
+
+def _chunks(items: list[str], size: int = MAX_IDS_PER_CALL) -> list[list[str]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _target(region: str, inst: dict) -> Target:
+    name = next(
+        (t["Value"] for t in inst.get("Tags", []) if t["Key"] == "Name"), None
+    )
+    return Target(
+        region,
+        inst["InstanceId"],
+        name,
+        inst["State"]["Name"],
+        inst.get("PublicIpAddress"),
+        inst.get("PrivateIpAddress"),
+    )
+
+
+def find_targets(
+    clients: dict[str, Any],
+    names: list[str] | None = None,
+    tags: dict[str, list[str]] | None = None,
+    states: tuple[str, ...] | None = None,
+) -> list[Target]:
+    """Instances matching any of names and all tag filters, in any of states,
+    per region."""
+    filters = []
+    if names:
+        filters.append({"Name": "tag:Name", "Values": names})
+    for key, values in (tags or {}).items():
+        filters.append({"Name": f"tag:{key}", "Values": values})
+    if states:
+        filters.append({"Name": "instance-state-name", "Values": list(states)})
+
+    targets = []
+    for region, ec2 in clients.items():
+        for page in ec2.get_paginator("describe_instances").paginate(
+            Filters=filters
+        ):
+            for reservation in page.get("Reservations", []):
+                targets += [
+                    _target(region, inst)
+                    for inst in reservation.get("Instances", [])
+                ]
+    return targets
+
+
+def act(
+    clients: dict[str, Any], action: str, targets: list[Target]
+) -> tuple[int, dict[str, str]]:
+    """Issue the action for all targets; one API call per region (per 1000
+    ids). Returns calls and {instance_id: error code} for rejected calls."""
+    method = f"{action}_instances"
+    calls = 0
+    errors: dict[str, str] = {}
+    for region, ec2 in clients.items():
+        ids = [t.instance_id for t in targets if t.region == region]
+        for chunk in _chunks(ids):
+            calls += 1
+            try:
+                getattr(ec2, method)(InstanceIds=chunk)
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "ClientError")
+                errors.update(dict.fromkeys(chunk, code))
+    return calls, errors
+
+
+def wait_all(
+    clients: dict[str, Any],
+    action: str,
+    targets: list[Target],
+    interval: float = 5,
+    timeout: float = 900,
+    on_change: Callable[[Target, str], None] | None = None,
+) -> dict[str, str]:
+    """Poll every pending target's state together until all reach the
+    action's target state.
+
+    Returns instance id -> final state ("timeout:<state>" for instances still
+    pending).
+    """
+    goal = ACTIONS[action][1]
+    by_id = {t.instance_id: t for t in targets}
+    pending = {t.instance_id for t in targets if t.state != goal}
+    final = {t.instance_id: t.state for t in targets if t.state == goal}
+    deadline = time.time() + timeout
+
+    while pending and time.time() < deadline:
+        time.sleep(interval)
+        for region, ec2 in clients.items():
+            ids = [i for i in pending if by_id[i].region == region]
+            for chunk in _chunks(ids):
+                for page in ec2.get_paginator("describe_instances").paginate(
+                    InstanceIds=chunk
+                ):
+                    for reservation in page.get("Reservations", []):
+                        for inst in reservation.get("Instances", []):
+                            fresh = _target(region, inst)
+                            target = by_id[fresh.instance_id]
+                            if (
+                                fresh.state != target.state
+                                and on_change is not None
+                            ):
+                                on_change(fresh, target.state)
+                            target.state = fresh.state
+                            target.public_ip, target.private_ip = (
+                                fresh.public_ip,
+                                fresh.private_ip,
+                            )
+                            if (
+                                fresh.state == goal
+                                or fresh.state in FAILED_STATES[action]
+                            ):
+                                pending.discard(fresh.instance_id)
+                                final[fresh.instance_id] = fresh.state
+
+    for instance_id in pending:
+        final[instance_id] = f"timeout:{by_id[instance_id].state}"
+    return final
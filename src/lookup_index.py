@@ -0,0 +1,116 @@
+# -----------------------------------------------------------------------------
+# Local instance-type index for the zsh info helpers (ec2_specs, ec2_price, ...)
+#
+# Each of those shell functions starts the AWS CLI and calls the API, a second
+# or more per lookup.  ec2_specs_price.py --index writes the spec/price table to
+# one tab-separated file instead, one line per instance type sorted bytewise by
+# Type, so the shell can answer with `look` (binary search on a sorted file) or
+# an awk prefix scan, and only calls the API on a miss or when the file is older
+# than AWS_UTILS_INDEX_MAX_AGE_DAYS (zsh_general_info/ec2_index.zsh).
+#
+# File layout (both header lines start with '#', which sorts before any type
+# name):
+#   #!ec2-index v1 region=us-east-1 built=2026-01-01T12:00:00 types=891
+#   #Type<TAB>CurrentGen<TAB>...<TAB>USDPerHr
+#   a1.2xlarge<TAB>True<TAB>...
+#
+# A run covering only some types (eg --fam g --index) replaces those lines and
+# keeps the rest; a run without --price keeps the indexed prices.
+#
+# Main functions:
+#   - write_index: merge a spec/price DataFrame into the index file
+#   - read_index:  rows of an index file by Type
+# -----------------------------------------------------------------------------
+
+import math
+import time
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+INDEX_PATH = Path("~/.cache/aws-utils/ec2_index.tsv").expanduser()
+INDEX_VERSION = 1
+COLUMNS = [
+    "Type",
+    "CurrentGen",
+    "Arch",
+    "CpuCores",
+    "CpuThreadsPerCore",
+    "VCpu",
+    "GpuCount",
+    "GpuName",
+    "MemoryMiB",
+    "EbsOnly",
+    "InstanceStorage",
+    "NetPerf",
+    "EbsBwMbps",
+    "HasGPU",
+    "USDPerHr",
+]
+
+
+def _cell(value: Any) -> str:
+    if (
+        value is None
+        or value is pd.NA
+        or (isinstance(value, float) and math.isnan(value))
+    ):
+        return ""
+    if isinstance(value, float) and value.is_integer() and value < 1e15:
+        return str(int(value))
+    return str(value).replace("\t", " ").replace("\n", " ")
+
+
+def read_index(
+    path: Path = INDEX_PATH,
+) -> tuple[dict[str, str], dict[str, str]]:
+    """(meta from the first header line, Type -> line) of an index file; empty
+    if missing/other version."""
+    if not path.exists():
+        return {}, {}
+    lines = path.read_text().splitlines()
+    if not lines or not lines[0].startswith(f"#!ec2-index v{INDEX_VERSION} "):
+        return {}, {}
+    meta = dict(
+        part.split("=", 1) for part in lines[0].split()[2:] if "=" in part
+    )
+    if len(lines) < 2 or lines[1] != "#" + "\t".join(COLUMNS):
+        return meta, {}
+    return meta, {line.split("\t", 1)[0]: line for line in lines[2:] if line}
+
+
+def write_index(df: pd.DataFrame, region: str, path: Path = INDEX_PATH) -> int:
+    """Merge df's rows into the index (same region only), sorted for `look`.
+    Returns rows written."""
+    meta, rows = read_index(path)
+    if meta.get("region") != region:
+        rows = {}
+    for record in df.to_dict("records"):
+        if not record.get("Type"):
+            continue
+        # columns this run did not produce (eg USDPerHr without --price) keep
+        # their indexed value; a row with another field count is rebuilt from
+        # this run alone
+        fields = rows.get(record["Type"], "").split("\t")
+        old = (
+            dict(zip(COLUMNS, fields, strict=True))
+            if len(fields) == len(COLUMNS)
+            else {}
+        )
+        rows[record["Type"]] = "\t".join(
+            _cell(record[col]) if col in df.columns else old.get(col, "")
+            for col in COLUMNS
+        )
+
+    header = (
+        f"#!ec2-index v{INDEX_VERSION} region={region} "
+        f"built={time.strftime('%Y-%m-%dT%H:%M:%S')} types={len(rows)}"
+    )
+    # bytewise order (as LC_ALL=C sort / look expect); type names are ASCII
+    body = [rows[t] for t in sorted(rows, key=lambda t: t.encode())]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text("\n".join([header, "#" + "\t".join(COLUMNS), *body]) + "\n")
+    tmp.replace(path)
+    return len(body)
@@ -0,0 +1,203 @@
+# -----------------------------------------------------------------------------
+# Diff-based security-group ingress reconciler
+#
+# Instead of authorizing/revoking one (port, cidr) at a time per instance, the
+# caller states the desired set of (port, cidr) rules for a list of security
+# groups (or for the groups attached to instances matched by Name tag).  Current
+# rules come from one describe_security_groups call, the difference is computed
+# locally, and each group that needs changes gets at most one
+# authorize_security_group_ingress and one revoke_security_group_ingress call
+# carrying all of its permissions.  (The EC2 API takes a single GroupId per
+# call; instances normally share a group, so moving to a new IP across a dozen
+# instances is still ~2 calls.)
+#
+# Only the managed ports are ever touched.  In "sync" mode any other cidr on a
+# managed port is revoked (eg yesterday's IP, or 0.0.0.0/0 on 22); "allow" only
+# adds and "revoke" only removes.
+#
+# Main functions:
+#   - groups_for_instances: one paginated describe_instances -> {sg: [names]}
+#   - current_rules:        one describe_security_groups -> {sg: {Rule, ...}}
+#   - plan_changes:         desired vs current -> {group id: Change}
+#   - apply_changes:        batched authorize/revoke calls
+# -----------------------------------------------------------------------------
+
+import ipaddress
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+import requests
+from botocore.exceptions import ClientError
+
+DEFAULT_PORTS = (22, 8888)
+MODES = ("sync", "allow", "revoke")
+
+
+@dataclass(frozen=True, order=True)
+class Rule:
+    port: int
+    cidr: str
+    protocol: str = "tcp"
+
+    def __str__(self) -> str:
+        return f"{self.protocol}/{self.port} {self.cidr}"
+
+
+@dataclass
+class Change:
+    add: set[Rule] = field(default_factory=set)
+    remove: set[Rule] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.add or self.remove)
+
+
+def my_cidr() -> str:
+    """Current public IP as a /32, fetched once per run."""
+    ip = requests.get("https://checkip.amazonaws.com", timeout=5).text.strip()
+    return f"{ipaddress.ip_address(ip)}/32"
+
+
+def normalise_cidr(cidr: str) -> str:
+    """'1.2.3.4' -> '1.2.3.4/32'; validates the cidr (ValueError on garbage)."""
+    return str(ipaddress.ip_network(cidr, strict=False))
+
+
+def groups_for_instances(
+    ec2: Any, names: list[str], states: tuple[str, ...] = ("running",)
+) -> dict[str, list[str]]:
+    """Security groups of the instances whose Name tag matches any of names.
+
+    Names may use wildcards.
+    """
+    groups: dict[str, list[str]] = {}
+    paginator = ec2.get_paginator("describe_instances")
+    filters = [
+        {"Name": "tag:Name", "Values": names},
+        {"Name": "instance-state-name", "Values": list(states)},
+    ]
+    for page in paginator.paginate(Filters=filters):
+        for reservation in page.get("Reservations", []):
+            for inst in reservation.get("Instances", []):
+                name = next(
+                    (
+                        t["Value"]
+                        for t in inst.get("Tags", [])
+                        if t["Key"] == "Name"
+                    ),
+                    inst["InstanceId"],
+                )
+                for sg in inst.get("SecurityGroups", []):
+                    groups.setdefault(sg["GroupId"], []).append(name)
+    return groups
+
+
+def _rules_from_permission(perm: dict, ports: set[int]) -> set[Rule]:
+    """Managed single-port rules in one IpPermission.
+
+    Port ranges and all-traffic permissions are left alone.
+    """
+    protocol = perm.get("IpProtocol")
+    port = perm.get("FromPort")
+    if protocol != "tcp" or port != perm.get("ToPort") or port not in ports:
+        return set()
+    cidrs = [r["CidrIp"] for r in perm.get("IpRanges", [])]
+    cidrs += [r["CidrIpv6"] for r in perm.get("Ipv6Ranges", [])]
+    return {Rule(port, normalise_cidr(c), protocol) for c in cidrs}
+
+
+def current_rules(
+    ec2: Any, group_ids: list[str], ports: set[int]
+) -> dict[str, set[Rule]]:
+    rules: dict[str, set[Rule]] = {sg: set() for sg in group_ids}
+    paginator = ec2.get_paginator("describe_security_groups")
+    for page in paginator.paginate(GroupIds=list(group_ids)):
+        for group in page.get("SecurityGroups", []):
+            for perm in group.get("IpPermissions", []):
+                rules[group["GroupId"]] |= _rules_from_permission(perm, ports)
+    return rules
+
+
+def plan_changes(
+    current: dict[str, set[Rule]],
+    desired: set[Rule],
+    mode: str = "sync",
+    keep: set[str] | None = None,
+) -> dict[str, Change]:
+    """Per group: rules to add and remove so the managed ports end as desired.
+
+    current only holds rules on managed ports (see current_rules); cidrs in
+    keep are never revoked in sync mode.
+    """
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+    keep = keep or set()
+    changes = {}
+    for sg, have in current.items():
+        change = Change()
+        if mode in ("sync", "allow"):
+            change.add = desired - have
+        if mode == "sync":
+            change.remove = {r for r in have - desired if r.cidr not in keep}
+        elif mode == "revoke":
+            change.remove = desired & have
+        changes[sg] = change
+    return changes
+
+
+def ip_permissions(
+    rules: set[Rule], description: str | None = None
+) -> list[dict]:
+    """Group rules into as few IpPermissions as possible (one per port)."""
+    by_port: dict[tuple[str, int], list[str]] = {}
+    for rule in sorted(rules):
+        by_port.setdefault((rule.protocol, rule.port), []).append(rule.cidr)
+
+    permissions = []
+    for (protocol, port), cidrs in by_port.items():
+        perm: dict[str, Any] = {
+            "IpProtocol": protocol,
+            "FromPort": port,
+            "ToPort": port,
+        }
+        v4 = [c for c in cidrs if ":" not in c]
+        v6 = [c for c in cidrs if ":" in c]
+        extra = {"Description": description} if description else {}
+        if v4:
+            perm["IpRanges"] = [{"CidrIp": c, **extra} for c in v4]
+        if v6:
+            perm["Ipv6Ranges"] = [{"CidrIpv6": c, **extra} for c in v6]
+        permissions.append(perm)
+    return permissions
+
+
+def apply_changes(
+    ec2: Any,
+    changes: dict[str, Change],
+    description: str | None = None,
+    dry_run: bool = False,
+) -> dict[str, str]:
+    """One authorize + one revoke call per group with changes.
+
+    Returns group -> error for the groups that failed.  Authorize goes first:
+    if it fails the old rules are left in place, so a sync to a new IP can not
+    lock you out of ssh half way.
+    """
+    errors: dict[str, str] = {}
+    for sg, change in changes.items():
+        if not change or dry_run:
+            continue
+        try:
+            if change.add:
+                ec2.authorize_security_group_ingress(
+                    GroupId=sg,
+                    IpPermissions=ip_permissions(change.add, description),
+                )
+            if change.remove:
+                ec2.revoke_security_group_ingress(
+                    GroupId=sg, IpPermissions=ip_permissions(change.remove)
+                )
+        except ClientError as e:
+            errors[sg] = str(e)
+    return errors
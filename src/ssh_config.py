@@ -0,0 +1,334 @@
+# -----------------------------------------------------------------------------
+# Managed ~/.ssh/config entries for our instances, with multiplexed connections
+#
+# One block at the end of ~/.ssh/config, between the BEGIN/END markers below,
+# holds a `Host <Name>` entry per instance: HostName (public IP, else private),
+# User, IdentityFile (~/.ssh/<KeyName>), and:
+#   - ControlMaster auto / ControlPersist: the first ssh opens a master
+#     connection, later ssh/scp/rsync to the same host reuse it without a new
+#     handshake
+#   - HostKeyAlias <instance id>: known_hosts follows the instance, not its
+#     (recycled) IP, so a stop/start with a new IP does not trip host key checks
+#   - Compression, ServerAliveInterval, ForwardAgent (as the printed `ssh -A`
+#     commands)
+# Entries are rewritten in place when IPs change and dropped on terminate;
+# anything outside the block is left untouched.  Options set earlier in the file
+# (eg under `Host *`) win, as ssh takes the first value it finds.  Writers (eg
+# fleet launch threads) take turns on an flock of a sidecar lock file.
+#
+# Main functions:
+#   - update_hosts:     upsert / remove entries (closing stale master
+#                       connections first)
+#   - sync_hosts:       entries from describe_instances for running instances
+#   - multiplex_opts:   the same ControlMaster options as ssh -o arguments,
+#                       for scripts
+# -----------------------------------------------------------------------------
+
+import fcntl
+import os
+import subprocess
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+CONFIG_PATH = Path("~/.ssh/config").expanduser()
+CONTROL_DIR = "~/.ssh/cm"
+BEGIN = "# >>> aws-utils managed hosts (ec2_ssh_config.py) >>>"
+END = "# <<< aws-utils managed hosts <<<"
+
+MUX_OPTIONS = {
+    "ControlMaster": "auto",
+    # hash of host/port/user: short enough for a unix socket
+    "ControlPath": f"{CONTROL_DIR}/%C",
+    "ControlPersist": "10m",
+}
+HOST_OPTIONS = {
+    "IdentitiesOnly": "yes",
+    "StrictHostKeyChecking": "accept-new",
+    "ForwardAgent": "yes",
+    "Compression": "yes",
+    "ServerAliveInterval": "60",
+    **MUX_OPTIONS,
+}
+
+
+@dataclass
+class HostEntry:
+    alias: str
+    hostname: str
+    user: str
+    identity_file: str | None
+    instance_id: str
+    note: str = ""  # instance type / region, kept as a comment
+
+    def render(self) -> str:
+        lines = [
+            f"Host {self.alias}",
+            f"  # {self.instance_id} {self.note}".rstrip(),
+            f"  HostName {self.hostname}",
+            f"  User {self.user}",
+        ]
+        if self.identity_file:
+            lines.append(f"  IdentityFile {self.identity_file}")
+        lines.append(f"  HostKeyAlias {self.instance_id}")
+        lines += [f"  {key} {value}" for key, value in HOST_OPTIONS.items()]
+        return "\n".join(lines)
+
+
+def multiplex_opts() -> list[str]:
+    """ssh/scp -o arguments for a shared master connection per host."""
+    Path(CONTROL_DIR).expanduser().mkdir(
+        mode=0o700, parents=True, exist_ok=True
+    )
+    return [
+        arg
+        for key, value in MUX_OPTIONS.items()
+        for arg in ("-o", f"{key}={value}")
+    ]
+
+
+def default_user(image_name: str | None, architecture: str | None) -> str:
+    """Login user from the AMI name; without a recognisable name, ec2-user on
+    ARM."""
+    name = (image_name or "").lower()
+    if "ubuntu" in name:
+        return "ubuntu"
+    if "amzn" in name or "al20" in name or "amazon linux" in name:
+        return "ec2-user"
+    return "ec2-user" if architecture == "arm64" else "ubuntu"
+
+
+def _split(text: str) -> tuple[str, str, str]:
+    """(before, managed block body, after) of a config file's text."""
+    start = text.find(BEGIN)
+    end = text.find(END, start)
+    if start < 0 or end < 0:
+        return text, "", ""
+    return text[:start], text[start + len(BEGIN) : end], text[end + len(END) :]
+
+
+def _parse(body: str) -> dict[str, HostEntry]:
+    entries: dict[str, HostEntry] = {}
+    current: dict[str, str] = {}
+
+    def flush() -> None:
+        if current.get("Host"):
+            entries[current["Host"]] = HostEntry(
+                current["Host"],
+                current.get("HostName", ""),
+                current.get("User", "ubuntu"),
+                current.get("IdentityFile"),
+                current.get("HostKeyAlias", ""),
+                current.get("note", ""),
+            )
+
+    for raw in body.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            _, _, note = line.lstrip("# ").partition(" ")
+            current.setdefault("note", note)
+            continue
+        key, _, value = line.partition(" ")
+        if key == "Host":
+            flush()
+            current = {}
+        current.setdefault(key, value.strip())
+    flush()
+    return entries
+
+
+def read_hosts(path: Path = CONFIG_PATH) -> dict[str, HostEntry]:
+    """Managed entries by alias."""
+    if not path.exists():
+        return {}
+    return _parse(_split(path.read_text())[1])
+
+
+def close_master(alias: str) -> None:
+    """Stop the alias's master connection, if one is running (eg before its IP
+    changes)."""
+    try:
+        subprocess.run(
+            ["ssh", "-O", "exit", alias],
+            capture_output=True,
+            check=False,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+
+class config_lock:
+    """Exclusive flock around a read-modify-write of the ssh config."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path.with_name(path.name + ".aws-utils.lock")
+
+    def __enter__(self) -> "config_lock":
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self.fd = os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+        os.close(self.fd)
+
+
+def update_hosts(
+    upsert: list[HostEntry] | None = None,
+    remove: list[str] | None = None,
+    path: Path = CONFIG_PATH,
+) -> list[str]:
+    """Add/replace entries by alias and drop aliases; returns the aliases that
+    changed."""
+    path = path.resolve()  # write through a symlinked (dotfiles) config
+    with config_lock(path):
+        return _update_locked(path, upsert or [], remove or [])
+
+
+def _update_locked(
+    path: Path, upsert: list[HostEntry], remove: list[str]
+) -> list[str]:
+    text = path.read_text() if path.exists() else ""
+    before, body, after = _split(text)
+    entries = _parse(body)
+    changed = []
+
+    for alias in remove:
+        if entries.pop(alias, None) is not None:
+            close_master(alias)
+            changed.append(alias)
+    for entry in upsert:
+        old = entries.get(entry.alias)
+        if old == entry:
+            continue
+        if old is not None and (old.hostname, old.user) != (
+            entry.hostname,
+            entry.user,
+        ):
+            close_master(entry.alias)  # its ControlPath hashes the old address
+        entries[entry.alias] = entry
+        changed.append(entry.alias)
+    if not changed:
+        return changed
+
+    block = "\n\n".join(
+        e.render() for e in sorted(entries.values(), key=lambda e: e.alias)
+    )
+    if BEGIN in text:
+        text = (
+            before
+            + BEGIN
+            + ("\n" + block + "\n" if block else "\n")
+            + END
+            + after
+        )
+    else:
+        text = (
+            text.rstrip("\n")
+            + ("\n\n" if text.strip() else "")
+            + f"{BEGIN}\n{block}\n{END}\n"
+        )
+
+    tmp = path.with_name(
+        f"{path.name}.aws-utils.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    tmp.write_text(text)
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, path)
+    return changed
+
+
+def entry_for(
+    inst: dict[str, Any],
+    region: str,
+    user: str,
+    keys_dir: Path = Path("~/.ssh"),
+) -> HostEntry | None:
+    """HostEntry for a describe_instances item with a Name tag and an IP, else
+    None."""
+    name = next(
+        (t["Value"] for t in inst.get("Tags", []) if t["Key"] == "Name"), None
+    )
+    host = inst.get("PublicIpAddress") or inst.get("PrivateIpAddress")
+    if not name or not host:
+        return None
+    key = f"{keys_dir}/{inst['KeyName']}" if inst.get("KeyName") else None
+    return HostEntry(
+        name,
+        host,
+        user,
+        key,
+        inst["InstanceId"],
+        f"{inst.get('InstanceType', '')} {region}".strip(),
+    )
+
+
+def sync_hosts(
+    clients: dict[str, Any],
+    names: list[str] | None = None,
+    path: Path = CONFIG_PATH,
+) -> tuple[list[str], list[str]]:
+    """Entries for running instances (optionally only Name globs) from one
+    describe per region.
+
+    Entries for instances that are terminated, or gone altogether in a full
+    sync, are removed; stopped instances keep their entry until they start with
+    a new IP.  Returns (upserted, removed).
+    """
+    filters = [{"Name": "tag:Name", "Values": names}] if names else []
+    found: dict[str, dict] = {}  # instance id -> instance, region
+    for region, ec2 in clients.items():
+        for page in ec2.get_paginator("describe_instances").paginate(
+            Filters=filters
+        ):
+            for reservation in page.get("Reservations", []):
+                for inst in reservation.get("Instances", []):
+                    found[inst["InstanceId"]] = dict(inst, Region=region)
+
+    running = [i for i in found.values() if i["State"]["Name"] == "running"]
+    image_names: dict[str, str] = {}
+    for region, ec2 in clients.items():
+        image_ids = sorted(
+            {i["ImageId"] for i in running if i["Region"] == region}
+        )
+        if image_ids:
+            image_names.update(
+                {
+                    img["ImageId"]: img.get("Name", "")
+                    for img in ec2.describe_images(ImageIds=image_ids)["Images"]
+                }
+            )
+
+    upsert = [
+        e
+        for i in running
+        if (
+            e := entry_for(
+                i,
+                i["Region"],
+                default_user(
+                    image_names.get(i["ImageId"]), i.get("Architecture")
+                ),
+            )
+        )
+    ]
+    current = read_hosts(path)
+    gone = [
+        alias
+        for alias, e in current.items()
+        if (
+            e.instance_id in found
+            and found[e.instance_id]["State"]["Name"]
+            in ("shutting-down", "terminated")
+        )
+        or (not names and e.instance_id not in found)
+    ]
+    changed = update_hosts(upsert, gone, path)
+    return [a for a in changed if a not in gone], [
+        a for a in changed if a in gone
+    ]
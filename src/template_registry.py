@@ -0,0 +1,263 @@
+# -----------------------------------------------------------------------------
+# Registry of launch templates (launch/<family>/*.yaml) indexed by what they
+# actually launch
+#
+# Every template is parsed once (via config_cache.load_yaml) and described by
+# its content: InstanceType, ImageId, arch, volume size and, through the AMI it
+# uses, the Ubuntu release and whether it is a DLAMI.  Templates carry no OS
+# metadata themselves, so each AMI's (ubuntu, dlami) is taken from what the
+# filenames of the templates using it agree on, falling back to the file's own
+# name when the AMI is used only once.
+#
+# Lookups are a dict hit on (instance type, ubuntu, dlami), so a misspelt
+# filename such as c7i_2xlage_ubuntu_2204.yaml is still found by its
+# InstanceType.  Where the filename, the launch/<family> directory and the
+# content disagree the template is flagged (see TemplateInfo.mismatches), and an
+# exact content match without mismatches is preferred.
+#
+# The derived index is pickled next to the config cache, keyed by every
+# template's path, mtime and size, so an unchanged launch/ tree costs one stat
+# per file.
+#
+# Main functions:
+#   - TemplateRegistry.load: build (or re-use) the index for a launch dir
+#   - TemplateRegistry.find: exact lookup for (instance type, ubuntu, dlami)
+# -----------------------------------------------------------------------------
+
+import pickle
+import re
+from collections import Counter
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+from typing import Any
+
+from config_cache import CONFIG_CACHE_DIR
+from config_cache import ConfigError
+from config_cache import load_yaml
+from config_cache import validate_launch_template
+
+REGISTRY_CACHE = CONFIG_CACHE_DIR / "template_registry.pickle"
+REGISTRY_VERSION = 1
+
+FILENAME_RE = re.compile(r"^(?P<family>[a-z][a-z0-9-]*)[._](?P<size>[a-z0-9]+)")
+UBUNTU_RE = re.compile(r"ubuntu_(\d{2})\.?(\d{2})", re.I)
+# t4g., m7gd., c7gn. (not g5.)
+GRAVITON_RE = re.compile(r"^[a-z]+\d+[a-z]*g[a-z]*\.")
+
+
+def normalise_ubuntu(version: Any) -> str:
+    """24.04 / "24.04" / "2404" -> "24.04"; a float 22.10 stays "22.10"."""
+    if isinstance(version, float):  # YAML reads 22.10 as 22.1
+        return f"{version:.2f}"
+    digits = re.sub(r"\D", "", str(version))
+    if len(digits) == 3:  # "24.4": minor version without its leading zero
+        digits = digits[:2] + "0" + digits[2:]
+    return f"{digits[:2]}.{digits[2:4]}"
+
+
+def arch_for(instance_type: str) -> str:
+    return "arm64" if GRAVITON_RE.match(instance_type) else "x86_64"
+
+
+def family_dir_for(instance_type: str) -> str:
+    """launch/ sub-directory for an instance type (g4dn.xlarge -> g).
+
+    Empty when the type does not start with a letter.
+    """
+    m = re.match(r"[a-z]", instance_type.lower())
+    return m.group(0) if m else ""
+
+
+@dataclass
+class TemplateInfo:
+    path: Path
+    instance_type: str
+    image_id: str
+    arch: str
+    volume_size: int | None
+    ubuntu: str | None  # from the AMI (see module header), else the filename
+    dlami: bool
+    key_name: str | None = None
+    mismatches: list[str] = field(default_factory=list)
+
+    @property
+    def key(self) -> tuple[str, str | None, bool]:
+        return (self.instance_type, self.ubuntu, self.dlami)
+
+
+@dataclass
+class _NameClaims:
+    instance_type: str | None
+    ubuntu: str | None
+    dlami: bool
+    arm: bool
+
+
+def _name_claims(path: Path) -> _NameClaims:
+    name = path.name.removesuffix(".yaml")
+    m = FILENAME_RE.match(name.lower())
+    ubuntu = UBUNTU_RE.search(name)
+    return _NameClaims(
+        instance_type=f"{m['family']}.{m['size']}" if m else None,
+        ubuntu=f"{ubuntu.group(1)}.{ubuntu.group(2)}" if ubuntu else None,
+        dlami="dlami" in name.lower(),
+        arm=name.upper().endswith("_ARM") or "_ARM_" in name.upper(),
+    )
+
+
+def _volume_size(spec: dict) -> int | None:
+    for mapping in spec.get("BlockDeviceMappings") or []:
+        size = (mapping.get("Ebs") or {}).get("VolumeSize")
+        if size is not None:
+            return int(size)
+    return None
+
+
+class TemplateRegistry:
+    def __init__(
+        self, templates: list[TemplateInfo], errors: dict[Path, str]
+    ) -> None:
+        self.templates = templates
+        self.errors = errors  # templates that could not be parsed / validated
+        self.by_key: dict[tuple[str, str | None, bool], list[TemplateInfo]] = {}
+        for info in templates:
+            self.by_key.setdefault(info.key, []).append(info)
+        for candidates in self.by_key.values():
+            candidates.sort(key=lambda t: (len(t.mismatches), t.path.name))
+
+    # ----------------------------------------------------------------- building
+
+    @classmethod
+    def build(cls, launch_dir: Path) -> "TemplateRegistry":
+        specs: dict[Path, dict] = {}
+        errors: dict[Path, str] = {}
+        for path in sorted(launch_dir.rglob("*.yaml")):
+            try:
+                specs[path] = load_yaml(path, validate_launch_template)
+            except (ConfigError, OSError, ValueError) as e:
+                errors[path] = str(e)
+
+        claims = {path: _name_claims(path) for path in specs}
+        ami_votes: dict[str, Counter] = {}
+        for path, spec in specs.items():
+            c = claims[path]
+            ami_votes.setdefault(spec["ImageId"], Counter())[
+                (c.ubuntu, c.dlami)
+            ] += 1
+
+        templates = []
+        for path, spec in specs.items():
+            c = claims[path]
+            instance_type = str(spec["InstanceType"])
+            votes = ami_votes[spec["ImageId"]].most_common()
+            agreed = (
+                votes[0][0]
+                if len(votes) == 1 or votes[0][1] > votes[1][1]
+                else None
+            )
+            ubuntu, dlami = (
+                agreed if agreed and agreed[0] else (c.ubuntu, c.dlami)
+            )
+
+            info = TemplateInfo(
+                path=path,
+                instance_type=instance_type,
+                image_id=spec["ImageId"],
+                arch=arch_for(instance_type),
+                volume_size=_volume_size(spec),
+                ubuntu=ubuntu,
+                dlami=dlami,
+                key_name=spec.get("KeyName"),
+            )
+            if c.instance_type and c.instance_type != instance_type:
+                info.mismatches.append(
+                    f"filename says {c.instance_type}, "
+                    f"InstanceType is {instance_type}"
+                )
+            if path.parent.name != family_dir_for(instance_type):
+                info.mismatches.append(
+                    f"in launch/{path.parent.name}/, "
+                    f"{instance_type} belongs in "
+                    f"launch/{family_dir_for(instance_type)}/"
+                )
+            if c.ubuntu and c.ubuntu != ubuntu:
+                info.mismatches.append(
+                    f"filename says ubuntu {c.ubuntu}, "
+                    f"{spec['ImageId']} is used as ubuntu {ubuntu} elsewhere"
+                )
+            if c.dlami != dlami:
+                info.mismatches.append(
+                    f"filename says dlami={c.dlami}, "
+                    f"{spec['ImageId']} is used as dlami={dlami} elsewhere"
+                )
+            if c.arm != (info.arch == "arm64"):
+                info.mismatches.append(
+                    f"filename says {'arm64' if c.arm else 'x86_64'}, "
+                    f"{instance_type} is {info.arch}"
+                )
+            templates.append(info)
+        return cls(templates, errors)
+
+    @staticmethod
+    def _signature(launch_dir: Path) -> tuple:
+        return (
+            REGISTRY_VERSION,
+            str(launch_dir),
+            tuple(
+                (str(p), p.stat().st_mtime_ns, p.stat().st_size)
+                for p in sorted(launch_dir.rglob("*.yaml"))
+            ),
+        )
+
+    @classmethod
+    def load(
+        cls, launch_dir: Path, cache_file: Path = REGISTRY_CACHE
+    ) -> "TemplateRegistry":
+        """Registry for launch_dir, re-built when a template changes."""
+        launch_dir = Path(launch_dir).expanduser().resolve()
+        signature = cls._signature(launch_dir)
+        try:
+            with open(cache_file, "rb") as f:
+                cached_signature, registry = pickle.load(f)
+            if cached_signature == signature:
+                return registry
+        except (
+            OSError,
+            EOFError,
+            pickle.UnpicklingError,
+            ValueError,
+            TypeError,
+            AttributeError,
+        ):
+            pass
+
+        registry = cls.build(launch_dir)
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache_file.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump(
+                    (signature, registry), f, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            tmp.replace(cache_file)
+        except OSError:
+            pass
+        return registry
+
+    # ------------------------------------------------------------------ lookups
+
+    def find(
+        self, instance_type: str, ubuntu: Any, dlami: bool
+    ) -> TemplateInfo | None:
+        """Best template for exactly this instance type / Ubuntu / DLAMI."""
+        candidates = self.by_key.get(
+            (instance_type, normalise_ubuntu(ubuntu), dlami)
+        )
+        return candidates[0] if candidates else None
+
+    def for_instance_type(self, instance_type: str) -> list[TemplateInfo]:
+        return [t for t in self.templates if t.instance_type == instance_type]
+
+    def flagged(self) -> list[TemplateInfo]:
+        return [t for t in self.templates if t.mismatches]
@@ -1,10 +1,12 @@
 
 # Some utilities I use across a number of projects
 
+from functools import cache
 from pathlib import Path
-import yaml
-from typing import Any
 from types import SimpleNamespace
+from typing import Any
+
+from config_cache import load_yaml
 
 
 def get_project_root() -> Path:
@@ -12,7 +14,12 @@ def get_project_root() -> Path:
     Return the absolute path to the project root directory by walking parents
     until a marker file/directory (e.g., ``pyproject.toml``) is found.
     """
-    path = Path().absolute()
+    return _project_root_from(Path().absolute())
+
+
+@cache
+def _project_root_from(path: Path) -> Path:
+    # walked once per working directory
     markers = ['data', 'src', 'notebooks', '.git', 'configs', 'scripts']
 
     while path != path.parent:
@@ -43,8 +50,7 @@ def yaml_to_dict(filepath: str|Path) -> dict[str, Any]:
         Reads a YAML file and returns data in form of dictionary.
         """
         try:
-            with open(filepath, "r") as f:
-                return yaml.safe_load(f) or {}
+            return load_yaml(filepath) or {}
         except FileNotFoundError:
             print('config file: {filepath} not found!')
             return {}
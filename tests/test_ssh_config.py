@@ -0,0 +1,36 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import ssh_config
+from ssh_config import HostEntry
+from ssh_config import read_hosts
+from ssh_config import update_hosts
+
+
+@pytest.fixture(autouse=True)
+def no_ssh(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ssh_config, "close_master", lambda alias: None)
+
+
+def entry(i: int) -> HostEntry:
+    return HostEntry(f"node-{i:02d}", f"10.0.0.{i}", "ubuntu", None, f"i-{i}")
+
+
+def test_concurrent_upserts_all_survive(tmp_path: Path) -> None:
+    config = tmp_path / "config"
+    config.write_text("Host *\n  ServerAliveInterval 30\n")
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        changed = list(
+            pool.map(lambda i: update_hosts([entry(i)], path=config), range(20))
+        )
+
+    assert all(len(c) == 1 for c in changed)
+    assert sorted(read_hosts(config)) == [f"node-{i:02d}" for i in range(20)]
+    assert config.read_text().startswith("Host *\n  ServerAliveInterval 30\n")
+    assert not list(tmp_path.glob("*.tmp"))